@@ -17,32 +17,21 @@ WEB_DIRECTORY = "./web"
 
 
 
-import matplotlib.pyplot as plt
-
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'Arial Unicode MS']  # 优先使用的中文字体列表
-plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
-plt.rcParams['font.family'] = 'sans-serif'  # 使用无衬线字体
-
-
-import os
-import matplotlib as mpl
-
-if os.name == 'nt':  # Windows系统
-    mpl.rc('font', family='Microsoft YaHei')
-else:  # 类Unix系统
-    mpl.rc('font', family='Arial Unicode MS')
-mpl.rcParams['axes.unicode_minus'] = False 
-
-
-
 import json
-import server
 import traceback
 from io import StringIO
-from aiohttp import web
 from .src.compiler import Compiler
+# 与节点模块同一个包前缀导入，预览缓存取的是同一个模块，不依赖安装目录的名称
+from .src import preview_runtime
 
-if not hasattr(server.PromptServer.instance, '_comfyui_for_academic_routes_registered'):
+try:
+    import server
+    from aiohttp import web
+except ImportError:
+    # 不在 ComfyUI 中运行时（如执行测试）只导出节点，不注册路由
+    server = None
+
+if server is not None and not hasattr(server.PromptServer.instance, '_comfyui_for_academic_routes_registered'):
     @server.PromptServer.instance.routes.post("/comfyui_for_academic_compile")
     async def comfyui_for_academic_compile(request):
         try:
@@ -50,7 +39,7 @@ if not hasattr(server.PromptServer.instance, '_comfyui_for_academic_routes_regis
             workflow = json.loads(data["workflow"])
 
             sio = StringIO()
-            Compiler(workflow=workflow, output_file=sio)
+            Compiler(workflow=workflow, output_file=sio, mode=data.get("mode", "sequential"), options=data.get("options"))
 
             sio.seek(0)
             data = sio.read()
@@ -60,5 +49,14 @@ if not hasattr(server.PromptServer.instance, '_comfyui_for_academic_routes_regis
             traceback.print_exc()
             return web.Response(text=str(e), status=500)
     
+    # 预览图片以二进制返回，前端用对象URL显示，不经过 base64
+    @server.PromptServer.instance.routes.get(preview_runtime.PREVIEW_ROUTE + "/{key}")
+    async def comfyui_for_academic_preview(request):
+        preview = preview_runtime.PreviewStore.get(request.match_info["key"])
+        if preview is None:
+            return web.Response(status=404)
+        data, content_type = preview
+        return web.Response(body=data, content_type=content_type, headers={"Cache-Control": "no-store"})
+    
     # 设置标志表示路由已注册
     server.PromptServer.instance._comfyui_for_academic_routes_registered = True
@@ -0,0 +1,56 @@
+"""
+OpenCV 图像转 IMAGE 的耗时（user-023）
+比较单帧 1920x1080 和 8 帧批次的转换，旧版本不支持批次，按逐帧转换后拼接计时
+节点依赖 torch，没有安装 torch 时只测节点内部的 numpy 转换流程（旧：cvtColor + astype/255；新：写入复用缓冲区）
+
+    python benchmarks/bench_cv_to_image.py
+    python benchmarks/bench_cv_to_image.py --baseline <优化前的提交>
+"""
+import cv2
+import numpy as np
+from bench_utils import import_src, load_revision, measure, report, parser
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+
+def old_convert(frame:np.ndarray) -> np.ndarray:
+    """旧版本的转换流程：cvtColor 分配新数组，astype 和除法各再分配一次"""
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
+
+
+def new_convert(frames:list, rgb:np.ndarray, output:np.ndarray) -> np.ndarray:
+    """当前版本的转换流程：通道转换写入中间缓冲区，归一化直接写入 (B,H,W,3) 输出"""
+    for frame, dst in zip(frames, output):
+        np.divide(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb), np.float32(255.0), out=dst)
+    return output
+
+
+if __name__ == '__main__':
+    arg_parser = parser('OpenCV 图像转 IMAGE 的耗时')
+    arg_parser.add_argument('--batch', type=int, default=8, help='批次中的帧数')
+    args = arg_parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8) for _ in range(args.batch)]
+    cases = [('单帧', frames[:1]), (f'{args.batch} 帧批次', frames)]
+
+    if torch is None:
+        print('没有安装 torch，只测转换流程')
+        rgb = np.empty(frames[0].shape, np.uint8)
+        for label, batch in cases:
+            output = np.empty((len(batch),) + frames[0].shape, np.float32)
+            baseline = measure(lambda: np.stack([old_convert(frame) for frame in batch]), args.repeat)
+            report(f'{label} 转换流程', measure(lambda: new_convert(batch, rgb, output), args.repeat), baseline)
+        raise SystemExit
+
+    node = import_src('类型转换.CVToIMAGE').CVToIMAGE()
+    old_node = load_revision(args.baseline, '类型转换.CVToIMAGE').CVToIMAGE() if args.baseline else None
+    for label, batch in cases:
+        baseline = None
+        if old_node is not None:
+            baseline = measure(lambda: torch.cat([old_node.process(frame)[0] for frame in batch]), args.repeat)
+        report(f'{label} 复用缓冲', measure(lambda: node.process(batch, 复用输出缓冲="是"), args.repeat), baseline)
+        report(f'{label} 不复用缓冲', measure(lambda: node.process(batch, 复用输出缓冲="否"), args.repeat), baseline)
@@ -0,0 +1,39 @@
+"""
+滤波、阈值和边缘检测节点复用输出缓冲区的耗时（user-017）
+在 1920x1080 的彩色图像上分别以 复用输出缓冲=是/否 执行节点
+复用时只在第一次执行时分配缓冲区，计时期间新增的分配次数应为 0；不复用时每次由 OpenCV 分配新的输出数组
+
+    python benchmarks/bench_filter_buffers.py
+    python benchmarks/bench_filter_buffers.py --baseline <优化前的提交>
+"""
+import numpy as np
+from bench_utils import import_src, load_revision, measure, report, parser
+
+# (模块名, 类名, 位置参数)，复用输出缓冲 以关键字参数传入，旧版本节点不传
+CASES = [
+    ('OpenCV.滤波.Gaussian', 'Gaussian', (5, 5, 0.0, 0.0)),
+    ('OpenCV.滤波.Blur', 'Blur', (5, 5)),
+    ('OpenCV.滤波.Median', 'Median', (5,)),
+    ('OpenCV.滤波.Bilateral', 'Bilateral', (9, 75.0, 75.0)),
+    ('OpenCV.形态学操作.Morphology', 'Morphology', ("闭运算", "矩形", 3, 1)),
+    ('OpenCV.二值化.Threshold', 'Threshold', (127, 255, "二值化")),
+    ('OpenCV.边缘检测.Canny', 'Canny', (50, 150, 3, "否")),
+]
+
+
+if __name__ == '__main__':
+    args = parser('滤波节点复用输出缓冲区的耗时').parse_args()
+    frame = np.random.default_rng(0).integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+
+    for module_name, class_name, params in CASES:
+        node = getattr(import_src(module_name), class_name)()
+        baseline = None
+        if args.baseline:
+            old_node = getattr(load_revision(args.baseline, module_name), class_name)()
+            baseline = measure(lambda: old_node.process(frame, *params), args.repeat)
+        for reuse in ["是", "否"]:
+            node.process(frame, *params, 复用输出缓冲=reuse)
+            before = node.buffers.allocations
+            ms = measure(lambda: node.process(frame, *params, 复用输出缓冲=reuse), args.repeat)
+            label = f'计时期间缓冲区分配 {node.buffers.allocations - before} 次' if reuse == "是" else '每次分配输出'
+            report(f'{class_name} 复用={reuse}（{label}）', ms, baseline)
@@ -0,0 +1,57 @@
+"""
+矩形检测的耗时（user-014）
+在 1920x1080 的二值图像上按网格绘制旋转矩形、平行四边形和椭圆，候选四边形较多，主要开销在矩形校验
+
+    python benchmarks/bench_find_rectangles.py
+    python benchmarks/bench_find_rectangles.py --baseline <优化前的提交>
+"""
+import cv2
+import numpy as np
+from bench_utils import import_src, load_revision, measure, report, parser
+
+PARAMS = dict(最小面积=100, 最大面积=50000, 近似精度=0.03, 最大长宽比=3.0, 角度容差=15.0, 凸性检测="是",
+              对角线容差=0.05, 边缘平行度=10.0, 轮廓完整性=0.9, 绘制结果="否")
+
+
+def make_frame(cell:int=36, seed:int=0) -> np.ndarray:
+    """在网格的每个格子中绘制一个互不重叠的图形，约一半为矩形，其余为平行四边形和椭圆"""
+    rng = np.random.default_rng(seed)
+    frame = np.zeros((1080, 1920), np.uint8)
+    cells = [(x, y) for y in range(0, 1080 - cell + 1, cell) for x in range(0, 1920 - cell + 1, cell)]
+    for index, (x, y) in enumerate(cells):
+        center = (x + cell / 2, y + cell / 2)
+        size = (float(rng.uniform(14, 24)), float(rng.uniform(14, 24)))
+        angle = float(rng.uniform(0, 180))
+        if index % 4 == 3:
+            cv2.ellipse(frame, (center, size, angle), 255, -1)
+            continue
+        points = cv2.boxPoints((center, size, angle))
+        if index % 4 == 2:
+            # 平行四边形：沿一条边的方向错切
+            points[:2] += (points[1] - points[2]) * 0.3
+        cv2.fillPoly(frame, [np.int32(np.round(points))], 255)
+    return frame
+
+
+def detect(node, frame:np.ndarray) -> list:
+    return node.process(frame, **PARAMS)[2]
+
+
+if __name__ == '__main__':
+    arg_parser = parser('矩形检测的耗时')
+    arg_parser.add_argument('--cell', type=int, default=36, help='网格大小（像素），越小图形越多')
+    args = arg_parser.parse_args()
+
+    frame = make_frame(args.cell)
+    contours, _ = cv2.findContours(frame, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    node = import_src('OpenCV.寻找轮廓.FindRectangles').FindRectangles()
+    print(f'{len(contours)} 个轮廓，检测到 {len(detect(node, frame))} 个矩形')
+
+    baseline = None
+    if args.baseline:
+        old_node = load_revision(args.baseline, 'OpenCV.寻找轮廓.FindRectangles').FindRectangles()
+        if sorted(map(str, detect(old_node, frame))) != sorted(map(str, detect(node, frame))):
+            print('旧版本的检测结果与当前版本不一致')
+        baseline = measure(lambda: detect(old_node, frame), args.repeat)
+    report('FindRectangles 整个节点', measure(lambda: detect(node, frame), args.repeat), baseline)
+    report('其中 findContours', measure(lambda: cv2.findContours(frame, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE), args.repeat))
@@ -0,0 +1,63 @@
+"""
+编译器计算节点层深度的耗时（user-001）
+随机生成有向无环工作流，每个节点最多 3 个输入，只计时层深度的计算
+
+    python benchmarks/bench_graph_depth.py --sizes 1000 10000 100000
+    python benchmarks/bench_graph_depth.py --sizes 1000 5000 --baseline <优化前的提交>
+"""
+import time
+import random
+import types
+from bench_utils import import_src, load_revision, measure, report, parser
+
+
+def make_workflow(size:int, seed:int=0) -> dict:
+    """生成 size 个节点的随机工作流，节点只连接到编号更小的节点，保证无环"""
+    rng = random.Random(seed)
+    workflow = dict()
+    for index in range(size):
+        inputs = {'参数': 1}
+        for port in range(rng.randint(0, 3) if index else 0):
+            inputs[f'输入{port}'] = [str(rng.randrange(index)), 0]
+        workflow[str(index)] = {'inputs': inputs, 'class_type': 'Node', '_meta': {'title': f'节点{index}'}}
+    # 打乱顺序，节点在工作流中的顺序与依赖顺序无关
+    items = list(workflow.items())
+    rng.shuffle(items)
+    return dict(items)
+
+
+def current_depths(compiler, nodes:list) -> dict:
+    return compiler.Graph_info(nodes).topological_levels()
+
+
+def baseline_depths(compiler, nodes:list) -> dict:
+    if not hasattr(compiler.Compiler, 'mark_node_depth'):
+        # 对比版本已经改用拓扑分层
+        return current_depths(compiler, nodes)
+    for node in nodes:
+        node.deepth = None
+    compiler.Compiler.mark_node_depth(types.SimpleNamespace(nodes=nodes))
+    return {node.id: node.deepth for node in nodes}
+
+
+if __name__ == '__main__':
+    arg_parser = parser('编译器计算节点层深度的耗时')
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    args = arg_parser.parse_args()
+
+    compiler = import_src('compiler')
+    old = load_revision(args.baseline, 'compiler') if args.baseline else None
+    for size in args.sizes:
+        workflow = make_workflow(size)
+        nodes = [compiler.Node_info(node) for node in workflow.items()]
+        ms = measure(lambda: current_depths(compiler, nodes), repeat=args.repeat, warmup=1)
+        baseline = None
+        if old is not None:
+            # 旧算法的复杂度很高，只执行一次
+            old_nodes = [old.Node_info(node) for node in workflow.items()]
+            start = time.perf_counter()
+            depths = baseline_depths(old, old_nodes)
+            baseline = (time.perf_counter() - start) * 1000
+            if depths != current_depths(compiler, nodes):
+                print(f'{size} 个节点: 旧版本的层深度与当前版本不一致（旧算法不会更新已处理过的后继节点）')
+        report(f'{size} 个节点', ms, baseline)
@@ -0,0 +1,54 @@
+"""
+Matplotlib 节点连续执行的帧率（user-025）
+样式参数不变、每帧数据变化，模拟实时刷新：线图 500 点、散点图 300 点、6x6 相关系数热力图
+
+    python benchmarks/bench_plots.py
+    python benchmarks/bench_plots.py --baseline <优化前的提交>
+"""
+import warnings
+import numpy as np
+import pandas as pd
+from bench_utils import import_src, load_revision, measure, report, parser
+
+# (模块名, 类名, 数据生成函数, 关键字参数)
+CASES = [
+    ('Matplotlib.基本.LinePlot', 'LinePlot',
+     lambda rng: pd.DataFrame({'x': np.arange(500.0), 'y': rng.normal(size=500).cumsum()}),
+     dict(X轴列名='x', Y轴列名='y')),
+    ('Matplotlib.基本.ScatterPlot', 'ScatterPlot',
+     lambda rng: pd.DataFrame({'x': rng.random(300), 'y': rng.random(300)}),
+     dict(X轴列名='x', Y轴列名='y')),
+    ('Matplotlib.数组和字段图.Heatmap', 'Heatmap',
+     lambda rng: pd.DataFrame(rng.normal(size=(50, 6)), columns=list('abcdef')).corr(),
+     dict()),
+]
+
+
+def frames(make, count:int) -> list:
+    rng = np.random.default_rng(0)
+    return [make(rng) for _ in range(count)]
+
+
+def run(node, data:list, kwargs:dict) -> None:
+    """依次绘制 data 中的每一帧"""
+    for frame in data:
+        node.process(frame, **kwargs)
+
+
+if __name__ == '__main__':
+    arg_parser = parser('Matplotlib 节点连续执行的帧率')
+    arg_parser.add_argument('--frames', type=int, default=10, help='每次测试绘制的帧数')
+    args = arg_parser.parse_args()
+    # 没有中文字体时每帧都会警告缺字，不影响计时
+    warnings.filterwarnings('ignore', message='Glyph')
+
+    for module_name, class_name, make, kwargs in CASES:
+        data = frames(make, args.frames)
+        node = getattr(import_src(module_name), class_name)()
+        baseline = None
+        if args.baseline:
+            old_node = getattr(load_revision(args.baseline, module_name), class_name)()
+            baseline = measure(lambda: run(old_node, data, kwargs), args.repeat, warmup=1) / args.frames
+        ms = measure(lambda: run(node, data, kwargs), args.repeat, warmup=1) / args.frames
+        fps = f'{1000 / ms:.1f} fps' + (f'，旧版本 {1000 / baseline:.1f} fps' if baseline else '')
+        report(f'{class_name} 每帧（{fps}）', ms, baseline)
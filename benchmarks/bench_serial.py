@@ -0,0 +1,65 @@
+"""
+串口输出的编码与单次调用耗时（user-011）
+编码部分比较 JSON 文本与二进制帧；调用部分通过伪终端（仅限 Linux/macOS）测量节点每次执行阻塞的时间
+
+    python benchmarks/bench_serial.py
+    python benchmarks/bench_serial.py --baseline <优化前的提交>
+"""
+import os
+import threading
+import numpy as np
+from bench_utils import import_src, load_revision, measure, report, parser
+
+BAUDRATE = 115200
+
+
+def open_pty() -> tuple[int,str]:
+    """打开伪终端，后台线程持续读出主端的数据，返回主端描述符和从端路径"""
+    master, slave = os.openpty()
+    path = os.ttyname(slave)
+
+    def drain():
+        try:
+            while os.read(master, 65536):
+                pass
+        except OSError:
+            pass
+
+    threading.Thread(target=drain, daemon=True).start()
+    return master, path
+
+
+if __name__ == '__main__':
+    arg_parser = parser('串口输出的编码与单次调用耗时')
+    arg_parser.add_argument('--size', type=int, default=640, help='发送的 float32 数组长度')
+    args = arg_parser.parse_args()
+
+    serial_runtime = import_src('通信.serial_runtime')
+    SerialOutput = import_src('通信.SerialOutput').SerialOutput
+    data = np.random.default_rng(0).random(args.size, dtype=np.float32)
+
+    node = SerialOutput()
+    text = node._to_json_string(data, 0.0)
+    frame = serial_runtime.encode_frame(data, 0.0)
+    print(f'{args.size} 个 float32: JSON {len(text)} 字节（{BAUDRATE} 波特率下 {len(text) * 10 / BAUDRATE * 1000:.0f} ms），'
+          f'二进制帧 {len(frame)} 字节（{len(frame) * 10 / BAUDRATE * 1000:.0f} ms）')
+    report('编码 JSON', measure(lambda: node._to_json_string(data, 0.0), args.repeat * 10))
+    report('编码二进制帧', measure(lambda: serial_runtime.encode_frame(data, 0.0), args.repeat * 10))
+
+    if not hasattr(os, 'openpty'):
+        print('当前平台没有伪终端，跳过节点调用测试')
+        raise SystemExit
+
+    # 伪终端不受波特率限制，测得的是节点本身阻塞的时间
+    master, path = open_pty()
+    baseline = None
+    if args.baseline:
+        old_node = load_revision(args.baseline, '通信.SerialOutput').SerialOutput()
+        baseline = measure(lambda: old_node.process(data, path, str(BAUDRATE), 'JSON格式', '\\n', 0.0), args.repeat * 10)
+    for label, 数据格式, 后台发送 in [('节点调用 JSON，后台发送', 'JSON格式', True),
+                                   ('节点调用 二进制帧，后台发送', '二进制帧', True),
+                                   ('节点调用 二进制帧，同步发送', '二进制帧', False)]:
+        ms = measure(lambda: node.process(data, path, str(BAUDRATE), 数据格式, '\\n', 0.0, 后台发送=后台发送), args.repeat * 10)
+        report(label, ms, baseline)
+    node.writer.release()
+    node.writer = None
@@ -0,0 +1,60 @@
+"""
+导入节点包（注册全部节点）的耗时（user-007）
+每次在新的解释器中按 ComfyUI 的方式加载包，分别测试全部导入、没有清单的懒加载和清单已生成的懒加载
+测试期间会临时移走 src/node_manifest.json，结束后恢复
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import os
+import sys
+import shutil
+import statistics
+import subprocess
+from bench_utils import ROOT, report, parser
+
+MANIFEST_PATH = os.path.join(ROOT, 'src', 'node_manifest.json')
+
+# 在子进程中执行：以包路径为模块名加载根 __init__，输出导入耗时（毫秒）和注册的节点数
+LOADER = f'''
+import sys, time, importlib.util
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('comfyui_for_academic', {os.path.join(ROOT, '__init__.py')!r})
+module = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = module
+spec.loader.exec_module(module)
+print((time.perf_counter() - start) * 1000, len(module.NODE_CLASS_MAPPINGS))
+'''
+
+
+def load_once(lazy:bool) -> tuple[float,int]:
+    """在新的解释器中加载一次包，返回耗时（毫秒）和节点数"""
+    env = dict(os.environ, COMFYUI_FOR_ACADEMIC_LAZY='1' if lazy else '0')
+    output = subprocess.run([sys.executable, '-c', LOADER], env=env, cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    ms, count = output.strip().splitlines()[-1].split()
+    return float(ms), int(count)
+
+
+def run(label:str, lazy:bool, repeat:int, cold:bool=False) -> None:
+    samples = list()
+    for _ in range(repeat):
+        if cold and os.path.exists(MANIFEST_PATH):
+            os.remove(MANIFEST_PATH)
+        ms, count = load_once(lazy)
+        samples.append(ms)
+    report(f'{label}（{count} 个节点）', statistics.median(samples))
+
+
+if __name__ == '__main__':
+    args = parser('导入节点包的耗时', baseline=False).parse_args()
+
+    backup = MANIFEST_PATH + '.bak'
+    if os.path.exists(MANIFEST_PATH):
+        shutil.copyfile(MANIFEST_PATH, backup)
+    try:
+        run('全部导入 (COMFYUI_FOR_ACADEMIC_LAZY=0)', False, args.repeat)
+        run('懒加载，没有清单', True, args.repeat, cold=True)
+        run('懒加载，清单已生成', True, args.repeat)
+    finally:
+        if os.path.exists(backup):
+            shutil.move(backup, MANIFEST_PATH)
@@ -0,0 +1,119 @@
+"""
+基准测试的公共工具
+在 ComfyUI 之外按包导入节点模块，从 git 历史中加载旧版本的节点做对比，并统计耗时
+对比版本默认取当前分支与上游分支的分叉点（merge-base），也可以用 --baseline 指定任意提交
+"""
+import os
+import re
+import sys
+import time
+import types
+import argparse
+import tempfile
+import importlib
+import importlib.util
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+PACKAGE = 'comfyui_for_academic'
+# 没有指定 --baseline 时依次尝试的上游分支
+UPSTREAMS = ['@{upstream}', 'origin/HEAD', 'origin/main', 'origin/master', 'main', 'master']
+
+
+def git(*args:str) -> str:
+    return subprocess.check_output(['git', '-C', ROOT, *args], stderr=subprocess.DEVNULL, text=True).strip()
+
+
+def resolve_baseline(rev:str) -> str:
+    """
+    解析 --baseline 参数，返回对比的提交，不对比时返回 None
+    'merge-base' 表示当前提交与上游分支的分叉点，分叉点就是当前提交时（例如直接在上游分支上运行）不对比
+    """
+    if rev == 'none':
+        return None
+    if rev != 'merge-base':
+        try:
+            return git('rev-parse', '--verify', f'{rev}^{{commit}}')
+        except subprocess.CalledProcessError:
+            raise argparse.ArgumentTypeError(f'找不到提交 {rev}')
+    head = git('rev-parse', 'HEAD')
+    for upstream in UPSTREAMS:
+        try:
+            base = git('merge-base', 'HEAD', upstream)
+        except subprocess.CalledProcessError:
+            continue
+        if base != head:
+            return base
+    print('没有找到与当前提交分叉的上游分支，只测当前版本，可以用 --baseline <提交> 指定对比版本')
+    return None
+
+
+def import_src(name:str) -> types.ModuleType:
+    """
+    按模块名导入 src 下的模块，例如 'OpenCV.滤波.Gaussian'，name 为空时返回 src 包
+    只注册包本身而不执行根 __init__，不需要 ComfyUI，节点之间的相对导入照常可用
+    """
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [ROOT]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f'{PACKAGE}.src' + (f'.{name}' if name else ''))
+
+
+def load_revision(rev:str, name:str) -> types.ModuleType:
+    """
+    从 git 版本 rev 中加载 src 下的模块，作为当前包中的同级模块导入
+    旧版本中的相对导入解析到当前版本的公共模块
+    """
+    path = 'src/' + name.replace('.', '/') + '.py'
+    try:
+        source = subprocess.check_output(['git', '-C', ROOT, 'show', f'{rev}:{path}'], stderr=subprocess.DEVNULL)
+    except subprocess.CalledProcessError:
+        raise Exception(f"版本 {rev[:12]} 中没有 {path}，请用 --baseline 指定优化前的提交")
+
+    # 先导入父包，旧模块中的相对导入才能解析
+    import_src(name.rpartition('.')[0])
+    suffix = re.sub(r'\W', '_', rev[:12])
+    module_name = f'{PACKAGE}.src.{name}_{suffix}'
+    with tempfile.NamedTemporaryFile('wb', suffix='.py', delete=False) as file:
+        file.write(source)
+    try:
+        spec = importlib.util.spec_from_file_location(module_name, file.name)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    finally:
+        os.unlink(file.name)
+    return module
+
+
+def measure(func, repeat:int=20, warmup:int=3) -> float:
+    """多次执行 func，返回耗时的中位数（毫秒）"""
+    for _ in range(warmup):
+        func()
+    samples = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def report(label:str, ms:float, baseline:float=None, against:str='旧版本') -> None:
+    """输出一行结果，有对比结果时附上加速比，against 为对比对象的名称"""
+    line = f'{label:<36} {ms:10.3f} ms'
+    if baseline is not None:
+        line += f'    {against} {baseline:10.3f} ms    加速 {baseline / ms:5.1f}x'
+    print(line)
+
+
+def parser(description:str, baseline:bool=True) -> argparse.ArgumentParser:
+    """所有基准脚本共用的参数：--baseline 指定对比的 git 版本，--repeat 指定重复次数"""
+    result = argparse.ArgumentParser(description=description)
+    if baseline:
+        # argparse 对字符串默认值同样调用 type，解析后 args.baseline 为提交的哈希或 None
+        result.add_argument('--baseline', default='merge-base', type=resolve_baseline,
+                            help='对比的旧版本（git 提交），默认为与上游分支的分叉点，none 表示不对比')
+    result.add_argument('--repeat', type=int, default=20, help='每项测试的重复次数')
+    return result
@@ -0,0 +1,80 @@
+import functools
+import matplotlib
+from io import BytesIO
+from matplotlib import font_manager
+from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from ..preview_runtime import PreviewStore
+
+# 优先使用的中文字体列表
+CJK_FONTS = ['SimHei', 'Microsoft YaHei', 'SimSun', 'Arial Unicode MS']
+
+# 预览图片的分辨率
+PREVIEW_DPI = 150
+
+
+@functools.lru_cache(maxsize=None)
+def setup_fonts() -> str:
+    """
+    配置绘图字体，所有绘图节点共用，只在第一次绘图时执行
+    返回第一个可用的中文字体，没有可用字体时返回 None
+    """
+    available = {font.name for font in font_manager.fontManager.ttflist}
+    font = next((name for name in CJK_FONTS if name in available), None)
+
+    sans_serif = matplotlib.rcParams['font.sans-serif']
+    if font is not None:
+        sans_serif = [font] + [name for name in sans_serif if name != font]
+
+    matplotlib.rcParams['font.family'] = 'sans-serif'  # 使用无衬线字体
+    matplotlib.rcParams['font.sans-serif'] = sans_serif
+    matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+    return font
+
+
+def figure_preview(node, fig) -> dict:
+    """把图形编码为PNG发布为 node 的预览并关闭图形，返回放入 ui 的字段"""
+    with BytesIO() as buffer:
+        fig.savefig(buffer, format='png', dpi=PREVIEW_DPI, bbox_inches='tight')
+        plt.close(fig)
+        return PreviewStore.publish(node, buffer.getvalue(), 'png')
+
+
+class FigureCache:
+    """
+    节点持有的图形缓存，样式参数不变时保留 Figure、Axes 和绘图对象，下次执行只更新数据
+    图形不经过 pyplot 管理，直接用 FigureCanvasAgg 渲染，无需关闭
+    """
+    def __init__(self):
+        self.key = None
+        self.fig:Figure = None
+        self.ax = None
+        self.artists:dict = dict()     # 需要更新数据的绘图对象
+
+    def begin(self, key, figsize:tuple) -> bool:
+        """
+        样式参数 key 与上次相同时返回 True，调用者只需更新 artists 中的数据
+        否则新建空白的 fig 和 ax 并返回 False，调用者重新绘制；key 为 None 时总是重新绘制
+        """
+        if key is not None and key == self.key and self.fig is not None:
+            return True
+        self.key = key
+        self.fig = Figure(figsize=figsize, dpi=PREVIEW_DPI)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.subplots()
+        self.artists = dict()
+        return False
+
+    def reset(self) -> None:
+        """丢弃缓存的图形，下次执行重新绘制"""
+        self.key = None
+        self.fig = None
+        self.ax = None
+        self.artists = dict()
+
+    def render(self, node) -> dict:
+        """渲染当前图形并发布为 node 的预览，返回放入 ui 的字段"""
+        with BytesIO() as buffer:
+            self.fig.canvas.print_png(buffer)
+            return PreviewStore.publish(node, buffer.getvalue(), 'png')
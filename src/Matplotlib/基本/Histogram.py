@@ -1,9 +1,8 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -93,6 +92,8 @@ class Histogram:
     def process(self, 数据, 列名="", 标题="直方图", X轴标签="数值", Y轴标签="频次", 
                 图像宽度=10, 图像高度=6, 柱子数量=30, 柱子颜色="skyblue", 柱子透明度=0.7, 
                 边框颜色="black", 边框宽度=1.0, 显示统计信息=True):
+        setup_fonts()
+
         try:
 
             # 创建图形
@@ -164,17 +165,8 @@ class Histogram:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -183,11 +175,4 @@ class Histogram:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('Histogram 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
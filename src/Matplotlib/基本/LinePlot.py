@@ -1,9 +1,8 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
+from ..plot_runtime import FigureCache, figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -14,6 +13,9 @@ class LinePlot:
     使用Matplotlib绘制线图
     '''
     
+    def __init__(self):
+        self.cache = FigureCache()
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -79,11 +81,10 @@ class LinePlot:
 
     def process(self, 数据, X轴列名="", Y轴列名="", 标题="线图", X轴标签="X轴", Y轴标签="Y轴", 
                 图像宽度=10, 图像高度=6, 线条颜色="blue", 线条样式="solid", 线条宽度=2.0):
+        setup_fonts()
+
         try:
 
-            # 创建图形
-            fig, ax = plt.subplots(figsize=(图像宽度, 图像高度))
-            
             # 获取X轴数据
             if X轴列名 and X轴列名 in 数据.columns:
                 x_data = 数据[X轴列名]
@@ -101,8 +102,20 @@ class LinePlot:
                 else:
                     raise ValueError("数据中没有找到数值列")
             
+            # 样式参数不变且X轴为数值时复用上一次的图形，只更新线条数据
+            key = (图像宽度, 图像高度, 标题, X轴标签, Y轴标签, 线条颜色, 线条样式, 线条宽度)
+            if not pd.api.types.is_numeric_dtype(x_data):
+                key = None
+            if self.cache.begin(key, (图像宽度, 图像高度)):
+                ax = self.cache.ax
+                self.cache.artists['line'].set_data(x_data, y_data)
+                ax.relim()
+                ax.autoscale_view()
+                return {"ui": self.cache.render(self)}
+            
             # 绘制线图
-            ax.plot(x_data, y_data, color=线条颜色, linestyle=线条样式, linewidth=线条宽度)
+            fig, ax = self.cache.fig, self.cache.ax
+            self.cache.artists['line'], = ax.plot(x_data, y_data, color=线条颜色, linestyle=线条样式, linewidth=线条宽度)
             
             # 设置标题和标签
             ax.set_title(标题, fontsize=14, fontweight='bold')
@@ -113,32 +126,17 @@ class LinePlot:
             ax.grid(True, alpha=0.3)
             
             # 调整布局
-            plt.tight_layout()
-            
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
+            fig.tight_layout()
             
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 渲染为PNG并发布预览
+            return {"ui": self.cache.render(self)}
             
         except Exception as e:
+            self.cache.reset()
             # 错误处理
             fig, ax = plt.subplots(figsize=(图像宽度, 图像高度))
             ax.text(0.5, 0.5, f'错误: {str(e)}', ha='center', va='center', 
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('LinePlot 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
@@ -1,9 +1,8 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -85,6 +84,8 @@ class PieChart:
 
     def process(self, 数据, 标签列名="", 数值列名="", 标题="饼图", 图像宽度=10, 图像高度=8, 
                 显示百分比=True, 显示数值=False, 突出显示=0.0, 起始角度=90, 颜色方案="default", 显示图例=True):
+        setup_fonts()
+
         try:
 
             # 创建图形
@@ -195,17 +196,8 @@ class PieChart:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -214,11 +206,4 @@ class PieChart:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('PieChart 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
@@ -1,9 +1,8 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
+from ..plot_runtime import FigureCache, figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -14,6 +13,9 @@ class ScatterPlot:
     使用Matplotlib绘制散点图
     '''
     
+    def __init__(self):
+        self.cache = FigureCache()
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -86,11 +88,10 @@ class ScatterPlot:
 
     def process(self, 数据, X轴列名="", Y轴列名="", 标题="散点图", X轴标签="X轴", Y轴标签="Y轴", 
                 图像宽度=10, 图像高度=6, 点颜色="blue", 点大小=50.0, 点透明度=0.7, 点形状="o"):
+        setup_fonts()
+
         try:
 
-            # 创建图形
-            fig, ax = plt.subplots(figsize=(图像宽度, 图像高度))
-            
             # 获取数值列
             numeric_columns = 数据.select_dtypes(include=[np.number]).columns.tolist()
             
@@ -117,8 +118,23 @@ class ScatterPlot:
                     y_data = 数据[numeric_columns[1]] if len(numeric_columns) > 1 else 数据[numeric_columns[0]]
                     Y轴列名 = numeric_columns[1] if len(numeric_columns) > 1 else numeric_columns[0]
             
+            # 样式参数不变且X、Y轴为数值时复用上一次的图形，只更新点的坐标
+            key = (图像宽度, 图像高度, 标题, X轴标签, Y轴标签, X轴列名, Y轴列名, 点颜色, 点大小, 点透明度, 点形状)
+            if not (pd.api.types.is_numeric_dtype(x_data) and pd.api.types.is_numeric_dtype(y_data)):
+                key = None
+            if self.cache.begin(key, (图像宽度, 图像高度)):
+                ax = self.cache.ax
+                offsets = np.column_stack([x_data, y_data])
+                self.cache.artists['points'].set_offsets(offsets)
+                # relim 不统计散点集合，直接用新坐标重新计算数据范围
+                ax.ignore_existing_data_limits = True
+                ax.update_datalim(offsets)
+                ax.autoscale_view()
+                return {"ui": self.cache.render(self)}
+            
             # 绘制散点图
-            ax.scatter(x_data, y_data, c=点颜色, s=点大小, alpha=点透明度, marker=点形状)
+            fig, ax = self.cache.fig, self.cache.ax
+            self.cache.artists['points'] = ax.scatter(x_data, y_data, c=点颜色, s=点大小, alpha=点透明度, marker=点形状)
             
             # 设置标题和标签
             ax.set_title(标题, fontsize=14, fontweight='bold')
@@ -129,32 +145,17 @@ class ScatterPlot:
             ax.grid(True, alpha=0.3)
             
             # 调整布局
-            plt.tight_layout()
-            
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
+            fig.tight_layout()
             
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 渲染为PNG并发布预览
+            return {"ui": self.cache.render(self)}
             
         except Exception as e:
+            self.cache.reset()
             # 错误处理
             fig, ax = plt.subplots(figsize=(图像宽度, 图像高度))
             ax.text(0.5, 0.5, f'错误: {str(e)}', ha='center', va='center', 
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('ScatterPlot 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
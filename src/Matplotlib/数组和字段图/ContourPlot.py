@@ -1,10 +1,9 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
 from scipy.interpolate import griddata
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -98,6 +97,8 @@ class ContourPlot:
     def process(self, 数据, X轴列名, Y轴列名, Z轴列名, 标题="等高线图", X轴标签="X轴", Y轴标签="Y轴", 
                 图像宽度=10, 图像高度=8, 等高线数量=10, 颜色映射="viridis", 填充等高线=True, 
                 显示等高线标签=False, 显示颜色条=True, 网格分辨率=100):
+        setup_fonts()
+
         try:
 
             # 创建图形
@@ -168,17 +169,8 @@ class ContourPlot:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -187,11 +179,4 @@ class ContourPlot:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('ContourPlot 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
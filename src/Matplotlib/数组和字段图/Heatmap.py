@@ -1,10 +1,9 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
 import seaborn as sns
+from ..plot_runtime import FigureCache, figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -15,6 +14,9 @@ class Heatmap:
     使用Matplotlib绘制热力图
     '''
     
+    def __init__(self):
+        self.cache = FigureCache()
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -77,11 +79,10 @@ class Heatmap:
 
     def process(self, 数据, 标题="热力图", 图像宽度=10, 图像高度=8, 颜色映射="viridis", 
                 显示数值=True, 数值格式=".2f", 显示颜色条=True, X轴标签旋转=45, Y轴标签旋转=0):
+        setup_fonts()
+
         try:
 
-            # 创建图形
-            fig, ax = plt.subplots(figsize=(图像宽度, 图像高度))
-            
             # 只选择数值列
             numeric_data = 数据.select_dtypes(include=[np.number])
             
@@ -93,74 +94,77 @@ class Heatmap:
                 plot_data = numeric_data.corr()
                 if 标题 == "热力图":
                     标题 = "相关性热力图"
+                labels = (tuple(plot_data.columns), tuple(plot_data.index))
+                values = plot_data.to_numpy()
             else:
                 # 如果只有一列，创建一个简单的热力图
                 plot_data = numeric_data.values.reshape(-1, 1)
+                labels = None
+                values = plot_data
+            
+            # 数值文字的颜色：相关性矩阵按绝对值，单列数据按偏离均值的程度
+            if labels is not None:
+                dark = np.abs(values) > 0.5
+            else:
+                dark = np.abs(values - values.mean()) > values.std()
+            
+            # 样式参数、矩阵形状和行列名不变时复用上一次的图形，只更新颜色和数值
+            key = (图像宽度, 图像高度, 标题, 颜色映射, 显示数值, 数值格式, 显示颜色条, X轴标签旋转, Y轴标签旋转, values.shape, labels)
+            if self.cache.begin(key, (图像宽度, 图像高度)):
+                im = self.cache.artists['image']
+                im.set_data(values)
+                im.set_clim(np.nanmin(values), np.nanmax(values))
+                for (i, j), text in np.ndenumerate(self.cache.artists['texts']):
+                    self._update_text(text, values[i, j], 数值格式, dark[i, j])
+                return {"ui": self.cache.render(self)}
+            
+            fig, ax = self.cache.fig, self.cache.ax
             
             # 绘制热力图
-            im = ax.imshow(plot_data, cmap=颜色映射, aspect='auto')
+            im = self.cache.artists['image'] = ax.imshow(values, cmap=颜色映射, aspect='auto')
             
             # 设置标题
             ax.set_title(标题, fontsize=14, fontweight='bold', pad=20)
             
             # 设置坐标轴标签
-            if hasattr(plot_data, 'columns'):  # DataFrame
+            if labels is not None:  # DataFrame
                 ax.set_xticks(range(len(plot_data.columns)))
                 ax.set_yticks(range(len(plot_data.index)))
                 ax.set_xticklabels(plot_data.columns, rotation=X轴标签旋转, ha='right')
                 ax.set_yticklabels(plot_data.index, rotation=Y轴标签旋转)
-                
-                # 显示数值
-                if 显示数值:
-                    for i in range(len(plot_data.index)):
-                        for j in range(len(plot_data.columns)):
-                            value = plot_data.iloc[i, j]
-                            if not np.isnan(value):
-                                text_color = 'white' if abs(value) > 0.5 else 'black'
-                                ax.text(j, i, format(value, 数值格式), 
-                                       ha='center', va='center', color=text_color, fontsize=10)
-            else:  # numpy array
-                if 显示数值:
-                    for i in range(plot_data.shape[0]):
-                        for j in range(plot_data.shape[1]):
-                            value = plot_data[i, j]
-                            if not np.isnan(value):
-                                text_color = 'white' if abs(value - plot_data.mean()) > plot_data.std() else 'black'
-                                ax.text(j, i, format(value, 数值格式), 
-                                       ha='center', va='center', color=text_color, fontsize=10)
+            
+            # 显示数值，每个格子都创建文字对象，NaN 隐藏，以便之后只更新内容
+            texts = np.empty(values.shape, dtype=object)
+            if 显示数值:
+                for (i, j), value in np.ndenumerate(values):
+                    texts[i, j] = ax.text(j, i, '', ha='center', va='center', fontsize=10)
+                    self._update_text(texts[i, j], value, 数值格式, dark[i, j])
+            self.cache.artists['texts'] = texts if 显示数值 else np.empty((0, 0), dtype=object)
             
             # 添加颜色条
             if 显示颜色条:
-                cbar = plt.colorbar(im, ax=ax, shrink=0.8)
+                cbar = fig.colorbar(im, ax=ax, shrink=0.8)
                 cbar.ax.tick_params(labelsize=10)
             
             # 调整布局
-            plt.tight_layout()
-            
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
+            fig.tight_layout()
             
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 渲染为PNG并发布预览
+            return {"ui": self.cache.render(self)}
             
         except Exception as e:
+            self.cache.reset()
             # 错误处理
             fig, ax = plt.subplots(figsize=(图像宽度, 图像高度))
             ax.text(0.5, 0.5, f'错误: {str(e)}', ha='center', va='center', 
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('Heatmap 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
+    
+    def _update_text(self, text, value, value_format, dark):
+        """更新一个格子的数值文字，NaN 不显示"""
+        text.set_visible(not np.isnan(value))
+        if not np.isnan(value):
+            text.set_text(format(value, value_format))
+            text.set_color('white' if dark else 'black')
\ No newline at end of file
@@ -1,9 +1,8 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -110,6 +109,8 @@ class QuiverPlot:
     def process(self, 数据, X位置列名, Y位置列名, X方向列名, Y方向列名, 标题="箭头图", X轴标签="X轴", Y轴标签="Y轴", 
                 图像宽度=10, 图像高度=8, 箭头颜色="blue", 箭头缩放=1.0, 箭头宽度=0.005, 箭头透明度=0.8, 
                 颜色映射列名="", 颜色映射="viridis", 显示颜色条=False):
+        setup_fonts()
+
         try:
 
             # 创建图形
@@ -181,17 +182,8 @@ class QuiverPlot:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -200,11 +192,4 @@ class QuiverPlot:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('QuiverPlot 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
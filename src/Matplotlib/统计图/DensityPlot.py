@@ -1,10 +1,9 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
 from scipy import stats
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -95,6 +94,8 @@ class DensityPlot:
     def process(self, 数据, 列名="", 分组列="", 标题="密度图", X轴标签="数值", Y轴标签="密度", 
                 图像宽度=10, 图像高度=6, 填充曲线下方="True", 显示直方图="False", 
                 线条宽度=2.0, 透明度=0.7, 带宽调整=1.0):
+        setup_fonts()
+
         try:
 
             # 创建图形
@@ -216,17 +217,8 @@ class DensityPlot:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -235,11 +227,4 @@ class DensityPlot:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('DensityPlot 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
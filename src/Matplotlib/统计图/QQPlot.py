@@ -1,10 +1,9 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
 from scipy import stats
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -95,6 +94,8 @@ class QQPlot:
     def process(self, 数据, 列名="", 理论分布="normal", 标题="QQ图", X轴标签="理论分位数", Y轴标签="样本分位数", 
                 图像宽度=8, 图像高度=8, 显示参考线="True", 点的颜色="blue", 点的大小=30, 
                 点的透明度=0.7, 参考线颜色="red", 参考线样式="dashed"):
+        setup_fonts()
+
         try:
             
             # 创建图形
@@ -173,17 +174,8 @@ class QQPlot:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -192,11 +184,4 @@ class QQPlot:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('QQPlot 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
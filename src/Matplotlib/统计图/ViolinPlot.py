@@ -1,9 +1,8 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -94,6 +93,8 @@ class ViolinPlot:
     def process(self, 数据, 列名="", 分组列="", 标题="小提琴图", X轴标签="类别", Y轴标签="数值", 
                 图像宽度=10, 图像高度=6, 显示中位数="True", 显示均值="False", 显示极值="True", 
                 填充颜色="lightblue", 透明度=0.7, X轴标签旋转角度=0):
+        setup_fonts()
+
         try:
 
             # 创建图形
@@ -169,17 +170,8 @@ class ViolinPlot:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -188,11 +180,4 @@ class ViolinPlot:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('ViolinPlot 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
@@ -1,10 +1,9 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -86,6 +85,8 @@ class ParallelCoordinates:
     def process(self, 数据, 标题="平行坐标图", 图像宽度=12, 图像高度=8, 线条透明度=0.6, 
                 线条宽度=1.0, 标准化方法="MinMax", 颜色列名="", 颜色方案="viridis", 
                 显示轴标签=True, 轴标签角度=45):
+        setup_fonts()
+
         try:
             # 获取数值列
             numeric_data = 数据.select_dtypes(include=[np.number])
@@ -180,17 +181,8 @@ class ParallelCoordinates:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -199,11 +191,4 @@ class ParallelCoordinates:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('ParallelCoordinates 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
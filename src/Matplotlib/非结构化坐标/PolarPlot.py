@@ -1,9 +1,8 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -82,6 +81,8 @@ class PolarPlot:
 
     def process(self, 数据, 角度列名="", 半径列名="", 标题="极坐标图", 图像宽度=8, 图像高度=8, 
                 点颜色="blue", 点大小=50.0, 点透明度=0.7, 角度单位="弧度", 绘图类型="散点"):
+        setup_fonts()
+
         try:
             # 创建极坐标图形
             fig, ax = plt.subplots(figsize=(图像宽度, 图像高度), subplot_kw=dict(projection='polar'))
@@ -132,17 +133,8 @@ class PolarPlot:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -151,11 +143,4 @@ class PolarPlot:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('PolarPlot 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
@@ -1,10 +1,9 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
 from math import pi
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -75,6 +74,8 @@ class RadarChart:
 
     def process(self, 数据, 标题="雷达图", 图像宽度=10, 图像高度=10, 填充透明度=0.25, 
                 线条宽度=2.0, 显示网格=True, 标准化数据=True, 颜色方案="默认"):
+        setup_fonts()
+
         try:
             # 获取数值列
             numeric_data = 数据.select_dtypes(include=[np.number])
@@ -144,17 +145,8 @@ class RadarChart:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -163,11 +155,4 @@ class RadarChart:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('RadarChart 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
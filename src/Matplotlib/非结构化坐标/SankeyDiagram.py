@@ -1,11 +1,10 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
 from matplotlib.patches import Rectangle, FancyBboxPatch
 from matplotlib.collections import LineCollection
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -150,6 +149,8 @@ class SankeyDiagram:
     def process(self, 数据, 源节点列名="", 目标节点列名="", 流量列名="", 标题="桑基图", 
                 图像宽度=12, 图像高度=8, 节点宽度=0.1, 流量透明度=0.6, 节点颜色="lightblue", 
                 流量颜色方案="viridis", 显示数值=True, 字体大小=10):
+        setup_fonts()
+
         try:
             # 获取列名
             columns = 数据.columns.tolist()
@@ -263,17 +264,8 @@ class SankeyDiagram:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -282,11 +274,4 @@ class SankeyDiagram:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('SankeyDiagram 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
@@ -1,10 +1,9 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
-import base64
-from io import BytesIO
 import matplotlib
 from matplotlib.patches import Polygon
+from ..plot_runtime import figure_preview, setup_fonts
 
 # 设置matplotlib后端为非交互式
 matplotlib.use('Agg')
@@ -147,6 +146,8 @@ class TernaryPlot:
     def process(self, 数据, A列名="", B列名="", C列名="", 标题="三角图", A标签="A", B标签="B", C标签="C",
                 图像宽度=10, 图像高度=8, 点颜色="blue", 点大小=50.0, 点透明度=0.7, 
                 自动标准化=True, 显示网格=True):
+        setup_fonts()
+
         try:
             # 获取数值列
             numeric_columns = 数据.select_dtypes(include=[np.number]).columns.tolist()
@@ -211,17 +212,8 @@ class TernaryPlot:
             # 调整布局
             plt.tight_layout()
             
-            # 转换为base64
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            
-            # 清理图形
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
+            # 编码为PNG并发布预览，同时关闭图形
+            return {"ui": figure_preview(self, fig)}
             
         except Exception as e:
             # 错误处理
@@ -230,11 +222,4 @@ class TernaryPlot:
                    transform=ax.transAxes, fontsize=12, color='red')
             ax.set_title('TernaryPlot 错误', fontsize=14)
             
-            buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            buffer.close()
-            plt.close(fig)
-            
-            return {"ui": {"data": [image_base64]}}
\ No newline at end of file
+            return {"ui": figure_preview(self, fig)}
\ No newline at end of file
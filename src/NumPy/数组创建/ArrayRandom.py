@@ -97,6 +97,13 @@ class ArrayRandom:
         except Exception as e:
             raise RuntimeError(f"创建随机数组时发生未知错误: {str(e)}")
 
+    @classmethod
+    def IS_CHANGED(s, 形状, 随机类型, 最小值, 最大值, 均值, 标准差, 随机种子):
+        # 未设置种子时每次执行都生成新的随机数组
+        if 随机种子 < 0:
+            return float("NaN")
+        return 随机种子
+
     def _parse_shape(self, shape_str):
         """解析形状字符串"""
         try:
@@ -0,0 +1,104 @@
+import os
+import cv2
+import functools
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# 核形状名称与 OpenCV 结构元素类型的对应关系
+KERNEL_SHAPES = {"矩形": cv2.MORPH_RECT, "椭圆": cv2.MORPH_ELLIPSE, "十字": cv2.MORPH_CROSS}
+
+# 形态学操作名称与 cv2.morphologyEx 操作类型的对应关系
+MORPH_OPS = {"腐蚀": cv2.MORPH_ERODE, "膨胀": cv2.MORPH_DILATE, "开运算": cv2.MORPH_OPEN, "闭运算": cv2.MORPH_CLOSE,
+             "形态学梯度": cv2.MORPH_GRADIENT, "顶帽": cv2.MORPH_TOPHAT, "黑帽": cv2.MORPH_BLACKHAT}
+
+
+@functools.lru_cache(maxsize=64)
+def get_kernel(shape:str, size:int) -> np.ndarray:
+    """按 (形状, 大小) 缓存结构元素，返回只读数组"""
+    kernel = cv2.getStructuringElement(KERNEL_SHAPES[shape], (size, size))
+    kernel.setflags(write=False)
+    return kernel
+
+
+def to_gray(image:np.ndarray, dst:np.ndarray=None) -> np.ndarray:
+    """转换为单通道灰度图，已经是灰度图时直接返回输入，不拷贝"""
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY, dst=dst)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=dst)
+
+
+def from_gray(gray:np.ndarray, image:np.ndarray, dst:np.ndarray=None) -> np.ndarray:
+    """把单通道结果转换回彩色输入 image 的通道数，四通道输入转换为 BGRA（透明度为 255），其余转换为 BGR"""
+    code = cv2.COLOR_GRAY2BGRA if image.shape[2] == 4 else cv2.COLOR_GRAY2BGR
+    return cv2.cvtColor(gray, code, dst=dst)
+
+
+def downscale(image:np.ndarray, scale:float, buffers=None) -> np.ndarray:
+    """按比例缩小图像（区域插值），比例不小于 1 时直接返回输入；传入 BufferPool 时结果写入其中的 small 缓冲区"""
+    if scale >= 1:
+        return image
+    height, width = image.shape[:2]
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    dst = buffers.get('small', (size[1], size[0]) + image.shape[2:], image.dtype) if buffers is not None else None
+    return cv2.resize(image, size, dst=dst, interpolation=cv2.INTER_AREA)
+
+
+def map_points(points:np.ndarray, src_shape:tuple, dst_shape:tuple) -> np.ndarray:
+    """把 src_shape 图像中的像素坐标 (..., 2) 按像素中心对齐映射到 dst_shape 图像中，返回 int32 数组"""
+    if src_shape[:2] == dst_shape[:2]:
+        return points
+    factor = np.array([dst_shape[1] / src_shape[1], dst_shape[0] / src_shape[0]])
+    return np.round((points + 0.5) * factor - 0.5).astype(np.int32)
+
+
+class BufferPool:
+    """节点的输出缓冲区，按名称保存，形状或类型改变时重新分配，作为 OpenCV 函数的 dst 参数复用内存"""
+    def __init__(self):
+        self.buffers:dict[str,np.ndarray] = dict()
+        self.allocations:int = 0    # 累计分配次数，用于检查缓冲区是否被复用
+
+    def get(self, name:str, shape:tuple, dtype=np.uint8) -> np.ndarray:
+        """取出名为 name 的缓冲区，内容未初始化"""
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = self.buffers[name] = np.empty(shape, dtype)
+            self.allocations += 1
+        return buffer
+
+    def output(self, shape:tuple, dtype=np.uint8, reuse:bool=True) -> np.ndarray:
+        """节点最终输出的缓冲区，不复用时返回 None，由 OpenCV 分配新的数组"""
+        return self.get('output', shape, dtype) if reuse else None
+
+
+@functools.lru_cache(maxsize=None)
+def get_tile_pool(workers:int) -> ThreadPoolExecutor:
+    """按线程数共享的分块线程池，OpenCV 函数执行时释放 GIL，分块可以真正并行"""
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cv_tile')
+
+
+def filter_tiled(func, image:np.ndarray, dst:np.ndarray, halo:int, tile_size:int, workers:int=0) -> np.ndarray:
+    """
+    分块并行执行邻域滤波 func(src, dst)，结果写入 dst（为 None 时新分配）
+    每个分块向外扩展 halo 个像素一起计算，只保留中心部分，halo 不小于核半径时结果与整图处理完全一致
+    tile_size 为 0 或图像不大于一个分块时直接整图处理
+    """
+    h, w = image.shape[:2]
+    if tile_size <= 0 or (h <= tile_size and w <= tile_size):
+        return func(image, dst)
+    if dst is None:
+        dst = np.empty_like(image)
+
+    def run(tile):
+        y0, x0 = tile
+        y1, x1 = min(y0 + tile_size, h), min(x0 + tile_size, w)
+        top, left = max(y0 - halo, 0), max(x0 - halo, 0)
+        result = func(image[top:min(y1 + halo, h), left:min(x1 + halo, w)], None)
+        dst[y0:y1, x0:x1] = result[y0 - top:y1 - top, x0 - left:x1 - left]
+
+    tiles = [(y, x) for y in range(0, h, tile_size) for x in range(0, w, tile_size)]
+    # 迭代结果以便把分块中的异常抛给调用者
+    for _ in get_tile_pool(workers or os.cpu_count() or 1).map(run, tiles):
+        pass
+    return dst
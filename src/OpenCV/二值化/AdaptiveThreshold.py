@@ -1,4 +1,5 @@
 import cv2
+from ..cv_runtime import downscale
 
 class AdaptiveThreshold:
     '''
@@ -46,13 +47,23 @@ class AdaptiveThreshold:
                     "tooltip": "从均值或加权均值中减去的常数"
                 }),
             },
+            "optional": {
+                "缩放比例": ("FLOAT", {
+                    "default": 1.0,
+                    "min": 0.1,
+                    "max": 1.0,
+                    "step": 0.05,
+                    "display": "number",
+                    "tooltip": "在按此比例缩小的图像上计算阈值，邻域大小同比例缩小，结果按最近邻放大回原分辨率；比例越小越快，边界位置精度越低，1.0 表示原分辨率"
+                }),
+            },
         }
 
     RETURN_TYPES = ("CVIMAGE",)
     RETURN_NAMES = ("图像输出",)
     OUTPUT_TOOLTIPS = ("局部自适应阈值二值化处理后的图像",)
 
-    def process(self, 图像输入, 最大值, 自适应方法, 阈值类型, 邻域大小, 常数C):
+    def process(self, 图像输入, 最大值, 自适应方法, 阈值类型, 邻域大小, 常数C, 缩放比例=1.0):
         try:
             # 检查输入图像
             if 图像输入 is None:
@@ -80,15 +91,22 @@ class AdaptiveThreshold:
             else:  # 反向二进制
                 thresh_type = cv2.THRESH_BINARY_INV
             
+            # 缩放时在小图上计算，邻域大小同比例缩小并保持为不小于3的奇数
+            small = downscale(gray, 缩放比例)
+            if small is not gray:
+                邻域大小 = max(3, round(邻域大小 * 缩放比例) // 2 * 2 + 1)
+            
             # 应用局部自适应阈值二值化
             binary_image = cv2.adaptiveThreshold(
-                gray,
+                small,
                 最大值,
                 adaptive_method,
                 thresh_type,
                 邻域大小,
                 常数C
             )
+            if small is not gray:
+                binary_image = cv2.resize(binary_image, (gray.shape[1], gray.shape[0]), interpolation=cv2.INTER_NEAREST)
             
             # 转换回3通道图像以保持一致性
             if len(图像输入.shape) == 3:
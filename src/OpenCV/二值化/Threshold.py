@@ -1,4 +1,5 @@
 import cv2
+from ..cv_runtime import BufferPool, to_gray, from_gray
 
 class Threshold:
     '''
@@ -6,6 +7,9 @@ class Threshold:
     使用固定阈值对图像进行二值化处理，将像素值分为两个类别
     '''
     
+    def __init__(self):
+        self.buffers = BufferPool()
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -34,23 +38,30 @@ class Threshold:
                     "tooltip": "阈值处理类型：二值化、反向二值化、截断（大于阈值的设为阈值）、阈值归零（小于阈值归零）、反向阈值归零（大于阈值归零）"
                 }),
             },
+            "optional": {
+                "复用输出缓冲": (["是", "否"], {
+                    "default": "是",
+                    "tooltip": "输出写入节点持有的缓冲区，下次执行时被覆盖；后续节点需要长期保留结果时选否；流水线模式编译时自动关闭"
+                }),
+            },
         }
 
     RETURN_TYPES = ("CVIMAGE",)
     RETURN_NAMES = ("图像输出",)
     OUTPUT_TOOLTIPS = ("一般二值化处理后的图像",)
 
-    def process(self, 图像输入, 阈值, 最大值, 阈值类型):
+    def process(self, 图像输入, 阈值, 最大值, 阈值类型, 复用输出缓冲="是"):
         try:
             # 检查输入图像
             if 图像输入 is None:
                 raise Exception("输入图像为空")
             
-            # 转换为灰度图像（如果不是灰度图）
-            if len(图像输入.shape) == 3:
-                gray = cv2.cvtColor(图像输入, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = 图像输入.copy()
+            # 转换为灰度图像（如果不是灰度图），灰度输入直接使用，不拷贝
+            reuse = 复用输出缓冲 == "是"
+            color = len(图像输入.shape) == 3
+            gray = to_gray(图像输入, self.buffers.get("gray", 图像输入.shape[:2], 图像输入.dtype) if color else None)
+            # 彩色输入时二值结果还要转换回输入的通道数，单通道结果只是中间缓冲区
+            dst = self.buffers.get("binary", gray.shape, gray.dtype) if color else self.buffers.output(gray.shape, gray.dtype, reuse)
             
             # 设置阈值类型
             if 阈值类型 == "二值化":
@@ -64,17 +75,18 @@ class Threshold:
             else:  # 反向阈值归零
                 thresh_type = cv2.THRESH_TOZERO_INV
             
-            # 应用一般二值化
+            # 应用一般二值化，最后一步的结果写入复用的输出缓冲区
             ret_val, binary_image = cv2.threshold(
                 gray,
                 阈值,
                 最大值,
-                thresh_type
+                thresh_type,
+                dst=dst
             )
             
-            # 转换回3通道图像以保持一致性
-            if len(图像输入.shape) == 3:
-                binary_image = cv2.cvtColor(binary_image, cv2.COLOR_GRAY2BGR)
+            # 转换回与输入相同的通道数以保持一致性
+            if color:
+                binary_image = from_gray(binary_image, 图像输入, self.buffers.output(图像输入.shape, 图像输入.dtype, reuse))
             
             return (binary_image,)
             
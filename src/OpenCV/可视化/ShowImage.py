@@ -1,8 +1,7 @@
 import cv2
+import time
 import numpy as np
-import base64
-from io import BytesIO
-from PIL import Image
+from ...preview_runtime import PreviewStore
 
 class ShowImage:
     '''
@@ -10,6 +9,17 @@ class ShowImage:
     用于在ComfyUI界面中显示OpenCV格式的图片
     '''
     
+    # 预览格式对应的 cv2.imencode 扩展名和质量参数，PNG 为无损格式，质量参数不生效
+    FORMATS = {
+        "JPEG": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+        "WEBP": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+        "PNG": (".png", None),
+    }
+    MIME_TYPES = {"JPEG": "jpeg", "WEBP": "webp", "PNG": "png"}
+    
+    def __init__(self):
+        self.last_time = 0.0    # 上一次编码预览的时间，用于限制预览帧率
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -18,43 +28,82 @@ class ShowImage:
                     "tooltip": "要显示的OpenCV格式图片(ndarray)"
                 }),
             },
+            "optional": {
+                "预览格式": (list(s.FORMATS), {
+                    "default": "JPEG",
+                    "tooltip": "预览图片的编码格式，JPEG 和 WEBP 为有损压缩，编码和传输都远快于无损的 PNG"
+                }),
+                "预览质量": ("INT", {
+                    "default": 80,
+                    "min": 1,
+                    "max": 100,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "JPEG 和 WEBP 的压缩质量，值越大越清晰，编码越慢"
+                }),
+                "最大边长": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 8192,
+                    "step": 16,
+                    "display": "number",
+                    "tooltip": "预览图片的长边超过该值时先缩小再编码，一般设为节点显示区域的大小；0 表示不缩放"
+                }),
+                "最高帧率": ("FLOAT", {
+                    "default": 0.0,
+                    "min": 0.0,
+                    "max": 240.0,
+                    "step": 1.0,
+                    "display": "number",
+                    "tooltip": "距上一次预览不足 1/最高帧率 秒时跳过本帧的编码和发送，避免预览积压；0 表示不限制"
+                }),
+            },
         }
 
     RETURN_TYPES = ()
     RETURN_NAMES = ()
     OUTPUT_NODE = True
 
-    def process(self, 图片输入):
-        # 颜色空间转换
-        if len(图片输入.shape) == 2:
-            rgb_image = cv2.cvtColor(图片输入, cv2.COLOR_GRAY2RGB)
-        elif 图片输入.shape[2] == 3:
-            rgb_image = cv2.cvtColor(图片输入, cv2.COLOR_BGR2RGB)
-        elif 图片输入.shape[2] == 4:
-            rgb_image = cv2.cvtColor(图片输入, cv2.COLOR_BGRA2RGB)
-        else:
-            rgb_image = 图片输入  # 假设已经是RGB格式
+    def process(self, 图片输入, 预览格式="JPEG", 预览质量=80, 最大边长=0, 最高帧率=0.0):
+        # 上一帧的预览还没到发送间隔时跳过本帧
+        start = time.perf_counter()
+        if 最高帧率 > 0 and start - self.last_time < 1.0 / 最高帧率:
+            return {"ui": {}}
+        self.last_time = start
+        
+        # 颜色空间转换，cv2.imencode 直接接受 BGR 和灰度图，只需去掉透明通道
+        image = 图片输入
+        if len(image.shape) == 3 and image.shape[2] == 4:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
         
         # 数据类型转换
-        if rgb_image.dtype != np.uint8:
-            if rgb_image.max() <= 1.0:
-                rgb_image = (rgb_image * 255).astype(np.uint8)
+        if image.dtype != np.uint8:
+            if image.max() <= 1.0:
+                image = (image * 255).astype(np.uint8)
             else:
-                rgb_image = np.clip(rgb_image, 0, 255).astype(np.uint8)
+                image = np.clip(image, 0, 255).astype(np.uint8)
+        
+        # 缩小到显示尺寸，减少编码和传输的数据量
+        height, width = image.shape[:2]
+        if 0 < 最大边长 < max(height, width):
+            scale = 最大边长 / max(height, width)
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
         
-        # 防止内存泄漏
-        with BytesIO() as buffer:
-            pil_image = Image.fromarray(rgb_image, 'RGB')
-            pil_image.save(buffer, format='PNG')
-            result = base64.b64encode(buffer.getvalue()).decode()
-            pil_image.close()
-            del pil_image
+        # 编码
+        extension, quality_flag = self.FORMATS[预览格式]
+        params = [quality_flag, 预览质量] if quality_flag is not None else []
+        success, encoded = cv2.imencode(extension, image, params)
+        if not success:
+            raise Exception(f"{预览格式} 编码失败")
+        encode_ms = (time.perf_counter() - start) * 1000
         
-        return {"ui": {"data": [result]}}
+        # 图片字节由预览路由以二进制返回，ui 中只有地址
+        return {"ui": {**PreviewStore.publish(self, encoded, self.MIME_TYPES[预览格式]), "encode_ms": [encode_ms]}}
 
-    def process_local(self, 图片输入):
+    def process_local(self, 图片输入, 预览格式="JPEG", 预览质量=80, 最大边长=0, 最高帧率=0.0):
         cv2.imshow(f'Image_{id(self)}', 图片输入)
         if cv2.waitKey(1) & 0xFF == ord('q'):
             import sys
             cv2.destroyAllWindows()
-            sys.exit(0)
\ No newline at end of file
+            sys.exit(0)
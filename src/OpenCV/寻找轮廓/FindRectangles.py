@@ -1,5 +1,6 @@
 import cv2
 import numpy as np
+from ..cv_runtime import downscale, map_points
 
 class FindRectangles:
     '''
@@ -8,7 +9,11 @@ class FindRectangles:
     '''
     
     def __init__(self):
-        pass
+        # 跟踪状态：上一帧的矩形 [(跟踪ID, 顶点)]，距上次全图检测的帧数，下一个可用的跟踪ID
+        self.tracks = []
+        self.frames_since_full = 0
+        self.next_id = 0
+        self.image_shape = None
     
     @classmethod
     def INPUT_TYPES(s):
@@ -90,13 +95,44 @@ class FindRectangles:
                     "tooltip": "是否在输出图像上绘制检测到的矩形"
                 }),
             },
+            "optional": {
+                "跟踪模式": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "视频输入时只在上一帧矩形附近搜索，并为矩形分配稳定的跟踪ID"
+                }),
+                "全图检测间隔": ("INT", {
+                    "default": 10,
+                    "min": 1,
+                    "max": 1000,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "跟踪模式下每隔多少帧做一次全图检测以发现新的矩形，跟丢时立即全图检测"
+                }),
+                "搜索范围": ("FLOAT", {
+                    "default": 0.5,
+                    "min": 0.1,
+                    "max": 3.0,
+                    "step": 0.1,
+                    "display": "number",
+                    "tooltip": "跟踪模式下搜索区域相对上一帧矩形外接框向四周扩展的比例"
+                }),
+                "缩放比例": ("FLOAT", {
+                    "default": 1.0,
+                    "min": 0.1,
+                    "max": 1.0,
+                    "step": 0.05,
+                    "display": "number",
+                    "tooltip": "在按此比例缩小的图像上检测矩形，顶点坐标映射回原分辨率，面积阈值仍按原分辨率计算；比例越小越快，顶点精度越低，1.0 表示原分辨率"
+                }),
+            },
         }
 
-    RETURN_TYPES = ("CVIMAGE", "INT", "LIST")
-    RETURN_NAMES = ("图像输出", "矩形数量", "矩形坐标")
-    OUTPUT_TOOLTIPS = ("绘制了矩形的图像", "检测到的矩形数量", "矩形的四个顶点坐标列表")
+    RETURN_TYPES = ("CVIMAGE", "INT", "LIST", "LIST")
+    RETURN_NAMES = ("图像输出", "矩形数量", "矩形坐标", "跟踪ID")
+    OUTPUT_TOOLTIPS = ("绘制了矩形的图像", "检测到的矩形数量", "矩形的四个顶点坐标列表", "与矩形坐标一一对应的跟踪ID，跟踪模式关闭时为空列表")
 
-    def process(self, 图像输入, 最小面积, 最大面积, 近似精度, 最大长宽比, 角度容差, 凸性检测, 对角线容差, 边缘平行度, 轮廓完整性, 绘制结果):
+    def process(self, 图像输入, 最小面积, 最大面积, 近似精度, 最大长宽比, 角度容差, 凸性检测, 对角线容差, 边缘平行度, 轮廓完整性, 绘制结果,
+                跟踪模式=False, 全图检测间隔=10, 搜索范围=0.5, 缩放比例=1.0):
         """主处理函数"""
         try:
             # 输入验证
@@ -109,36 +145,52 @@ class FindRectangles:
             else:
                 gray_image = 图像输入.copy()
             
-            # 寻找轮廓并检测矩形
-            contours, _ = cv2.findContours(gray_image, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-            rectangle_data = []
+            # 缩放时在小图上检测，面积阈值换算到小图，跟踪状态也保存小图中的坐标
+            full_shape = gray_image.shape
+            gray_image = downscale(gray_image, 缩放比例)
+            area_scale = gray_image.size / (full_shape[0] * full_shape[1])
+            最小面积, 最大面积 = 最小面积 * area_scale, 最大面积 * area_scale
             
-            for contour in contours:
-                # 基础面积过滤
-                area = cv2.contourArea(contour)
-                if not (最小面积 <= area <= 最大面积):
-                    continue
+            validate_args = (最大长宽比, 角度容差, 凸性检测, 对角线容差, 边缘平行度, 轮廓完整性)
+            track_ids = []
+            if 跟踪模式:
+                if gray_image.shape != self.image_shape:
+                    self.tracks = []
+                    self.image_shape = gray_image.shape
                 
-                # 多边形近似
-                perimeter = cv2.arcLength(contour, True)
-                epsilon = 近似精度 * perimeter
-                approx = cv2.approxPolyDP(contour, epsilon, True)
+                rectangle_data = None
+                if self.tracks and self.frames_since_full + 1 < 全图检测间隔:
+                    # 只在上一帧矩形附近搜索，有矩形跟丢时改为全图检测
+                    regions = [self._search_region(approx, 搜索范围, gray_image.shape) for _, approx in self.tracks]
+                    rectangle_data = self._detect(gray_image, regions, 最小面积, 最大面积, 近似精度, validate_args)
+                    track_ids, lost = self._match_tracks(rectangle_data)
+                    if lost:
+                        rectangle_data = None
+                    else:
+                        self.frames_since_full += 1
                 
-                # 四边形检查
-                if len(approx) != 4:
-                    continue
+                if rectangle_data is None:
+                    rectangle_data = self._detect(gray_image, None, 最小面积, 最大面积, 近似精度, validate_args)
+                    track_ids, _ = self._match_tracks(rectangle_data)
+                    self.frames_since_full = 0
                 
-                # 矩形验证
-                if self._is_rectangle(approx, contour, 最大长宽比, 角度容差, 凸性检测, 对角线容差, 边缘平行度, 轮廓完整性):
-                    coords = approx.reshape(-1, 2).tolist()
-                    rectangle_data.append((area, approx, coords))
+                # 新出现的矩形分配新的跟踪ID
+                for index, track_id in enumerate(track_ids):
+                    if track_id is None:
+                        track_ids[index] = self.next_id
+                        self.next_id += 1
+                self.tracks = [(track_id, data[1]) for track_id, data in zip(track_ids, rectangle_data)]
+            else:
+                rectangle_data = self._detect(gray_image, None, 最小面积, 最大面积, 近似精度, validate_args)
             
             # 按面积从大到小排序
-            rectangle_data.sort(key=lambda x: x[0], reverse=True)
+            order = sorted(range(len(rectangle_data)), key=lambda i: rectangle_data[i][0], reverse=True)
             
             # 提取结果数据
-            rectangles = [data[1] for data in rectangle_data]
-            rectangle_coords = [data[2] for data in rectangle_data]
+            rectangles = [map_points(rectangle_data[i][1], gray_image.shape, full_shape) for i in order]
+            rectangle_coords = [rect.reshape(-1, 2).tolist() for rect in rectangles]
+            if 跟踪模式:
+                track_ids = [track_ids[i] for i in order]
             
             # 绘制结果
             result_image = 图像输入.copy()
@@ -146,110 +198,142 @@ class FindRectangles:
                 result_image = cv2.cvtColor(result_image, cv2.COLOR_GRAY2BGR)
             
             if 绘制结果 == "是" and rectangles:
-                for rect in rectangles:
+                for index, rect in enumerate(rectangles):
                     cv2.drawContours(result_image, [rect], -1, (0, 255, 0), 2)
                     for point in rect:
                         cv2.circle(result_image, tuple(point[0]), 5, (255, 0, 0), -1)
+                    if 跟踪模式:
+                        cv2.putText(result_image, str(track_ids[index]), tuple(rect[0][0]), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
             
-            return (result_image, len(rectangles), rectangle_coords)
+            return (result_image, len(rectangles), rectangle_coords, track_ids)
             
         except Exception as e:
             print(f"寻找矩形轮廓错误: {e}")
-            return (图像输入, 0, [])
-    
-
+            return (图像输入, 0, [], [])
     
-    def _is_rectangle(self, approx, contour, max_aspect_ratio, angle_tolerance, check_convex, diagonal_ratio, parallel_tolerance, contour_integrity):
+    def _detect(self, gray_image, regions, min_area, max_area, precision, validate_args):
         """
-        验证四边形是否为矩形
-        使用多种判定依据确保识别的准确性
+        在整幅图像或若干搜索区域 (x0, y0, x1, y1) 中检测矩形，返回 [(面积, 顶点)]
+        顶点坐标始终是整幅图像中的坐标
         """
-        try:
-            points = approx.reshape(-1, 2)
-
-            # 凸性检测
-            if check_convex == "是" and not cv2.isContourConvex(approx):
-                return False
-            
-            # 计算四条边的长度
-            sides = []
-            for i in range(4):
-                p1 = points[i]
-                p2 = points[(i + 1) % 4]
-                length = np.sqrt((p2[0] - p1[0])**2 + (p2[1] - p1[1])**2)
-                sides.append(length)
-            
-            # 检查对边是否相等
-            tolerance = 0.1
-            if not (abs(sides[0] - sides[2]) / max(sides[0], sides[2]) < tolerance and
-                    abs(sides[1] - sides[3]) / max(sides[1], sides[3]) < tolerance):
-                return False
-            
-            # 检查长宽比
-            width = max(sides[0], sides[1])
-            height = min(sides[0], sides[1])
-            if max(width / height, height / width) > max_aspect_ratio:
-                return False
-            
-            # 检查所有角度是否接近90度
-            for i in range(4):
-                p1 = points[i]
-                p2 = points[(i + 1) % 4]
-                p3 = points[(i + 2) % 4]
-                
-                v1 = p1 - p2
-                v2 = p3 - p2
+        if regions is None:
+            regions = [(0, 0, gray_image.shape[1], gray_image.shape[0])]
+        
+        # 寻找轮廓，收集面积合格的四边形候选
+        height, width = gray_image.shape[:2]
+        areas, quads, perimeters = [], [], []
+        seen = set()
+        for x0, y0, x1, y1 in regions:
+            contours, _ = cv2.findContours(gray_image[y0:y1, x0:x1], cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE, offset=(x0, y0))
+            for contour in contours:
+                # 基础面积过滤
+                area = cv2.contourArea(contour)
+                if not (min_area <= area <= max_area):
+                    continue
                 
-                cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-                cos_angle = np.clip(cos_angle, -1, 1)
-                angle = np.degrees(np.arccos(cos_angle))
+                # 被搜索区域边界截断的轮廓不完整，可能被截成假矩形
+                x, y, w, h = cv2.boundingRect(contour)
+                if ((x0 > 0 and x <= x0) or (y0 > 0 and y <= y0) or
+                    (x1 < width and x + w >= x1) or (y1 < height and y + h >= y1)):
+                    continue
                 
-                if abs(angle - 90) > angle_tolerance:
-                    return False
-            
-            # 对角线长度检测
-            diagonal1 = np.sqrt((points[0][0] - points[2][0])**2 + (points[0][1] - points[2][1])**2)
-            diagonal2 = np.sqrt((points[1][0] - points[3][0])**2 + (points[1][1] - points[3][1])**2)
-            diagonal_diff = abs(diagonal1 - diagonal2) / max(diagonal1, diagonal2)
-            if diagonal_diff > diagonal_ratio:
-                return False
-            
-            # 边缘平行度检测
-            edges = []
-            for i in range(4):
-                p1 = points[i]
-                p2 = points[(i + 1) % 4]
-                edge = p2 - p1
-                edges.append(edge)
-            
-            for i in range(2):
-                edge1 = edges[i]
-                edge2 = edges[i + 2]
+                # 多边形近似，周长同时用于轮廓完整性检测
+                perimeter = cv2.arcLength(contour, True)
+                epsilon = precision * perimeter
+                approx = cv2.approxPolyDP(contour, epsilon, True)
                 
-                dot_product = np.dot(edge1, edge2)
-                norms = np.linalg.norm(edge1) * np.linalg.norm(edge2)
-                if norms == 0:
+                # 四边形检查
+                if len(approx) != 4:
                     continue
                 
-                cos_angle = abs(dot_product) / norms
-                cos_angle = np.clip(cos_angle, 0, 1)
-                angle = np.degrees(np.arccos(cos_angle))
+                # 搜索区域重叠时同一个矩形只保留一次
+                key = approx.tobytes()
+                if key in seen:
+                    continue
+                seen.add(key)
                 
-                if min(angle, 180 - angle) > parallel_tolerance:
-                    return False
+                areas.append(area)
+                quads.append(approx)
+                perimeters.append(perimeter)
+        
+        if not quads:
+            return []
+        
+        # 矩形验证：所有候选一起计算
+        mask = self._validate_rectangles(np.stack(quads).reshape(-1, 4, 2), np.array(perimeters), *validate_args)
+        return [(areas[index], quads[index]) for index in np.flatnonzero(mask)]
+    
+    def _search_region(self, approx, expand, shape):
+        """上一帧矩形的外接框向四周扩展 expand 倍后的搜索区域，裁剪到图像范围内"""
+        x, y, w, h = cv2.boundingRect(approx)
+        dx, dy = int(w * expand) + 2, int(h * expand) + 2
+        return (max(x - dx, 0), max(y - dy, 0), min(x + w + dx, shape[1]), min(y + h + dy, shape[0]))
+    
+    def _match_tracks(self, rectangle_data):
+        """
+        按中心点距离把检测结果与上一帧的矩形贪心匹配，返回每个检测结果的跟踪ID和是否有矩形跟丢
+        距离不超过上一帧矩形对角线的一半才算同一个矩形，未匹配的检测结果跟踪ID为 None
+        """
+        track_ids = [None] * len(rectangle_data)
+        if self.tracks and rectangle_data:
+            previous = np.stack([approx.reshape(4, 2) for _, approx in self.tracks]).astype(np.float64)
+            current = np.stack([approx.reshape(4, 2) for _, approx in rectangle_data]).astype(np.float64)
+            limits = np.hypot(*(previous[:, 0] - previous[:, 2]).T) / 2
+            distances = np.linalg.norm(current.mean(axis=1)[:, None] - previous.mean(axis=1)[None], axis=2)
             
-            # 轮廓完整性检测
-            original_perimeter = cv2.arcLength(contour, True)
-            approx_perimeter = cv2.arcLength(approx, True)
+            matched = set()
+            for flat in np.argsort(distances, axis=None):
+                i, j = divmod(int(flat), len(self.tracks))
+                if distances[i, j] > limits[j] or track_ids[i] is not None or j in matched:
+                    continue
+                track_ids[i] = self.tracks[j][0]
+                matched.add(j)
+            lost = len(matched) < len(self.tracks)
+        else:
+            lost = bool(self.tracks)
+        return track_ids, lost
+    
+    def _validate_rectangles(self, quads, perimeters, max_aspect_ratio, angle_tolerance, check_convex, diagonal_ratio, parallel_tolerance, contour_integrity):
+        """
+        验证四边形是否为矩形
+        quads 为 (N,4,2) 的顶点数组，perimeters 为原始轮廓的周长，返回 (N,) 的布尔数组
+        所有判定依据对全部候选向量化计算，角度判断直接比较余弦值，不计算反三角函数
+        """
+        points = quads.astype(np.float64)
+        edges = np.roll(points, -1, axis=1) - points            # 第 i 条边：顶点 i 指向顶点 i+1
+        next_edges = np.roll(edges, -1, axis=1)
+        sides = np.hypot(edges[..., 0], edges[..., 1])         # (N,4) 四条边的长度
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 检查对边是否相等，退化的零长度边在这里被排除（NaN 比较结果为 False）
+            tolerance = 0.1
+            mask = ((np.abs(sides[:, 0] - sides[:, 2]) / np.maximum(sides[:, 0], sides[:, 2]) < tolerance) &
+                    (np.abs(sides[:, 1] - sides[:, 3]) / np.maximum(sides[:, 1], sides[:, 3]) < tolerance))
             
-            if original_perimeter == 0:
-                return False
+            # 凸性检测：相邻边的叉积同号
+            if check_convex == "是":
+                cross = edges[..., 0] * next_edges[..., 1] - edges[..., 1] * next_edges[..., 0]
+                mask &= np.all(cross > 0, axis=1) | np.all(cross < 0, axis=1)
             
-            integrity_ratio = approx_perimeter / original_perimeter
-            if integrity_ratio < contour_integrity:
-                return False
+            # 检查长宽比
+            width = np.maximum(sides[:, 0], sides[:, 1])
+            height = np.minimum(sides[:, 0], sides[:, 1])
+            mask &= ~(width / height > max_aspect_ratio)
             
-            return True
+            # 检查所有角度是否接近90度：|角度-90| <= 容差 等价于 |cos| <= sin(容差)
+            cos_angles = -np.sum(edges * next_edges, axis=2) / (sides * np.roll(sides, -1, axis=1))
+            mask &= np.all(np.abs(cos_angles) <= np.sin(np.radians(angle_tolerance)), axis=1)
             
-        except Exception:
-            return False
\ No newline at end of file
+            # 对角线长度检测
+            diagonal1 = np.hypot(*(points[:, 0] - points[:, 2]).T)
+            diagonal2 = np.hypot(*(points[:, 1] - points[:, 3]).T)
+            mask &= ~(np.abs(diagonal1 - diagonal2) / np.maximum(diagonal1, diagonal2) > diagonal_ratio)
+            
+            # 边缘平行度检测：对边夹角 <= 容差 等价于 |cos| >= cos(容差)
+            cos_parallel = np.abs(np.sum(edges[:, :2] * edges[:, 2:], axis=2)) / (sides[:, :2] * sides[:, 2:])
+            mask &= np.all(cos_parallel >= np.cos(np.radians(parallel_tolerance)), axis=1)
+            
+            # 轮廓完整性检测
+            mask &= (perimeters > 0) & (sides.sum(axis=1) / perimeters >= contour_integrity)
+        
+        return mask
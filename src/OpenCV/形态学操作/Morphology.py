@@ -1,4 +1,5 @@
 import cv2
+from ..cv_runtime import MORPH_OPS, BufferPool, get_kernel
 
 class Morphology:
     '''
@@ -6,6 +7,9 @@ class Morphology:
     提供完整的形态学操作功能，包括腐蚀、膨胀、开运算、闭运算、形态学梯度、顶帽、黑帽
     '''
     
+    def __init__(self):
+        self.buffers = BufferPool()
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -13,7 +17,7 @@ class Morphology:
                 "图像输入": ("CVIMAGE", {
                     "tooltip": "输入的openCV格式图像"
                 }),
-                "操作类型": (["腐蚀", "膨胀", "开运算", "闭运算", "形态学梯度", "顶帽", "黑帽"], {
+                "操作类型": (list(MORPH_OPS), {
                     "default": "开运算",
                     "tooltip": "选择要执行的形态学操作类型\n"
                                "腐蚀：移除图像中的小物体,平滑边界,断开连接的物体\n"
@@ -48,13 +52,24 @@ class Morphology:
                     "tooltip": "形态学操作的迭代次数"
                 }),
             },
+            "optional": {
+                "操作序列": ("STRING", {
+                    "default": "",
+                    "tooltip": "按顺序执行的多个形态学操作，用逗号分隔，例如「开运算,闭运算」；\n"
+                               "留空时只执行操作类型，所有操作共用同一个结构元素和迭代次数"
+                }),
+                "复用输出缓冲": (["是", "否"], {
+                    "default": "是",
+                    "tooltip": "输出写入节点持有的缓冲区，下次执行时被覆盖；后续节点需要长期保留结果时选否；流水线模式编译时自动关闭"
+                }),
+            },
         }
 
     RETURN_TYPES = ("CVIMAGE",)
     RETURN_NAMES = ("图像输出",)
     OUTPUT_TOOLTIPS = ("形态学操作处理后的图像",)
 
-    def process(self, 图像输入, 操作类型, 核形状, 核大小, 迭代次数):
+    def process(self, 图像输入, 操作类型, 核形状, 核大小, 迭代次数, 操作序列="", 复用输出缓冲="是"):
         try:
             # 检查输入图像
             if 图像输入 is None:
@@ -64,32 +79,23 @@ class Morphology:
             if 核大小 % 2 == 0:
                 核大小 += 1
             
-            # 根据形状创建结构元素
-            if 核形状 == "矩形":
-                kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (核大小, 核大小))
-            elif 核形状 == "椭圆":
-                kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (核大小, 核大小))
-            else:  # 十字
-                kernel = cv2.getStructuringElement(cv2.MORPH_CROSS, (核大小, 核大小))
+            # 结构元素按 (形状, 大小) 缓存，参数不变时不再重新创建
+            kernel = get_kernel(核形状, 核大小)
+            
+            # 解析操作序列，留空时只执行操作类型
+            operations = [op.strip() for op in 操作序列.replace('，', ',').split(',') if op.strip()] or [操作类型]
+            for operation in operations:
+                if operation not in MORPH_OPS:
+                    raise Exception(f"不支持的形态学操作: {operation}，可选: {'、'.join(MORPH_OPS)}")
             
-            # 根据操作类型执行相应的形态学操作
-            if 操作类型 == "腐蚀":
-                result_image = cv2.erode(图像输入, kernel, iterations=迭代次数)
-            elif 操作类型 == "膨胀":
-                result_image = cv2.dilate(图像输入, kernel, iterations=迭代次数)
-            elif 操作类型 == "开运算":
-                result_image = cv2.morphologyEx(图像输入, cv2.MORPH_OPEN, kernel, iterations=迭代次数)
-            elif 操作类型 == "闭运算":
-                result_image = cv2.morphologyEx(图像输入, cv2.MORPH_CLOSE, kernel, iterations=迭代次数)
-            elif 操作类型 == "形态学梯度":
-                result_image = cv2.morphologyEx(图像输入, cv2.MORPH_GRADIENT, kernel, iterations=迭代次数)
-            elif 操作类型 == "顶帽":
-                result_image = cv2.morphologyEx(图像输入, cv2.MORPH_TOPHAT, kernel, iterations=迭代次数)
-            elif 操作类型 == "黑帽":
-                result_image = cv2.morphologyEx(图像输入, cv2.MORPH_BLACKHAT, kernel, iterations=迭代次数)
-            else:
-                # 默认使用开运算
-                result_image = cv2.morphologyEx(图像输入, cv2.MORPH_OPEN, kernel, iterations=迭代次数)
+            # 依次执行，中间结果在两个缓冲区之间交替，最后一步写入输出缓冲区
+            result_image = 图像输入
+            for index, operation in enumerate(operations):
+                if index < len(operations) - 1:
+                    dst = self.buffers.get("ab"[index % 2], 图像输入.shape, 图像输入.dtype)
+                else:
+                    dst = self.buffers.output(图像输入.shape, 图像输入.dtype, 复用输出缓冲 == "是")
+                result_image = cv2.morphologyEx(result_image, MORPH_OPS[operation], kernel, dst=dst, iterations=迭代次数)
             
             return (result_image,)
             
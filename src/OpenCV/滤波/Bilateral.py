@@ -1,4 +1,5 @@
 import cv2
+from ..cv_runtime import BufferPool, filter_tiled
 
 class Bilateral:
     '''
@@ -6,6 +7,9 @@ class Bilateral:
     双边滤波是一种非线性滤波技术，能够在平滑图像的同时保持边缘信息
     '''
     
+    def __init__(self):
+        self.buffers = BufferPool()
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -38,13 +42,35 @@ class Bilateral:
                     "tooltip": "坐标空间的标准差，值越大，距离越远的像素会相互影响"
                 }),
             },
+            "optional": {
+                "分块大小": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 4096,
+                    "step": 64,
+                    "display": "number",
+                    "tooltip": "把大图分成带重叠边缘的正方形分块并行滤波，结果与整图处理一致；0 表示不分块"
+                }),
+                "线程数": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 64,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "分块并行的线程数，0 表示使用全部CPU核心"
+                }),
+                "复用输出缓冲": (["是", "否"], {
+                    "default": "是",
+                    "tooltip": "输出写入节点持有的缓冲区，下次执行时被覆盖；后续节点需要长期保留结果时选否；流水线模式编译时自动关闭"
+                }),
+            },
         }
 
     RETURN_TYPES = ("CVIMAGE",)
     RETURN_NAMES = ("图像输出",)
     OUTPUT_TOOLTIPS = ("双边滤波处理后的图像",)
 
-    def process(self, 图像输入, 滤波直径, 颜色标准差, 空间标准差):
+    def process(self, 图像输入, 滤波直径, 颜色标准差, 空间标准差, 分块大小=0, 线程数=0, 复用输出缓冲="是"):
         try:
             # 检查输入图像
             if 图像输入 is None:
@@ -54,12 +80,14 @@ class Bilateral:
             if 滤波直径 % 2 == 0:
                 滤波直径 += 1
             
-            # 应用双边滤波
-            filtered_image = cv2.bilateralFilter(
-                图像输入, 
-                滤波直径, 
-                颜色标准差, 
-                空间标准差
+            # 应用双边滤波，结果写入复用的输出缓冲区，分块时边缘重叠滤波半径
+            filtered_image = filter_tiled(
+                lambda src, dst: cv2.bilateralFilter(src, 滤波直径, 颜色标准差, 空间标准差, dst=dst),
+                图像输入,
+                self.buffers.output(图像输入.shape, 图像输入.dtype, 复用输出缓冲 == "是"),
+                滤波直径 // 2,
+                分块大小,
+                线程数
             )
             
             return (filtered_image,)
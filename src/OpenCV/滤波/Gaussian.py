@@ -1,4 +1,5 @@
 import cv2
+from ..cv_runtime import BufferPool, filter_tiled
 
 class Gaussian:
     '''
@@ -6,6 +7,9 @@ class Gaussian:
     高斯滤波是一种线性平滑滤波，适用于去除高斯噪声
     '''
     
+    def __init__(self):
+        self.buffers = BufferPool()
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -53,13 +57,35 @@ class Gaussian:
 
                 }),
             },
+            "optional": {
+                "分块大小": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 4096,
+                    "step": 64,
+                    "display": "number",
+                    "tooltip": "把大图分成带重叠边缘的正方形分块并行滤波，结果与整图处理一致；0 表示不分块"
+                }),
+                "线程数": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 64,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "分块并行的线程数，0 表示使用全部CPU核心"
+                }),
+                "复用输出缓冲": (["是", "否"], {
+                    "default": "是",
+                    "tooltip": "输出写入节点持有的缓冲区，下次执行时被覆盖；后续节点需要长期保留结果时选否；流水线模式编译时自动关闭"
+                }),
+            },
         }
 
     RETURN_TYPES = ("CVIMAGE",)
     RETURN_NAMES = ("图像输出",)
     OUTPUT_TOOLTIPS = ("高斯滤波处理后的图像",)
 
-    def process(self, 图像输入, 核大小X, 核大小Y, X方向标准差, Y方向标准差):
+    def process(self, 图像输入, 核大小X, 核大小Y, X方向标准差, Y方向标准差, 分块大小=0, 线程数=0, 复用输出缓冲="是"):
         try:
             # 检查输入图像
             if 图像输入 is None:
@@ -71,12 +97,14 @@ class Gaussian:
             if 核大小Y % 2 == 0:
                 核大小Y += 1
             
-            # 应用高斯滤波
-            filtered_image = cv2.GaussianBlur(
+            # 应用高斯滤波，结果写入复用的输出缓冲区，分块时边缘重叠核半径
+            filtered_image = filter_tiled(
+                lambda src, dst: cv2.GaussianBlur(src, (核大小X, 核大小Y), X方向标准差, dst=dst, sigmaY=Y方向标准差),
                 图像输入,
-                (核大小X, 核大小Y),
-                X方向标准差,
-                sigmaY=Y方向标准差
+                self.buffers.output(图像输入.shape, 图像输入.dtype, 复用输出缓冲 == "是"),
+                max(核大小X, 核大小Y) // 2,
+                分块大小,
+                线程数
             )
             
             return (filtered_image,)
@@ -1,4 +1,5 @@
 import cv2
+from ..cv_runtime import BufferPool, filter_tiled
 
 class Median:
     '''
@@ -6,6 +7,9 @@ class Median:
     中值滤波是一种非线性滤波技术，特别适用于去除椒盐噪声
     '''
     
+    def __init__(self):
+        self.buffers = BufferPool()
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -22,13 +26,35 @@ class Median:
                     "tooltip": "中值滤波核的大小，必须为奇数。值越大，滤波效果越强"
                 }),
             },
+            "optional": {
+                "分块大小": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 4096,
+                    "step": 64,
+                    "display": "number",
+                    "tooltip": "把大图分成带重叠边缘的正方形分块并行滤波，结果与整图处理一致；0 表示不分块"
+                }),
+                "线程数": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 64,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "分块并行的线程数，0 表示使用全部CPU核心"
+                }),
+                "复用输出缓冲": (["是", "否"], {
+                    "default": "是",
+                    "tooltip": "输出写入节点持有的缓冲区，下次执行时被覆盖；后续节点需要长期保留结果时选否；流水线模式编译时自动关闭"
+                }),
+            },
         }
 
     RETURN_TYPES = ("CVIMAGE",)
     RETURN_NAMES = ("图像输出",)
     OUTPUT_TOOLTIPS = ("中值滤波处理后的图像",)
 
-    def process(self, 图像输入, 核大小):
+    def process(self, 图像输入, 核大小, 分块大小=0, 线程数=0, 复用输出缓冲="是"):
         try:
             # 检查输入图像
             if 图像输入 is None:
@@ -38,10 +64,14 @@ class Median:
             if 核大小 % 2 == 0:
                 核大小 += 1
             
-            # 应用中值滤波
-            filtered_image = cv2.medianBlur(
+            # 应用中值滤波，结果写入复用的输出缓冲区，分块时边缘重叠核半径
+            filtered_image = filter_tiled(
+                lambda src, dst: cv2.medianBlur(src, 核大小, dst=dst),
                 图像输入,
-                核大小
+                self.buffers.output(图像输入.shape, 图像输入.dtype, 复用输出缓冲 == "是"),
+                核大小 // 2,
+                分块大小,
+                线程数
             )
             
             return (filtered_image,)
@@ -1,17 +1,19 @@
 import cv2
 import time
 import numpy as np
+from .capture_runtime import CaptureDevice
 
 
 class CAM:
     '''
     摄像头输入
-    从摄像头设备捕获实时图像
+    从摄像头设备捕获实时图像，后台线程持续采集，节点执行时取最新一帧
     '''
     
     def __init__(self):
-        self.cap = None
-        CAM.time = time.time()
+        self.device = None
+        self.frame_count = 0    # 上一次取到的帧序号
+        self.dropped = 0
     
     @classmethod
     def INPUT_TYPES(s):
@@ -42,47 +44,72 @@ class CAM:
                     "tooltip": "图像高度"
                 }),
             },
+            "optional": {
+                "等待新帧": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "是否等待上次执行之后采集的新帧，关闭时直接返回缓冲区中最新的一帧"
+                }),
+                "超时": ("FLOAT", {
+                    "default": 1.0,
+                    "min": 0.01,
+                    "max": 10.0,
+                    "step": 0.01,
+                    "display": "number",
+                    "tooltip": "等待图像的最长时间（秒）"
+                }),
+                "缓冲帧数": ("INT", {
+                    "default": 4,
+                    "min": 2,
+                    "max": 64,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "环形缓冲区的帧数，缓冲区满时覆盖最旧的帧"
+                }),
+            },
         }
 
-    RETURN_TYPES = ("CVIMAGE","FLOAT")
-    RETURN_NAMES = ("图像输出","时间戳")
+    RETURN_TYPES = ("CVIMAGE","FLOAT","FLOAT","INT")
+    RETURN_NAMES = ("图像输出","时间戳","帧率","丢帧数")
 
-    OUTPUT_TOOLTIPS = ("openCV(ndarray)格式的图片","当前的时间戳")
+    OUTPUT_TOOLTIPS = ("openCV(ndarray)格式的图片","该帧的采集时间戳","摄像头实际采集帧率","被新帧覆盖、未被取走的累计帧数")
+    NOT_IDEMPOTENT = True
 
-    def process(self, 摄像头索引, 宽度, 高度):
+    def process(self, 摄像头索引, 宽度, 高度, 等待新帧=True, 超时=1.0, 缓冲帧数=4):
         try:
-            # 如果摄像头未初始化或索引改变，重新初始化
-            if self.cap is None or not self.cap.isOpened():
-                if self.cap is not None:
-                    self.cap.release()
-                self.cap = cv2.VideoCapture(摄像头索引)
-                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 宽度)
-                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 高度)
-                
-            if not self.cap.isOpened():
-                raise Exception(f"无法打开摄像头 {摄像头索引}")
-            
-            # 捕获一帧
-            ret, frame = self.cap.read()
-            
-            if not ret:
-                raise Exception("无法从摄像头读取图像")
-            
-            return (frame,CAM.time)
+            # 如果采集线程未启动、已退出或参数改变，重新获取设备
+            if self.device is None or not self.device.alive or self.device.index != 摄像头索引 \
+                    or self.device.config != (宽度, 高度, 缓冲帧数):
+                if self.device is not None:
+                    self.device.release()
+                    self.device = None
+                self.device = CaptureDevice.acquire(摄像头索引, 宽度, 高度, 缓冲帧数)
+                self.frame_count = 0
+
+            # 取出最新一帧，不等待新帧时也要等到第一帧
+            result = self.device.ring.latest(self.frame_count if 等待新帧 else 0, 超时)
+            if result is None:
+                raise Exception(self.device.error or "等待摄像头图像超时")
+            frame, timestamp, count = result
+
+            if self.frame_count and count > self.frame_count + 1:
+                self.dropped += count - self.frame_count - 1
+            self.frame_count = count
+
+            return (frame, timestamp, self.device.fps, self.dropped)
             
         except Exception as e:
             print(f"摄像头错误: {e}")
             # 返回一个黑色图像作为错误处理
             error_image = np.zeros((高度, 宽度, 3), dtype=np.uint8)
             cv2.putText(error_image, "Camera Error", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            return (error_image,CAM.time)
+            return (error_image, time.time(), 0.0, self.dropped)
     
     @classmethod
-    def IS_CHANGED(s, 摄像头索引, 宽度, 高度):
-        CAM.time = time.time()
-        return CAM.time
+    def IS_CHANGED(s, **kwargs):
+        # 每次执行都取新的一帧
+        return float("NaN")
     
     def __del__(self):
         """析构函数，释放摄像头资源"""
-        if hasattr(self, 'cap') and self.cap is not None:
-            self.cap.release()
+        if getattr(self, 'device', None) is not None:
+            self.device.release()
@@ -0,0 +1,118 @@
+import cv2
+import time
+import numpy as np
+from .capture_runtime import FrameReader
+
+
+class VideoSource:
+    '''
+    视频输入
+    从视频文件或图片文件夹读取图像，后台线程提前解码，可用于离线测试和复现
+    '''
+
+    def __init__(self):
+        self.reader = None
+        self.last = None    # 播放完毕后重复输出最后一帧
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "路径": ("STRING", {
+                    "default": "",
+                    "tooltip": "视频文件路径，或按文件名排序读取的图片文件夹路径"
+                }),
+            },
+            "optional": {
+                "起始帧": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 10000000,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "从第几帧开始读取，修改后重新定位"
+                }),
+                "跳帧": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 100,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "每输出一帧后跳过的帧数，跳过的视频帧不解码"
+                }),
+                "循环播放": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "播放完毕后是否回到起始帧，关闭时重复输出最后一帧"
+                }),
+                "预读帧数": ("INT", {
+                    "default": 8,
+                    "min": 1,
+                    "max": 256,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "预读队列的长度，队列满时解码线程等待"
+                }),
+                "序列帧率": ("FLOAT", {
+                    "default": 30.0,
+                    "min": 1.0,
+                    "max": 1000.0,
+                    "step": 1.0,
+                    "display": "number",
+                    "tooltip": "图片文件夹的帧率，用于计算时间戳；视频文件使用自身帧率"
+                }),
+                "超时": ("FLOAT", {
+                    "default": 5.0,
+                    "min": 0.01,
+                    "max": 60.0,
+                    "step": 0.01,
+                    "display": "number",
+                    "tooltip": "等待解码的最长时间（秒）"
+                }),
+            },
+        }
+
+    RETURN_TYPES = ("CVIMAGE","FLOAT","FLOAT","INT")
+    RETURN_NAMES = ("图像输出","时间戳","解码帧率","帧序号")
+
+    OUTPUT_TOOLTIPS = ("openCV(ndarray)格式的图片","该帧在视频中的时间（秒）","解码线程的吞吐率（帧/秒）","该帧在视频或文件夹中的序号")
+    NOT_IDEMPOTENT = True
+
+    def process(self, 路径, 起始帧=0, 跳帧=0, 循环播放=True, 预读帧数=8, 序列帧率=30.0, 超时=5.0):
+        try:
+            # 参数改变时重新打开文件并定位
+            config = (路径, 起始帧, 跳帧 + 1, 循环播放, 预读帧数, 序列帧率)
+            if self.reader is None or self.reader.config != config:
+                if self.reader is not None:
+                    self.reader.close()
+                    self.reader = None
+                self.last = None
+                self.reader = FrameReader(*config)
+
+            item = self.reader.read(超时)
+            if item is None:
+                if self.reader.error:
+                    raise Exception(self.reader.error)
+                if self.last is None:
+                    raise Exception("没有可读取的帧")
+                item = self.last
+            self.last = item
+
+            frame, timestamp, index = item
+            return (frame, timestamp, self.reader.decode_fps, index)
+
+        except Exception as e:
+            print(f"视频输入错误: {e}")
+            # 返回一个黑色图像作为错误处理
+            error_image = np.zeros((480, 640, 3), dtype=np.uint8)
+            cv2.putText(error_image, "Video Error", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            return (error_image, time.time(), 0.0, -1)
+
+    @classmethod
+    def IS_CHANGED(s, **kwargs):
+        # 每次执行都取下一帧
+        return float("NaN")
+
+    def __del__(self):
+        """析构函数，停止解码线程"""
+        if getattr(self, 'reader', None) is not None:
+            self.reader.close()
@@ -0,0 +1,278 @@
+import os
+import cv2
+import time
+import queue
+import atexit
+import weakref
+import threading
+import numpy as np
+
+
+class FrameRing:
+    """
+    预分配的帧环形缓冲区，采集线程依次写入各个槽位，读取方取最新一帧
+    读取方取走的帧直接交给读取方，不拷贝，采集线程之后写到该槽位时重新分配内存，已取走的帧不会被覆盖
+    因此只有被取走的帧需要分配一次内存，没有被取走、被新帧覆盖的帧复用槽位
+    """
+    def __init__(self, size:int):
+        self.slots:list[np.ndarray] = [None] * max(size, 2)
+        self.timestamps:list[float] = [0.0] * len(self.slots)
+        self.lent:list[bool] = [False] * len(self.slots)    # 槽位中的帧是否已交给读取方
+        self.count:int = 0    # 已写入的帧数，同时作为帧序号
+        self.closed:bool = False
+        self.condition = threading.Condition()
+
+    def slot(self) -> np.ndarray:
+        """下一个待写入的槽位，作为 read 的输出参数复用内存，首轮或帧已被取走时为 None"""
+        with self.condition:
+            index = self.count % len(self.slots)
+            if self.lent[index]:
+                self.slots[index] = None
+                self.lent[index] = False
+            return self.slots[index]
+
+    def commit(self, frame:np.ndarray, timestamp:float) -> None:
+        """写入一帧并唤醒等待的读取方"""
+        with self.condition:
+            index = self.count % len(self.slots)
+            self.slots[index] = frame
+            self.timestamps[index] = timestamp
+            self.lent[index] = False
+            self.count += 1
+            self.condition.notify_all()
+
+    def close(self) -> None:
+        """关闭缓冲区，唤醒全部等待的读取方"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def latest(self, after:int=0, timeout:float=None) -> tuple[np.ndarray,float,int]:
+        """
+        等待序号大于 after 的帧，返回最新一帧、时间戳和帧序号
+        同一帧只交给第一个读取方，之后再取同一帧（多个节点共享设备或不等待新帧时）返回副本
+        超时或缓冲区关闭时返回 None
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.closed or self.count > after, timeout):
+                return None
+            if self.count <= after:
+                return None
+            # 持有锁时采集线程无法提交新帧，只会写入下一个槽位，最新槽位不会被覆盖
+            index = (self.count - 1) % len(self.slots)
+            frame = self.slots[index]
+            if self.lent[index]:
+                frame = frame.copy()
+            self.lent[index] = True
+            return frame, self.timestamps[index], self.count
+
+
+class CaptureDevice:
+    """摄像头采集线程，每个设备只打开一次，由所有使用该设备的节点共享，共享的节点必须使用相同的参数"""
+    devices:dict[int,'CaptureDevice'] = dict()
+    lock = threading.Lock()
+
+    def __init__(self, index:int, width:int, height:int, buffer_size:int):
+        self.index:int = index
+        self.config:tuple = (width, height, buffer_size)
+        self.refs:int = 0
+        self.fps:float = 0.0
+        self.error:str = None
+
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if not self.cap.isOpened():
+            self.cap.release()
+            raise Exception(f"无法打开摄像头 {index}")
+
+        self.ring = FrameRing(buffer_size)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def loop(self) -> None:
+        """采集线程：持续读取帧写入环形缓冲区，并统计实际帧率"""
+        last = None
+        try:
+            while not self.stop_event.is_set():
+                ret, frame = self.cap.read(self.ring.slot())
+                now = time.time()
+                if not ret:
+                    self.error = "无法从摄像头读取图像"
+                    break
+                if last is not None and now > last:
+                    # 指数滑动平均，平滑单帧间隔的抖动
+                    self.fps = 1.0 / (now - last) if self.fps == 0 else 0.9 * self.fps + 0.1 / (now - last)
+                last = now
+                self.ring.commit(frame, now)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.ring.close()
+            self.cap.release()
+
+    @property
+    def alive(self) -> bool:
+        return self.thread.is_alive() and not self.ring.closed
+
+    def close(self) -> None:
+        """停止采集线程并释放摄像头"""
+        self.stop_event.set()
+        self.ring.close()
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+
+    @classmethod
+    def acquire(cls, index:int, width:int, height:int, buffer_size:int) -> 'CaptureDevice':
+        """获取设备的采集线程，线程已退出时重新打开设备；设备正被其他节点以不同参数使用时抛出异常"""
+        with cls.lock:
+            device = cls.devices.get(index)
+            if device is not None and device.alive and device.config != (width, height, buffer_size):
+                opened_width, opened_height, opened_buffer = device.config
+                raise Exception(f"摄像头 {index} 已被其他节点以 {opened_width}x{opened_height}、缓冲 {opened_buffer} 帧打开，"
+                                f"使用同一摄像头的节点参数必须一致")
+            if device is not None and not device.alive:
+                device.close()
+                device = None
+            if device is None:
+                device = cls.devices[index] = CaptureDevice(index, width, height, buffer_size)
+            device.refs += 1
+            return device
+
+    def release(self) -> None:
+        """释放一个引用，没有节点使用时关闭设备"""
+        with CaptureDevice.lock:
+            self.refs -= 1
+            if self.refs > 0:
+                return
+            if CaptureDevice.devices.get(self.index) is self:
+                del CaptureDevice.devices[self.index]
+        self.close()
+
+
+class FrameReader:
+    """视频文件或图片文件夹的预读线程，提前解码帧放入有界队列"""
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+    readers:'weakref.WeakSet[FrameReader]' = weakref.WeakSet()
+
+    def __init__(self, path:str, start:int=0, step:int=1, loop:bool=False, queue_size:int=8, fps:float=30.0):
+        self.config:tuple = (path, start, step, loop, queue_size, fps)
+        self.start:int = start
+        self.step:int = max(step, 1)
+        self.loop:bool = loop
+        self.decode_fps:float = 0.0    # 解码吞吐率，只统计解码耗时，不含等待队列的时间
+        self.error:str = None
+
+        self.cap = None
+        self.files:list[str] = None
+        if os.path.isdir(path):
+            self.files = sorted(os.path.join(path, file) for file in os.listdir(path)
+                                if os.path.splitext(file)[1].lower() in FrameReader.IMAGE_EXTENSIONS)
+            if not self.files:
+                raise Exception(f"文件夹中没有图片: {path}")
+            self.fps:float = fps
+        elif os.path.isfile(path):
+            self.cap = cv2.VideoCapture(path)
+            if not self.cap.isOpened():
+                self.cap.release()
+                raise Exception(f"无法打开视频文件: {path}")
+            self.fps:float = self.cap.get(cv2.CAP_PROP_FPS) or fps
+        else:
+            raise Exception(f"路径不存在: {path}")
+
+        self.queue:queue.Queue = queue.Queue(maxsize=max(queue_size, 1))
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.loop_frames, daemon=True)
+        self.thread.start()
+        FrameReader.readers.add(self)
+
+    def seek(self, index:int) -> None:
+        """视频定位到指定帧"""
+        if self.cap is not None:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+
+    def decode(self, index:int) -> np.ndarray:
+        """解码第 index 帧并跳过之后的 step-1 帧，读到末尾时返回 None"""
+        if self.files is not None:
+            if index >= len(self.files):
+                return None
+            frame = cv2.imread(self.files[index], cv2.IMREAD_COLOR)
+            if frame is None:
+                raise Exception(f"无法读取图片: {self.files[index]}")
+            return frame
+
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        # 跳过的帧只 grab 不解码
+        for _ in range(self.step - 1):
+            if not self.cap.grab():
+                break
+        return frame
+
+    def put(self, item:any) -> None:
+        """放入队列，队列满时阻塞，读取线程停止时放弃"""
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def loop_frames(self) -> None:
+        """预读线程：按顺序解码帧放入队列，到达末尾时循环或结束"""
+        index = self.start
+        decoded = 0    # 本轮解码的帧数，用于避免空视频无限循环
+        try:
+            self.seek(index)
+            while not self.stop_event.is_set():
+                begin = time.perf_counter()
+                frame = self.decode(index)
+                elapsed = time.perf_counter() - begin
+
+                if frame is None:
+                    if self.loop and decoded > 0:
+                        index, decoded = self.start, 0
+                        self.seek(index)
+                        continue
+                    break
+
+                if elapsed > 0:
+                    fps = 1.0 / elapsed
+                    self.decode_fps = fps if self.decode_fps == 0 else 0.9 * self.decode_fps + 0.1 * fps
+                self.put((frame, index / self.fps, index))
+                index += self.step
+                decoded += 1
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            # None 表示没有更多的帧
+            self.put(None)
+            if self.cap is not None:
+                self.cap.release()
+
+    def read(self, timeout:float=None) -> tuple[np.ndarray,float,int]:
+        """取出下一帧及其时间戳和帧序号，已播放完毕时返回 None，超时抛出异常"""
+        try:
+            item = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            raise Exception("等待解码超时")
+        if item is None:
+            # 保留结束标记，之后的读取同样返回 None
+            self.queue.put_nowait(None)
+        return item
+
+    def close(self) -> None:
+        """停止预读线程"""
+        self.stop_event.set()
+        self.thread.join(timeout=1.0)
+
+
+@atexit.register
+def close_all_sources() -> None:
+    """解释器退出前停止全部采集和预读线程，避免线程停在 OpenCV 调用中时进程被强制终止"""
+    for device in list(CaptureDevice.devices.values()):
+        device.close()
+    for reader in list(FrameReader.readers):
+        reader.close()
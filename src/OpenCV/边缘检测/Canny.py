@@ -1,5 +1,6 @@
 import cv2
 import numpy as np
+from ..cv_runtime import BufferPool, downscale, to_gray, from_gray
 
 class Canny:
     '''
@@ -7,6 +8,9 @@ class Canny:
     Canny算法是一种经典的边缘检测算法，能够检测图像中的边缘信息
     '''
     
+    def __init__(self):
+        self.buffers = BufferPool()
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
@@ -39,23 +43,38 @@ class Canny:
                     "tooltip": "是否使用L2梯度计算方式（更精确但计算量大）"
                 }),
             },
+            "optional": {
+                "缩放比例": ("FLOAT", {
+                    "default": 1.0,
+                    "min": 0.1,
+                    "max": 1.0,
+                    "step": 0.05,
+                    "display": "number",
+                    "tooltip": "在按此比例缩小的图像上检测边缘，结果按最近邻放大回原分辨率；比例越小越快，边缘越粗、位置精度越低，1.0 表示原分辨率"
+                }),
+                "复用输出缓冲": (["是", "否"], {
+                    "default": "是",
+                    "tooltip": "输出写入节点持有的缓冲区，下次执行时被覆盖；后续节点需要长期保留结果时选否；流水线模式编译时自动关闭"
+                }),
+            },
         }
 
     RETURN_TYPES = ("CVIMAGE",)
     RETURN_NAMES = ("图像输出",)
     OUTPUT_TOOLTIPS = ("Canny边缘检测处理后的图像",)
 
-    def process(self, 图像输入, 低阈值, 高阈值, 核大小, L2梯度):
+    def process(self, 图像输入, 低阈值, 高阈值, 核大小, L2梯度, 缩放比例=1.0, 复用输出缓冲="是"):
         try:
             # 检查输入图像
             if 图像输入 is None:
                 raise Exception("输入图像为空")
             
-            # 转换为灰度图像（如果不是灰度图）
-            if len(图像输入.shape) == 3:
-                gray = cv2.cvtColor(图像输入, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = 图像输入.copy()
+            # 转换为灰度图像（如果不是灰度图），灰度输入直接使用，不拷贝
+            reuse = 复用输出缓冲 == "是"
+            color = len(图像输入.shape) == 3
+            gray = to_gray(图像输入, self.buffers.get("gray", 图像输入.shape[:2], 图像输入.dtype) if color else None)
+            # 彩色输入时二值结果还要转换回输入的通道数，单通道结果只是中间缓冲区
+            dst = self.buffers.get("edges", gray.shape, gray.dtype) if color else self.buffers.output(gray.shape, gray.dtype, reuse)
             
             # 确保高阈值大于低阈值
             if 高阈值 <= 低阈值:
@@ -67,18 +86,22 @@ class Canny:
             # 设置L2梯度参数
             use_l2_gradient = True if L2梯度 == "是" else False
             
-            # 应用Canny边缘检测
+            # 应用Canny边缘检测，缩放时在小图上检测后放大回原分辨率，最后一步的结果写入复用的输出缓冲区
+            small = downscale(gray, 缩放比例, self.buffers)
             edges = cv2.Canny(
-                gray,
+                small,
                 低阈值,
                 高阈值,
+                edges=dst if small is gray else self.buffers.get("small_edges", small.shape),
                 apertureSize=核大小,
                 L2gradient=use_l2_gradient
             )
+            if small is not gray:
+                edges = cv2.resize(edges, (gray.shape[1], gray.shape[0]), dst=dst, interpolation=cv2.INTER_NEAREST)
             
-            # 转换回3通道图像以保持一致性
-            if len(图像输入.shape) == 3:
-                edges = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
+            # 转换回与输入相同的通道数以保持一致性
+            if color:
+                edges = from_gray(edges, 图像输入, self.buffers.output(图像输入.shape, 图像输入.dtype, reuse))
             
             return (edges,)
             
@@ -0,0 +1,183 @@
+import cv2
+from ..cv_runtime import MORPH_OPS, BufferPool, get_kernel, to_gray
+
+class PreprocessChain:
+    '''
+    预处理链
+    在一个节点内依次完成灰度转换、滤波、二值化/边缘检测和形态学操作，全程保持单通道并复用缓冲区，没有中间拷贝
+    '''
+
+    def __init__(self):
+        self.buffers = BufferPool()
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "图像输入": ("CVIMAGE", {
+                    "tooltip": "输入的openCV格式图像，彩色图像只在第一步转换一次灰度"
+                }),
+                "滤波方法": (["无", "高斯", "均值", "中值", "双边"], {
+                    "default": "高斯",
+                    "tooltip": "第一步：平滑滤波"
+                }),
+                "滤波核大小": ("INT", {
+                    "default": 5,
+                    "min": 1,
+                    "max": 99,
+                    "step": 2,
+                    "display": "number",
+                    "tooltip": "滤波核的大小（双边滤波为滤波直径），必须为奇数"
+                }),
+                "二值化方法": (["无", "Canny", "一般二值化", "OTSU", "自适应均值", "自适应高斯"], {
+                    "default": "Canny",
+                    "tooltip": "第二步：边缘检测或二值化"
+                }),
+                "形态学操作": (["无", "腐蚀", "膨胀", "开运算", "闭运算", "形态学梯度"], {
+                    "default": "无",
+                    "tooltip": "第三步：形态学操作"
+                }),
+            },
+            "optional": {
+                "低阈值": ("INT", {
+                    "default": 50,
+                    "min": 0,
+                    "max": 255,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "Canny算法的低阈值"
+                }),
+                "高阈值": ("INT", {
+                    "default": 150,
+                    "min": 0,
+                    "max": 255,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "Canny算法的高阈值"
+                }),
+                "阈值": ("INT", {
+                    "default": 127,
+                    "min": 0,
+                    "max": 255,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "一般二值化的阈值"
+                }),
+                "邻域大小": ("INT", {
+                    "default": 11,
+                    "min": 3,
+                    "max": 255,
+                    "step": 2,
+                    "display": "number",
+                    "tooltip": "自适应二值化的邻域大小，必须为奇数"
+                }),
+                "常数C": ("FLOAT", {
+                    "default": 2.0,
+                    "min": -50.0,
+                    "max": 50.0,
+                    "step": 0.1,
+                    "display": "number",
+                    "tooltip": "自适应二值化从均值或加权均值中减去的常数"
+                }),
+                "反转": (["否", "是"], {
+                    "default": "否",
+                    "tooltip": "二值化结果是否黑白互换（对Canny无效）"
+                }),
+                "核形状": (["矩形", "椭圆", "十字"], {
+                    "default": "矩形",
+                    "tooltip": "形态学操作的结构元素形状"
+                }),
+                "形态学核大小": ("INT", {
+                    "default": 3,
+                    "min": 3,
+                    "max": 27,
+                    "step": 2,
+                    "display": "number",
+                    "tooltip": "结构元素的大小，必须为奇数"
+                }),
+                "迭代次数": ("INT", {
+                    "default": 1,
+                    "min": 1,
+                    "max": 30,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "形态学操作的迭代次数"
+                }),
+                "输出三通道": (["否", "是"], {
+                    "default": "否",
+                    "tooltip": "是否把单通道结果转换为三通道，后续节点都支持单通道时保持否"
+                }),
+                "复用输出缓冲": (["是", "否"], {
+                    "default": "是",
+                    "tooltip": "输出写入节点持有的缓冲区，下次执行时被覆盖；后续节点需要长期保留结果时选否；流水线模式编译时自动关闭"
+                }),
+            },
+        }
+
+    RETURN_TYPES = ("CVIMAGE",)
+    RETURN_NAMES = ("图像输出",)
+    OUTPUT_TOOLTIPS = ("预处理后的图像，默认为单通道",)
+
+    def process(self, 图像输入, 滤波方法, 滤波核大小, 二值化方法, 形态学操作, 低阈值=50, 高阈值=150, 阈值=127, 邻域大小=11,
+                常数C=2.0, 反转="否", 核形状="矩形", 形态学核大小=3, 迭代次数=1, 输出三通道="否", 复用输出缓冲="是"):
+        try:
+            # 检查输入图像
+            if 图像输入 is None:
+                raise Exception("输入图像为空")
+
+            # 确保核大小为奇数
+            滤波核大小 += 1 - 滤波核大小 % 2
+            邻域大小 += 1 - 邻域大小 % 2
+            形态学核大小 += 1 - 形态学核大小 % 2
+
+            # 组装操作链，每一步从 src 读取、写入 dst
+            stages = []
+            if 图像输入.ndim == 3:
+                stages.append(lambda src, dst: to_gray(src, dst))
+
+            if 滤波方法 == "高斯":
+                stages.append(lambda src, dst: cv2.GaussianBlur(src, (滤波核大小, 滤波核大小), 0, dst=dst))
+            elif 滤波方法 == "均值":
+                stages.append(lambda src, dst: cv2.blur(src, (滤波核大小, 滤波核大小), dst=dst))
+            elif 滤波方法 == "中值":
+                stages.append(lambda src, dst: cv2.medianBlur(src, 滤波核大小, dst=dst))
+            elif 滤波方法 == "双边":
+                stages.append(lambda src, dst: cv2.bilateralFilter(src, 滤波核大小, 75, 75, dst=dst))
+
+            thresh_type = cv2.THRESH_BINARY_INV if 反转 == "是" else cv2.THRESH_BINARY
+            if 二值化方法 == "Canny":
+                low, high = 低阈值, max(高阈值, 低阈值 + 1)
+                stages.append(lambda src, dst: cv2.Canny(src, low, high, edges=dst))
+            elif 二值化方法 == "一般二值化":
+                stages.append(lambda src, dst: cv2.threshold(src, 阈值, 255, thresh_type, dst=dst)[1])
+            elif 二值化方法 == "OTSU":
+                stages.append(lambda src, dst: cv2.threshold(src, 0, 255, thresh_type + cv2.THRESH_OTSU, dst=dst)[1])
+            elif 二值化方法 in ("自适应均值", "自适应高斯"):
+                method = cv2.ADAPTIVE_THRESH_MEAN_C if 二值化方法 == "自适应均值" else cv2.ADAPTIVE_THRESH_GAUSSIAN_C
+                stages.append(lambda src, dst: cv2.adaptiveThreshold(src, 255, method, thresh_type, 邻域大小, 常数C, dst=dst))
+
+            if 形态学操作 in MORPH_OPS:
+                kernel = get_kernel(核形状, 形态学核大小)
+                stages.append(lambda src, dst: cv2.morphologyEx(src, MORPH_OPS[形态学操作], kernel, dst=dst, iterations=迭代次数))
+
+            # 中间结果在两个缓冲区之间交替，最后一步写入输出缓冲区
+            reuse = 复用输出缓冲 == "是"
+            three_channel = 输出三通道 == "是"
+            shape = 图像输入.shape[:2]
+            result = 图像输入
+            for index, stage in enumerate(stages):
+                if index < len(stages) - 1 or three_channel:
+                    dst = self.buffers.get("ab"[index % 2], shape)
+                else:
+                    dst = self.buffers.get("output", shape) if reuse else None
+                result = stage(result, dst)
+
+            if three_channel:
+                dst = self.buffers.get("output", shape + (3,)) if reuse else None
+                result = cv2.cvtColor(result, cv2.COLOR_GRAY2BGR, dst=dst)
+
+            return (result,)
+
+        except Exception as e:
+            print(f"预处理链错误: {e}")
+            return (图像输入,)
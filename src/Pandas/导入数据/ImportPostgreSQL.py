@@ -38,6 +38,7 @@ class ImportPostgreSQL:
 
     RETURN_TYPES = ("DATAFRAME",)
     RETURN_NAMES = ("数据帧",)
+    NOT_IDEMPOTENT = True
 
     def process(self, 主机, 端口, 数据库名, 用户名, 密码, SQL查询):
         try:
@@ -17,6 +17,7 @@ class ReadCSV:
 
     RETURN_TYPES = ("DATAFRAME",)
     RETURN_NAMES = ("数据帧",)
+    NOT_IDEMPOTENT = True
 
     def process(self, 文件路径):
         dataframe = pd.read_csv(文件路径.strip('\'\" '))
@@ -1,5 +1,6 @@
-import os, importlib, pathlib, inspect
+import os, sys, importlib, pathlib, inspect, ast, textwrap
 from io import StringIO
+from collections import deque
 
 class IPort_info:
     """输入端口信息类"""
@@ -43,8 +44,11 @@ class Node_info:
         self.name:str = node[1]['_meta']['title']
 
         self.cls:any = None
+        self.source:str = ''
         self.dependency:set[str] = set()
+        self.local_modules:list[str] = list()
         self.deepth:int = None
+        self.is_const:bool = False
 
         self.input_port:list[IPort_info] = list()
         for port in inputs.items():
@@ -53,26 +57,35 @@ class Node_info:
 
         self.output_port:list[OPort_info] = list()
     
-    def parse_cls(self, cls:any, file_path:str) -> None:
+    def parse_cls(self, entry:'Class_info') -> None:
         """解析节点类，提取依赖和输出端口信息"""
-        self.cls = cls
-
-        with open(file_path, 'r', encoding='utf-8') as file:
-            text = file.read()
-
-        err_line = 0    
-        for line in text.splitlines():
-            if 'import' in line:
-                self.dependency.add(line.strip())
-            else:
-                err_line += 1
-                if err_line >= 3:
-                    # 连续 3 行都没有import关键字
-                    break
+        self.cls = entry.cls
+        self.source = entry.source
+        self.dependency = set(entry.dependency)
+        self.local_modules = list(entry.local_modules)
         
-        for index, port_name in enumerate(cls.RETURN_NAMES):
+        for index, port_name in enumerate(self.cls.RETURN_NAMES):
             self.output_port.append(OPort_info(port_name,[self.id,index]))
 
+    def is_output(self) -> bool:
+        """判断节点是否为输出节点"""
+        return getattr(self.cls, 'OUTPUT_NODE', False)
+
+    def is_volatile(self) -> bool:
+        """判断节点在输入不变时输出是否可能变化，遵循 ComfyUI 的缓存语义"""
+        if self.is_output() or getattr(self.cls, 'NOT_IDEMPOTENT', False):
+            return True
+        if not hasattr(self.cls, 'IS_CHANGED'):
+            return False
+        if any(not port.is_widget for port in self.input_port):
+            return True
+        try:
+            changed = self.cls.IS_CHANGED(**{port.name: port.value for port in self.input_port})
+        except Exception:
+            return True
+        # IS_CHANGED 返回 NaN 表示每次都需要重新执行
+        return changed != changed
+
     def get_links(self) -> list[list[str,str]]:
         """获取节点的连接关系"""
         return [[port.link[0],self.id] for port in self.input_port if not port.is_widget]
@@ -82,29 +95,252 @@ class Node_info:
 
         input_code = ', '.join([f'{port.name}={port.get_var()}' for port in self.input_port])
         output_code = ', '.join([port.get_var() for port in self.output_port]) + (', ' if len(self.output_port) == 1 else '')
-        func_code = 'process_local' if 'process_local' in self.cls.__dict__ else 'process'
+        func_code = self.get_func()
 
         if output_code:
             return f'{output_code} = _node_{self.name}_{self.id}_.{func_code}({input_code})\n'
         else:
             return f'_node_{self.name}_{self.id}_.{func_code}({input_code})\n'
+
+    def get_func(self) -> str:
+        """获取编译脚本中调用的节点方法名"""
+        return 'process_local' if 'process_local' in self.cls.__dict__ else 'process'
+
+    def get_task_code(self) -> str:
+        """生成节点任务的声明代码，供并行运行时调度"""
+        links_code = ', '.join([f"'{port.name}': '{port.get_var()}'" for port in self.input_port if not port.is_widget])
+        widgets_code = ', '.join([f"'{port.name}': {port.get_var()}" for port in self.input_port if port.is_widget])
+        outputs_code = ', '.join([f"'{port.get_var()}'" for port in self.output_port])
+        func_code = self.get_func()
+
+        main_thread = func_code == 'process_local'
+        stateless = not main_thread and '__init__' not in self.cls.__dict__
+
+        return (f"NodeTask('{self.id}', _node_{self.name}_{self.id}_, '{func_code}', "
+                f"{{{links_code}}}, {{{widgets_code}}}, [{outputs_code}], "
+                f"main_thread={main_thread}, stateless={stateless}, pyplot={self.uses_pyplot()})")
+
+    def uses_pyplot(self) -> bool:
+        """节点所在模块是否导入了 matplotlib.pyplot，pyplot 不是线程安全的，并行执行时这些节点需要互斥"""
+        pyplot = sys.modules.get('matplotlib.pyplot')
+        module = sys.modules.get(self.cls.__module__)
+        return pyplot is not None and module is not None and any(value is pyplot for value in vars(module).values())
   
+class Module_info:
+    """本地模块信息类，拆分模块中的导入语句和定义代码，用于内联到编译脚本"""
+    cache:dict[str,'Module_info'] = dict()
+
+    def __init__(self, file_path:str):
+        self.file_path:str = file_path
+        self.mtime:float = os.stat(file_path).st_mtime
+
+        self.dependency:set[str] = set()
+        self.local_modules:list[str] = list()
+        self.definitions:dict[str,str] = dict()
+
+        with open(file_path, 'r', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+
+        statements:list[str] = list()
+        for statement in ast.parse('\n'.join(lines)).body:
+            start = min([statement.lineno] + [decorator.lineno for decorator in getattr(statement, 'decorator_list', [])])
+            segment = '\n'.join(lines[start - 1:statement.end_lineno])
+            if isinstance(statement, ast.ImportFrom) and statement.level > 0:
+                # 相对导入的是本地模块，编译时内联其代码
+                self.local_modules.append(self.resolve(statement))
+            elif isinstance(statement, (ast.Import, ast.ImportFrom)):
+                self.dependency.add(segment)
+            else:
+                statements.append(segment)
+                if isinstance(statement, (ast.FunctionDef, ast.ClassDef)):
+                    self.definitions[statement.name] = segment
+        self.code:str = '\n\n'.join(statements)
+
+    def resolve(self, statement:ast.ImportFrom) -> str:
+        """解析相对导入语句对应的模块文件路径"""
+        if statement.module is None:
+            raise Exception(f'{self.file_path} 中不支持的相对导入，请使用 from .模块 import 名称')
+        dir = os.path.dirname(self.file_path)
+        for _ in range(statement.level - 1):
+            dir = os.path.dirname(dir)
+        return os.path.join(dir, *statement.module.split('.')) + '.py'
+
+    @classmethod
+    def load(cls, file_path:str) -> 'Module_info':
+        """读取模块信息，源文件未修改时使用缓存"""
+        info = cls.cache.get(file_path)
+        if info is None or info.mtime != os.stat(file_path).st_mtime:
+            info = cls.cache[file_path] = Module_info(file_path)
+        return info
+
+class Class_info:
+    """节点类索引条目，缓存节点类、源代码和依赖，源文件修改后重新导入"""
+    def __init__(self, name:str, module_name:str, file_path:str):
+        self.name:str = name
+        self.module_name:str = module_name
+        self.file_path:str = file_path
+
+        self.cls:any = None
+        self.source:str = ''
+        self.dependency:set[str] = set()
+        self.local_modules:list[str] = list()
+        self.mtime:float = None
+
+    def load(self) -> None:
+        """导入节点模块并解析，已导入且源文件未修改时直接使用缓存"""
+        mtime = os.stat(self.file_path).st_mtime
+        if self.cls is not None and mtime == self.mtime:
+            return
+
+        module = importlib.import_module(self.module_name)
+        if self.cls is not None:
+            module = importlib.reload(module)
+        self.cls = getattr(module, self.name)
+
+        module_info = Module_info.load(self.file_path)
+        self.dependency = module_info.dependency
+        self.local_modules = module_info.local_modules
+
+        self.source = inspect.getsource(self.cls)
+        self.mtime = mtime
+
+class Node_index:
+    """节点类索引，只遍历一次节点目录，节点模块在首次编译用到时才导入"""
+    def __init__(self, prefix:str, nodes_path:str, package:str):
+        self.entries:dict[str,Class_info] = dict()
+
+        def is_python_file(path):
+            """检查是否为有效的Python文件"""
+            return (os.path.isfile(path) 
+                    and os.path.splitext(path)[1] == '.py' 
+                    and not '__' in pathlib.Path(path).stem)
+
+        def is_valid_dir(path):
+            """检查是否为有效的目录"""
+            return (os.path.isdir(path) 
+                    and not '__' in pathlib.Path(path).stem)
+
+        def index_nodes_from_dir(dir):
+            """从目录中递归索引节点"""
+            script_dir = os.path.dirname(os.path.realpath(__file__))
+            for file in os.listdir(os.path.join(script_dir,dir[2:])):
+                rel_path = os.path.join(dir,file)
+                full_path = os.path.join(script_dir,rel_path[2:])
+
+                if is_python_file(full_path):
+                    module_name = package + '.' + (rel_path
+                                                   .replace('./','')
+                                                   .replace('\\','.')
+                                                   .replace('/','.')
+                                                   .replace('.py',''))
+                    # 节点类名与文件名一致
+                    cls_name = pathlib.Path(full_path).stem
+                    self.entries[f'{prefix}_{cls_name}'] = Class_info(cls_name, module_name, full_path)
+
+                elif is_valid_dir(full_path):
+                    index_nodes_from_dir(rel_path)
+
+        index_nodes_from_dir(nodes_path)
+
+    def get(self, type:str) -> Class_info:
+        """按节点类型名获取索引条目，不存在时返回 None"""
+        entry = self.entries.get(type)
+        if entry is not None:
+            entry.load()
+        return entry
+
+class Graph_info:
+    """工作流图结构类，维护节点索引与邻接表"""
+    def __init__(self, nodes:list[Node_info]):
+        self.nodes:list[Node_info] = nodes
+        self.index:dict[str,Node_info] = {node.id: node for node in nodes}
+        self.successors:dict[str,list[str]] = {node.id: list() for node in nodes}
+        self.predecessors:dict[str,list[str]] = {node.id: list() for node in nodes}
+
+        for node in nodes:
+            for start, end in node.get_links():
+                if start not in self.index:
+                    raise Exception(f'节点 {node.name}({node.id}) 连接到不存在的节点 {start}')
+                self.successors[start].append(end)
+                self.predecessors[end].append(start)
+
+    def topological_levels(self) -> dict[str,int]:
+        """使用 Kahn 算法计算节点的层深度（到源节点的最长路径），存在环时抛出异常"""
+        in_degree:dict[str,int] = {id: len(preds) for id, preds in self.predecessors.items()}
+        depth:dict[str,int] = {id: 0 for id in self.index}
+        queue:deque[str] = deque(id for id, degree in in_degree.items() if degree == 0)
+
+        visited = 0
+        while queue:
+            id = queue.popleft()
+            visited += 1
+            for succ in self.successors[id]:
+                depth[succ] = max(depth[succ], depth[id] + 1)
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    queue.append(succ)
+
+        if visited < len(self.index):
+            cycle = self.find_cycle_nodes({id for id, degree in in_degree.items() if degree > 0})
+            raise Exception('工作流中存在循环依赖: ' + ', '.join(f'{self.index[id].name}({id})' for id in cycle))
+
+        return depth
+
+    def find_cycle_nodes(self, remaining:set[str]) -> list[str]:
+        """从 Kahn 算法剩余的节点中剔除仅位于环下游的节点，返回环上的节点"""
+        out_degree:dict[str,int] = {id: sum(succ in remaining for succ in self.successors[id]) for id in remaining}
+        queue:deque[str] = deque(id for id, degree in out_degree.items() if degree == 0)
+        while queue:
+            id = queue.popleft()
+            remaining.discard(id)
+            for pred in self.predecessors[id]:
+                if pred in remaining:
+                    out_degree[pred] -= 1
+                    if out_degree[pred] == 0:
+                        queue.append(pred)
+        return [node.id for node in self.nodes if node.id in remaining]
+
 class Compiler():
     """编译器主类，负责将工作流转换为Python代码"""
-    def __init__(self, workflow:dict, output_file:StringIO):
+    MODES:tuple[str] = ('sequential', 'parallel', 'dataflow', 'pipeline')
+    # 节点输出写入自身缓冲区的开关，流水线模式下强制关闭
+    REUSE_BUFFER_INPUT:str = '复用输出缓冲'
+
+    # 节点类索引在进程内共享，首次编译时建立
+    index:Node_index = None
+
+    def __init__(self, workflow:dict, output_file:StringIO, mode:str='sequential', options:dict=None):
+        if mode not in self.MODES:
+            raise Exception(f'未知的编译模式: {mode}')
+
         # code section
         self.dependency_code:str = ''
+        self.local_module_code:str = ''
         self.node_class_code:str = ''
+        self.runtime_code:str = ''
         self.statement_code:str = ''
         self.main_code:str = ''
+        self.entry_code:str = ''    # 运行时模式中放入 __main__ 保护块的代码
+
+        # 编译模式：sequential 顺序执行，parallel 层级并行执行，dataflow 数据流执行，pipeline 多帧流水线执行
+        self.mode:str = mode
+        self.options:dict = options or dict()
+        self.module_dependency:set[str] = set()
+
+        # 优化：消除死节点，并将常量节点移出主循环
+        self.optimize:bool = self.options.get('optimize', False)
+        self.eliminated:list[Node_info] = list()
+        self.folded:list[Node_info] = list()
 
         self.nodes:list[Node_info] = list()
         for node in workflow.items():
             self.nodes.append(Node_info(node))
+        self.graph:Graph_info = None
 
         self.prefix:str = 'ComfyUI_For_Academic'
         self.nodes_path:str = './'
-        self.file_path:str = f'./custom_nodes/{self.prefix}/src'
+        # 节点模块所在的包，与注册节点时的包名一致
+        self.package:str = __package__
 
         self.output_file:StringIO = output_file
 
@@ -112,8 +348,14 @@ class Compiler():
 
     def compile(self):
         """编译主流程"""
-        self.import_nodes(prefix=self.prefix, nodes_path=self.nodes_path, file_path=self.file_path, nodes=self.nodes)
+        self.import_nodes(prefix=self.prefix, nodes_path=self.nodes_path, package=self.package, nodes=self.nodes)
+        if self.optimize:
+            self.eliminate_dead_nodes()
         self.mark_node_depth()
+        if self.optimize:
+            self.fold_constant_nodes()
+        self.generate_local_module_code()
+        self.generate_runtime_code()
         self.handle_dependency()
         self.generate_node_class_code()
         self.generate_statement_code()
@@ -121,85 +363,72 @@ class Compiler():
 
         self.output_file.write(self.dependency_code)
         self.output_file.write('\n')
+        if self.local_module_code:
+            self.output_file.write(self.local_module_code)
+            self.output_file.write('\n')
         self.output_file.write(self.node_class_code)
         self.output_file.write('\n')
-        self.output_file.write(self.statement_code)
-        self.output_file.write('\n')
+        if self.runtime_code:
+            self.output_file.write(self.runtime_code)
+            self.output_file.write('\n')
+        if self.mode == 'sequential':
+            self.output_file.write(self.statement_code)
+            self.output_file.write('\n')
         self.output_file.write(self.main_code)
 
-    def import_nodes(self, prefix:str, nodes_path:str, file_path:str, nodes:list[Node_info]):
-        """导入节点类并解析"""
-        def is_python_file(path):
-            """检查是否为有效的Python文件"""
-            return (os.path.isfile(path) 
-                    and os.path.splitext(path)[1] == '.py' 
-                    and not '__' in pathlib.Path(path).stem)
-
-        def is_valid_dir(path):
-            """检查是否为有效的目录"""
-            return (os.path.isdir(path) 
-                    and not '__' in pathlib.Path(path).stem)
-
-        def import_nodes_from_dir(dir):
-            """从目录中递归导入节点"""
-            script_dir = os.path.dirname(os.path.realpath(__file__))
-            for file in os.listdir(os.path.join(script_dir,dir[2:])):
-                rel_path = os.path.join(dir,file)
-                full_path = os.path.join(script_dir,rel_path[2:])
-
-                if is_python_file(full_path):
-                    try:
-                        module = importlib.import_module(
-                            os.path.join(file_path,rel_path)
-                            .replace('./','')
-                            .replace('\\','.')
-                            .replace('/','.')
-                            .replace('.py',''))
-
-                        for cls_name,cls in inspect.getmembers(module, inspect.isclass):
-                            if cls_name != pathlib.Path(full_path).stem:
-                                continue
-                            
-                            unique_name = f'{prefix}_{cls_name}'
-                            
-                            for node in nodes:
-                                if node.type == unique_name:
-                                    node.parse_cls(cls, full_path)
-
-                    except Exception as e:
-                        print(e)
-
-                elif is_valid_dir(full_path):
-                    import_nodes_from_dir(rel_path)
-
-        import_nodes_from_dir(nodes_path)
+    def import_nodes(self, prefix:str, nodes_path:str, package:str, nodes:list[Node_info]):
+        """从节点类索引中导入节点类并解析"""
+        if Compiler.index is None:
+            Compiler.index = Node_index(prefix, nodes_path, package)
+
+        for node in nodes:
+            try:
+                entry = Compiler.index.get(node.type)
+            except Exception as e:
+                raise Exception(f'无法导入节点 {node.name}({node.id}): {e}')
+            if entry is None:
+                raise Exception(f'未知的节点类型: {node.type}')
+            node.parse_cls(entry)
     
     def mark_node_depth(self):
         """标记节点的执行深度，用于确定执行顺序"""
-        for node in self.nodes:
-            have_input_link = False
-            for port in node.input_port:
-                if not port.is_widget:
-                    have_input_link = True
-                    break
-            if not have_input_link:
-                node.deepth = 0
-        
-        links:list[list[str,str]] = list()
-        for node in self.nodes:
-            links.extend(node.get_links())
-        
-        while links:
-            for link in links:
-                start_node:Node_info = next(filter(lambda node: node.id == link[0], self.nodes))
-                end_node:Node_info = next(filter(lambda node: node.id == link[1], self.nodes))
-                if start_node.deepth is not None:
-                    end_node.deepth = max(start_node.deepth + 1, end_node.deepth if end_node.deepth is not None else 0)
-                    links.remove(link)
+        self.graph = Graph_info(self.nodes)
+        for id, deepth in self.graph.topological_levels().items():
+            self.graph.index[id].deepth = deepth
+
+    def eliminate_dead_nodes(self):
+        """消除输出无法到达任何输出节点的死节点"""
+        graph = Graph_info(self.nodes)
+        queue:deque[str] = deque(node.id for node in self.nodes if node.is_output())
+        if not queue:
+            # 没有输出节点时无法判断节点是否有用，保留全部节点
+            return
+
+        alive:set[str] = set(queue)
+        while queue:
+            for pred in graph.predecessors[queue.popleft()]:
+                if pred not in alive:
+                    alive.add(pred)
+                    queue.append(pred)
+
+        self.eliminated = [node for node in self.nodes if node.id not in alive]
+        self.nodes = [node for node in self.nodes if node.id in alive]
+
+    def fold_constant_nodes(self):
+        """标记输入全部为控件或常量节点的纯节点，这些节点移出主循环只执行一次"""
+        if not any(node.is_output() for node in self.nodes):
+            return
+
+        for node in sorted(self.nodes, key=lambda node: node.deepth):
+            if node.is_volatile():
+                continue
+            if all(port.is_widget or self.graph.index[port.link[0]].is_const for port in node.input_port):
+                node.is_const = True
+                self.folded.append(node)
 
     def handle_dependency(self):
         """处理依赖包，生成自动安装代码"""
-        dependency:set[str] = set()
+        dependency:set[str] = set(self.module_dependency)
         for node in self.nodes:
             dependency.update(node.dependency)
         self.dependency_code = '# 导入第三方依赖\n\n'
@@ -231,10 +460,53 @@ while True:
         self.node_class_code = '# 导入本地节点\n\n'
         for node in self.nodes:
             if node.type not in history:
-                self.node_class_code += inspect.getsource(node.cls)
+                self.node_class_code += node.source
                 self.node_class_code += '\n'
             history.add(node.type)
 
+    def generate_local_module_code(self):
+        """生成节点通过相对导入引用的本地模块代码，被依赖的模块排在前面"""
+        order:list[str] = list()
+        visiting:set[str] = set()
+
+        def visit(path:str):
+            if path in order or path in visiting:
+                return
+            visiting.add(path)
+            for dep in Module_info.load(path).local_modules:
+                visit(dep)
+            order.append(path)
+
+        for node in self.nodes:
+            for path in node.local_modules:
+                visit(path)
+        if not order:
+            return
+
+        self.local_module_code = '# 导入本地模块\n\n'
+        for path in order:
+            module_info = Module_info.load(path)
+            self.module_dependency.update(module_info.dependency)
+            self.local_module_code += module_info.code + '\n\n'
+
+    def generate_runtime_code(self):
+        """从 runtime.py 中提取并行模式需要的运行时代码"""
+        names:list[str] = {
+            'sequential': [],
+            'parallel': ['invoke_node', 'NodeTask', 'LevelExecutor'],
+            'dataflow': ['NodeTask', 'DataflowExecutor', 'LatencyReporter'],
+            'pipeline': ['NodeTask', 'PipelineExecutor'],
+        }[self.mode]
+        if not names:
+            return
+
+        module_info = Module_info.load(os.path.join(os.path.dirname(os.path.realpath(__file__)), 'runtime.py'))
+        self.module_dependency.update(module_info.dependency)
+
+        self.runtime_code = '# 导入运行时\n\n'
+        for name in names:
+            self.runtime_code += module_info.definitions[name] + '\n\n'
+
     def generate_statement_code(self):
         """生成节点实例化代码"""
         self.statement_code = '# 实例化节点类\n\n'
@@ -242,15 +514,162 @@ while True:
             self.statement_code += f'_node_{node.name}_{node.id}_ = {node.type[len(self.prefix) + 1:]}()\n'
 
 
+    def get_loop_levels(self) -> list[tuple[int,list[Node_info]]]:
+        """获取主循环中按层深度分组的节点，常量节点不在其中"""
+        deepthes:list = sorted(list(set([node.deepth for node in self.nodes if not node.is_const])))
+        return [(deepth, [node for node in self.nodes if node.deepth == deepth and not node.is_const]) for deepth in deepthes]
+
+    def generate_report_code(self):
+        """生成优化报告注释"""
+        if not self.optimize:
+            return
+        folded_code = ', '.join([f'{node.name}({node.id})' for node in self.folded]) or '无'
+        eliminated_code = ', '.join([f'{node.name}({node.id})' for node in self.eliminated]) or '无'
+        self.main_code += '# 优化报告\n'
+        self.main_code += f'# 常量折叠（移出主循环，只执行一次）: {folded_code}\n'
+        self.main_code += f'# 死节点消除（不影响任何输出节点）: {eliminated_code}\n\n'
+
     def generate_main_code(self):
         """生成主执行循环代码"""
-        deepthes:list = sorted(list(set([node.deepth for node in self.nodes])))
-        self.main_code = '# 主循环\n\n'
+        self.main_code = ''
+        self.entry_code = ''
+        self.generate_report_code()
+        if self.mode == 'parallel':
+            self.generate_parallel_code()
+        elif self.mode == 'dataflow':
+            self.generate_dataflow_code()
+        elif self.mode == 'pipeline':
+            self.generate_pipeline_code()
+        else:
+            self.generate_sequential_code()
+
+    def generate_sequential_code(self):
+        """生成顺序执行的主循环代码"""
+        if self.folded:
+            self.main_code += '# 常量节点（循环外执行一次）\n\n'
+            for node in self.folded:
+                self.main_code += node.get_exec_code()
+            self.main_code += '\n'
+
+        self.main_code += '# 主循环\n\n'
         self.main_code += 'while True:\n'
-        for deepth in deepthes:
+        for deepth, nodes in self.get_loop_levels():
             self.main_code += '    ' + f'# 层深度 {deepth}\n'
-            for node in self.nodes:
-                if node.deepth == deepth:
-                    self.main_code += '    ' + node.get_exec_code()
+            for node in nodes:
+                self.main_code += '    ' + node.get_exec_code()
         self.main_code += '    ' + '\n'
-        self.main_code += '    ' + '#break\n'
\ No newline at end of file
+        self.main_code += '    ' + '#break\n'
+
+    def generate_task_code(self):
+        """生成节点任务表代码"""
+        self.entry_code += '_tasks = {\n'
+        for node in self.nodes:
+            self.entry_code += '    ' + f"'{node.id}': {node.get_task_code()},\n"
+        self.entry_code += '}\n\n'
+
+    def generate_levels_code(self, var:str):
+        """生成按层深度分组的任务列表代码"""
+        self.entry_code += f'{var} = [\n'
+        for deepth, nodes in self.get_loop_levels():
+            tasks_code = ', '.join([f"_tasks['{node.id}']" for node in nodes])
+            self.entry_code += '    ' + f'[{tasks_code}],  # 层深度 {deepth}\n'
+        self.entry_code += ']\n\n'
+
+    def generate_entry_code(self):
+        """生成运行时模式的入口代码，常量节点在进入主循环前执行一次"""
+        self.entry_code += '_ctx = {}\n'
+        if self.folded:
+            tasks_code = ', '.join([f"_tasks['{node.id}']" for node in self.folded])
+            self.entry_code += '# 常量节点（循环外执行一次）\n'
+            self.entry_code += f'for _task in [{tasks_code}]:\n'
+            self.entry_code += '    ' + '_task.run(_ctx)\n'
+
+    def generate_loop_code(self, statement:str):
+        """生成运行时模式的主循环代码"""
+        self.entry_code += 'try:\n'
+        self.entry_code += '    ' + 'while True:\n'
+        self.entry_code += '    ' * 2 + f'{statement}\n'
+        self.entry_code += '    ' * 2 + '\n'
+        self.entry_code += '    ' * 2 + '#break\n'
+        self.entry_code += 'finally:\n'
+        self.entry_code += '    ' + '_executor.close()\n'
+
+    def generate_guard_code(self):
+        """
+        把节点实例化、任务表和主循环放入 __main__ 保护块
+        进程池在 spawn 方式下（Windows/macOS）工作进程会重新导入脚本，实例化放在模块顶层会再次打开摄像头和串口
+        """
+        self.main_code += "if __name__ == '__main__':\n"
+        self.main_code += textwrap.indent(self.statement_code + '\n' + self.entry_code, '    ')
+
+    def generate_parallel_code(self):
+        """生成层级并行执行的主循环代码，同层节点派发到线程池或进程池"""
+        workers:int = self.options.get('workers') or None
+        executor:str = self.options.get('executor', 'thread')
+        if executor not in ('thread', 'process'):
+            raise Exception(f'未知的执行器类型: {executor}')
+
+        self.main_code += '# 主循环（层级并行）\n\n'
+        self.main_code += f'_WORKERS = {workers}  # 工作线程/进程数，None 表示 CPU 核数\n'
+        self.main_code += f"_EXECUTOR = '{executor}'  # thread 线程池；process 无状态节点派发到进程池\n\n"
+        self.generate_task_code()
+        self.generate_levels_code('_levels')
+        self.generate_entry_code()
+        self.entry_code += '_executor = LevelExecutor(_levels, workers=_WORKERS, executor=_EXECUTOR)\n'
+        self.generate_loop_code('_executor.run(_ctx)')
+        self.generate_guard_code()
+
+    def generate_dataflow_code(self):
+        """生成数据流执行的主循环代码，节点输入全部就绪后立即调度"""
+        workers:int = self.options.get('workers') or None
+        report_interval:float = self.options.get('report_interval', 1.0)
+
+        self.main_code += '# 主循环（数据流）\n\n'
+        self.main_code += f'_WORKERS = {workers}  # 工作线程数，None 表示 CPU 核数\n'
+        self.main_code += f'_REPORT_INTERVAL = {report_interval}  # 迭代延迟输出间隔（秒），0 表示每次迭代都输出\n\n'
+        self.generate_task_code()
+        self.entry_code += '_dependencies = {\n'
+        for node in self.nodes:
+            if node.is_const:
+                continue
+            deps = [id for id in dict.fromkeys(self.graph.predecessors[node.id]) if not self.graph.index[id].is_const]
+            deps_code = ', '.join([f"'{id}'" for id in deps])
+            self.entry_code += '    ' + f"'{node.id}': [{deps_code}],\n"
+        self.entry_code += '}\n\n'
+        self.generate_entry_code()
+        self.entry_code += '_executor = DataflowExecutor([_tasks[id] for id in _dependencies], _dependencies, workers=_WORKERS)\n'
+        self.entry_code += '_reporter = LatencyReporter(_REPORT_INTERVAL)\n'
+        self.generate_loop_code('_reporter.record(_executor.run(_ctx))')
+        self.generate_guard_code()
+
+    def disable_buffer_reuse(self):
+        """关闭节点的输出缓冲复用，流水线中下游阶段读取上一帧输出时，上游已在写入下一帧"""
+        for node in self.nodes:
+            input_types:dict = node.cls.INPUT_TYPES()
+            if self.REUSE_BUFFER_INPUT not in {**input_types.get('required', {}), **input_types.get('optional', {})}:
+                continue
+            port = next((port for port in node.input_port if port.name == self.REUSE_BUFFER_INPUT), None)
+            if port is None:
+                node.input_port.append(IPort_info((self.REUSE_BUFFER_INPUT, '否')))
+            elif port.is_widget:
+                port.value = '否'
+
+    def generate_pipeline_code(self):
+        """生成多帧流水线执行的主循环代码，每个层深度作为一个阶段"""
+        queue_size:int = self.options.get('queue_size', 2)
+        policy:str = self.options.get('policy', 'block')
+        report_interval:float = self.options.get('report_interval', 1.0)
+        if policy not in ('block', 'drop_oldest'):
+            raise Exception(f'未知的队列策略: {policy}')
+
+        self.main_code += '# 主循环（流水线）\n\n'
+        self.main_code += f'_QUEUE_SIZE = {queue_size}  # 阶段之间的队列深度\n'
+        self.main_code += f"_POLICY = '{policy}'  # block 队列满时阻塞上游；drop_oldest 丢弃最旧的帧\n"
+        self.main_code += f'_REPORT_INTERVAL = {report_interval}  # 吞吐率输出间隔（秒）\n\n'
+        self.disable_buffer_reuse()
+        self.generate_task_code()
+        self.generate_levels_code('_stages')
+        self.generate_entry_code()
+        self.entry_code += '_executor = PipelineExecutor(_stages, queue_size=_QUEUE_SIZE, policy=_POLICY, report_interval=_REPORT_INTERVAL, base=_ctx)\n'
+        self.generate_loop_code('_executor.step()')
+        self.generate_guard_code()
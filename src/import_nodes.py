@@ -1,34 +1,136 @@
+import os, json, hashlib, importlib, pathlib, inspect
+from .compiler import Module_info
 
 NODE_CLASS_MAPPINGS = {}
 
 NODE_DISPLAY_NAME_MAPPINGS = {}
 
-def import_all_nodes(prefix:str, nodes_path:str, file_path:str):
-    import os
-    
+# 懒加载：根据清单注册节点，首次执行时才导入节点模块，设置环境变量为 0 时启动即导入全部节点
+LAZY_LOADING = os.environ.get('COMFYUI_FOR_ACADEMIC_LAZY', '1') != '0'
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'node_manifest.json')
+# 清单格式的版本，格式改变时旧清单整体失效
+MANIFEST_VERSION = 3
+
+# 清单中原样保存的节点类属性
+MANIFEST_ATTRS = ('RETURN_TYPES', 'RETURN_NAMES', 'OUTPUT_TOOLTIPS', 'OUTPUT_NODE', 'NOT_IDEMPOTENT',
+                  'INPUT_IS_LIST', 'OUTPUT_IS_LIST')
+
+def describe_node(cls, module_name:str, category:str) -> dict:
+    """提取节点类的清单信息"""
+    try:
+        full_doc = inspect.cleandoc(cls.__doc__)
+        simple_doc = full_doc.split('\n')[0]
+    except Exception as e:
+        full_doc = ''
+        simple_doc = ''
+        print(e)
+
+    return {
+        'name': cls.__name__,
+        'module': module_name,
+        'category': category,
+        'description': full_doc,
+        'display_name': simple_doc,
+        'input_types': cls.INPUT_TYPES(),
+        'attrs': {attr: getattr(cls, attr) for attr in MANIFEST_ATTRS if hasattr(cls, attr)},
+        'is_changed': hasattr(cls, 'IS_CHANGED'),
+    }
+
+def local_modules(path:str) -> list[str]:
+    """节点文件通过相对导入依赖的全部本地模块（含间接依赖），与编译时内联的模块一致"""
+    modules:list[str] = list()
+    pending:list[str] = list(Module_info.load(path).local_modules)
+    while pending:
+        module = pending.pop()
+        if module not in modules:
+            modules.append(module)
+            pending.extend(Module_info.load(module).local_modules)
+    return sorted(modules)
+
+def files_digest(paths:list[str], cache:dict[str,bytes]) -> str:
+    """计算多个文件内容的组合哈希，每个文件在一次启动中只读取一次"""
+    digest = hashlib.sha1()
+    for path in paths:
+        if path not in cache:
+            with open(path, 'rb') as source:
+                cache[path] = hashlib.sha1(source.read()).digest()
+        digest.update(cache[path])
+    return digest.hexdigest()
+
+def make_lazy_node(info:dict):
+    """根据清单信息创建代理节点类，首次执行时导入真正的节点模块"""
+    def load_cls():
+        # 清单中保存相对 src 的模块名，按当前的包名导入，与安装目录的名称无关
+        return getattr(importlib.import_module(f"{__package__}.{info['module']}"), info['name'])
+
+    class LazyNode:
+        CATEGORY = info['category']
+        DESCRIPTION = info['description']
+        FUNCTION = 'process'
+
+        @classmethod
+        def INPUT_TYPES(s):
+            return json.loads(json.dumps(info['input_types']))
+
+        def __init__(self):
+            self.node = None
+
+        def process(self, **kwargs):
+            if self.node is None:
+                self.node = load_cls()()
+            return self.node.process(**kwargs)
+
+    for attr, value in info['attrs'].items():
+        setattr(LazyNode, attr, tuple(value) if isinstance(value, list) else value)
+
+    if info['is_changed']:
+        LazyNode.IS_CHANGED = classmethod(lambda s, **kwargs: load_cls().IS_CHANGED(**kwargs))
+
+    LazyNode.__name__ = LazyNode.__qualname__ = info['name']
+    LazyNode.__doc__ = info['description']
+    return LazyNode
+
+def import_all_nodes(prefix:str, nodes_path:str, package:str, lazy:bool=False):
+    manifest:dict = dict()
+    if lazy and os.path.exists(MANIFEST_PATH):
+        try:
+            with open(MANIFEST_PATH, 'r', encoding='utf-8') as file:
+                content = json.load(file)
+            if content.get('version') == MANIFEST_VERSION:
+                manifest = content['nodes']
+        except Exception as e:
+            print(e)
+    new_manifest:dict = dict()
+    digests:dict[str,bytes] = dict()
+
     def is_python_file(path):
-        return (os.path.isfile(path) 
-                and os.path.splitext(path)[1] == '.py' 
+        return (os.path.isfile(path)
+                and os.path.splitext(path)[1] == '.py'
                 and not '__' in pathlib.Path(path).stem)
-        
+
     def is_valid_dir(path):
-        return (os.path.isdir(path) 
+        return (os.path.isdir(path)
                 and not '__' in pathlib.Path(path).stem)
-    
+
+    def register(unique_name:str, cls, display_name:str):
+        NODE_CLASS_MAPPINGS[unique_name] = cls
+        NODE_DISPLAY_NAME_MAPPINGS[unique_name] = display_name
+
     def import_nodes_from_dir(dir):
         script_dir = os.path.dirname(os.path.realpath(__file__))
         for file in os.listdir(os.path.join(script_dir,dir[2:])):
             rel_path = os.path.join(dir,file)
             full_path = os.path.join(script_dir,rel_path[2:])
-            
+
             if is_python_file(full_path):
                 try:
-                    module = importlib.import_module(
-                        os.path.join(file_path,rel_path)
-                        .replace('./','')
-                        .replace('\\','.')
-                        .replace('/','.')
-                        .replace('.py',''))
+                    rel_module = (rel_path
+                                  .replace('./','')
+                                  .replace('\\','.')
+                                  .replace('/','.')
+                                  .replace('.py',''))
+                    module_name = f'{package}.{rel_module}'
 
                     category = '/'.join(
                         rel_path
@@ -37,35 +139,55 @@ def import_all_nodes(prefix:str, nodes_path:str, file_path:str):
                         .replace('/','.')
                         .replace('.py','')
                         .split('.')[:-1])
-                    
-                    for cls_name,cls in inspect.getmembers(module, inspect.isclass):
-                        if cls_name != pathlib.Path(full_path).stem:
-                            continue
-                        
-                        unique_name = f'{prefix}_{cls_name}'
-                        
+
+                    if lazy:
+                        # 清单按节点文件及其相对导入的本地模块的内容哈希失效，都未修改时无需导入模块
+                        entry = manifest.get(rel_path)
                         try:
-                            full_doc = inspect.cleandoc(cls.__doc__)
-                            simple_doc = full_doc.split('\n')[0]
-                        except Exception as e:
-                            full_doc = ''
-                            simple_doc = ''
-                            print(e)
-                        
-                        cls.CATEGORY = category
-                        cls.DESCRIPTION = full_doc
+                            helpers = [os.path.join(script_dir, path) for path in entry['modules']] if entry else []
+                            digest = files_digest([full_path] + helpers, digests)
+                        except OSError:
+                            digest = None
+                        if entry is None or entry['hash'] != digest:
+                            module = importlib.import_module(module_name)
+                            cls = getattr(module, pathlib.Path(full_path).stem, None)
+                            info = describe_node(cls, rel_module, category) if inspect.isclass(cls) else None
+                            helpers = local_modules(full_path)
+                            entry = {'hash': files_digest([full_path] + helpers, digests),
+                                     'modules': [os.path.relpath(path, script_dir) for path in helpers],
+                                     'node': info}
+                        new_manifest[rel_path] = entry
+
+                        if entry['node'] is not None:
+                            info = entry['node']
+                            register(f'{prefix}_{info["name"]}', make_lazy_node(info), info['display_name'])
+                        continue
+
+                    module = importlib.import_module(module_name)
+                    cls = getattr(module, pathlib.Path(full_path).stem, None)
+                    if inspect.isclass(cls):
+                        info = describe_node(cls, rel_module, category)
+
+                        cls.CATEGORY = info['category']
+                        cls.DESCRIPTION = info['description']
                         cls.FUNCTION = 'process'
-                        
-                        NODE_CLASS_MAPPINGS[unique_name] = cls
-                        NODE_DISPLAY_NAME_MAPPINGS[unique_name] = simple_doc
-                        
+
+                        register(f'{prefix}_{info["name"]}', cls, info['display_name'])
+
                 except Exception as e:
                     print(e)
-                
+
             elif is_valid_dir(full_path):
                 import_nodes_from_dir(rel_path)
-            
-    import importlib,pathlib,inspect
+
     import_nodes_from_dir(nodes_path)
 
-import_all_nodes(prefix='ComfyUI_For_Academic', nodes_path='./', file_path='./custom_nodes/ComfyUI_For_Academic/src')
+    if lazy and new_manifest != manifest:
+        try:
+            with open(MANIFEST_PATH, 'w', encoding='utf-8') as file:
+                json.dump({'version': MANIFEST_VERSION, 'nodes': new_manifest}, file, ensure_ascii=False, indent=1)
+        except Exception as e:
+            print(e)
+
+# 节点模块以本模块所在的包为前缀导入，与根 __init__ 的相对导入一致，不依赖安装目录的名称
+import_all_nodes(prefix='ComfyUI_For_Academic', nodes_path='./', package=__package__, lazy=LAZY_LOADING)
@@ -0,0 +1,35 @@
+import itertools
+import threading
+from collections import OrderedDict
+
+# 预览图片的路由，在 __init__.py 中注册，节点只返回地址，图片以二进制从该路由获取
+PREVIEW_ROUTE = '/comfyui_for_academic_preview'
+
+
+class PreviewStore:
+    """
+    各节点最近一次的预览图片，保存编码后的字节
+    每个节点只保留最新的一张，最多保存 MAX_PREVIEWS 个节点，超出时丢弃最久未更新的
+    """
+    MAX_PREVIEWS = 64
+    previews:OrderedDict[str,tuple[bytes,str]] = OrderedDict()
+    lock = threading.Lock()
+    versions = itertools.count()
+
+    @classmethod
+    def publish(cls, node, data:bytes, format:str) -> dict:
+        """保存 node 的预览图片，返回放入 ui 的字段：图片地址（带版本号，避免浏览器缓存）和格式"""
+        key = f'{type(node).__name__}_{id(node):x}'
+        with cls.lock:
+            cls.previews[key] = (bytes(data), f'image/{format}')
+            cls.previews.move_to_end(key)
+            while len(cls.previews) > cls.MAX_PREVIEWS:
+                cls.previews.popitem(last=False)
+            version = next(cls.versions)
+        return {"url": [f'{PREVIEW_ROUTE}/{key}?v={version}'], "format": [format]}
+
+    @classmethod
+    def get(cls, key:str) -> tuple[bytes,str]:
+        """返回 (图片字节, MIME 类型)，不存在时返回 None"""
+        with cls.lock:
+            return cls.previews.get(key)
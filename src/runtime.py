@@ -0,0 +1,292 @@
+import os
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+
+def invoke_node(node:any, func:str, kwargs:dict) -> any:
+    """在工作进程中调用节点方法"""
+    return getattr(node, func)(**kwargs)
+
+
+class NodeTask:
+    """节点任务类，描述编译脚本中一个节点的实例、输入来源与输出变量"""
+    # pyplot 的当前图形是进程内的全局状态，使用 pyplot 的节点在所有线程中互斥执行
+    pyplot_lock = threading.Lock()
+
+    def __init__(self, id:str, node:any, func:str, links:dict, widgets:dict, outputs:list,
+                 main_thread:bool=False, stateless:bool=False, pyplot:bool=False):
+        self.id:str = id
+        self.node:any = node
+        self.func:str = func
+        self.links:dict[str,str] = links
+        self.widgets:dict[str,any] = widgets
+        self.outputs:list[str] = outputs
+        self.main_thread:bool = main_thread    # 需要在主线程执行（如 cv2.imshow）
+        self.stateless:bool = stateless        # 节点无实例状态，可以派发到进程池
+        self.pyplot:bool = pyplot              # 节点使用 pyplot，执行时持有 pyplot_lock
+
+    def bind(self, ctx:dict) -> dict:
+        """从上下文中取出输入连接的值，组装调用参数"""
+        kwargs = dict(self.widgets)
+        for name, var in self.links.items():
+            kwargs[name] = ctx[var]
+        return kwargs
+
+    def store(self, ctx:dict, result:any) -> None:
+        """将节点的返回值写入上下文，没有输出的节点（如 process_local）返回 None"""
+        if result is None:
+            return
+        for var, value in zip(self.outputs, result):
+            ctx[var] = value
+
+    def run(self, ctx:dict) -> None:
+        """在当前线程执行节点"""
+        if self.pyplot:
+            with NodeTask.pyplot_lock:
+                self.store(ctx, getattr(self.node, self.func)(**self.bind(ctx)))
+            return
+        self.store(ctx, getattr(self.node, self.func)(**self.bind(ctx)))
+
+
+class LevelExecutor:
+    """层级并行执行器，同一层深度的节点并发执行，层与层之间设置屏障"""
+    def __init__(self, levels:list[list[NodeTask]], workers:int=None, executor:str='thread'):
+        self.levels:list[list[NodeTask]] = levels
+        self.workers:int = workers or os.cpu_count()
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.process_pool = ProcessPoolExecutor(max_workers=self.workers) if executor == 'process' else None
+
+    def run(self, ctx:dict) -> None:
+        """按层深度依次执行所有节点"""
+        for level in self.levels:
+            self.run_level(level, ctx)
+
+    def run_level(self, level:list[NodeTask], ctx:dict) -> None:
+        """并发执行一层节点，等待全部完成后返回"""
+        if len(level) == 1:
+            level[0].run(ctx)
+            return
+
+        futures = list()
+        for task in level:
+            if task.main_thread:
+                continue
+            if self.process_pool is not None and task.stateless:
+                futures.append((self.process_pool.submit(invoke_node, task.node, task.func, task.bind(ctx)), task))
+            else:
+                futures.append((self.thread_pool.submit(task.run, ctx), None))
+
+        for task in level:
+            if task.main_thread:
+                task.run(ctx)
+
+        # 屏障：本层全部完成后才进入下一层，同时抛出节点中的异常
+        for future, task in futures:
+            result = future.result()
+            if task is not None:
+                task.store(ctx, result)
+
+    def close(self) -> None:
+        """关闭线程池与进程池"""
+        self.thread_pool.shutdown(cancel_futures=True)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(cancel_futures=True)
+
+
+class DataflowExecutor:
+    """数据流执行器，节点的全部输入就绪后立即调度，不再等待整层完成"""
+    def __init__(self, tasks:list[NodeTask], dependencies:dict[str,list[str]], workers:int=None):
+        self.tasks:dict[str,NodeTask] = {task.id: task for task in tasks}
+        self.dependencies:dict[str,list[str]] = dependencies
+        self.dependents:dict[str,list[str]] = {id: list() for id in self.tasks}
+        for id, deps in dependencies.items():
+            for dep in deps:
+                self.dependents[dep].append(id)
+        self.workers:int = workers or os.cpu_count()
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    def run(self, ctx:dict) -> float:
+        """执行一次迭代，返回本次迭代的耗时（秒）"""
+        start = time.perf_counter()
+
+        # 每个节点的未就绪输入计数，归零即进入就绪队列
+        counters:dict[str,int] = {id: len(self.dependencies[id]) for id in self.tasks}
+        ready:deque[str] = deque(id for id, count in counters.items() if count == 0)
+        main_ready:deque[str] = deque()
+        pending:dict = dict()
+
+        finished_count = 0
+        while finished_count < len(self.tasks):
+            while ready:
+                id = ready.popleft()
+                if self.tasks[id].main_thread:
+                    main_ready.append(id)
+                else:
+                    pending[self.thread_pool.submit(self.tasks[id].run, ctx)] = id
+
+            finished:list[str] = list()
+            if main_ready:
+                id = main_ready.popleft()
+                self.tasks[id].run(ctx)
+                finished.append(id)
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+                    finished.append(pending.pop(future))
+
+            for id in finished:
+                finished_count += 1
+                for dependent in self.dependents[id]:
+                    counters[dependent] -= 1
+                    if counters[dependent] == 0:
+                        ready.append(dependent)
+
+        return time.perf_counter() - start
+
+    def close(self) -> None:
+        """关闭线程池"""
+        self.thread_pool.shutdown(cancel_futures=True)
+
+
+class LatencyReporter:
+    """迭代延迟统计，每隔 interval 秒输出一次平均与最大延迟，interval 为 0 时每次迭代都输出"""
+    def __init__(self, interval:float=1.0):
+        self.interval:float = interval
+        self.samples:list[float] = list()
+        self.last_report:float = time.perf_counter()
+
+    def record(self, latency:float) -> None:
+        """记录一次迭代的耗时"""
+        self.samples.append(latency)
+        now = time.perf_counter()
+        if now - self.last_report < self.interval:
+            return
+
+        mean = sum(self.samples) / len(self.samples)
+        print(f'迭代延迟: 最新 {latency * 1000:.1f} ms, 平均 {mean * 1000:.1f} ms, '
+              f'最大 {max(self.samples) * 1000:.1f} ms, {len(self.samples) / (now - self.last_report):.1f} 次/秒')
+        self.samples.clear()
+        self.last_report = now
+
+
+class PipelineExecutor:
+    """流水线执行器，每个层深度作为一个阶段，阶段之间用有界队列连接，相邻帧的不同阶段重叠执行"""
+    def __init__(self, stages:list[list[NodeTask]], queue_size:int=2, policy:str='block', report_interval:float=1.0,
+                 base:dict=None):
+        if policy not in ('block', 'drop_oldest'):
+            raise Exception(f'未知的队列策略: {policy}')
+
+        # 需要主线程的节点（如 cv2.imshow）所在阶段及其之后的阶段合并为最后一个阶段，在主线程执行
+        first = next((index for index, stage in enumerate(stages) if any(task.main_thread for task in stage)), len(stages))
+        if first < len(stages) - 1:
+            stages = stages[:first] + [[task for stage in stages[first:] for task in stage]]
+
+        self.stages:list[list[NodeTask]] = stages
+        self.queues:list[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in stages[1:]]
+        self.policy:str = policy    # block 队列满时阻塞上游；drop_oldest 丢弃最旧的帧
+        self.report_interval:float = report_interval
+        self.base:dict = base or dict()    # 每一帧上下文的初始内容，如常量节点的输出
+
+        self.counts:list[int] = [0] * len(stages)
+        self.dropped:list[int] = [0] * len(self.queues)
+        self.last_counts:list[int] = [0] * len(stages)
+        self.last_report:float = time.perf_counter()
+
+        self.stop_event = threading.Event()
+        self.error:BaseException = None
+        # 最后一个阶段在主线程执行，其余阶段各占一个线程
+        self.threads:list[threading.Thread] = [
+            threading.Thread(target=self.worker, args=(index,), daemon=True) for index in range(len(stages) - 1)]
+        for thread in self.threads:
+            thread.start()
+
+    def put(self, index:int, ctx:dict) -> None:
+        """将一帧的上下文放入第 index 个队列"""
+        channel = self.queues[index]
+        while not self.stop_event.is_set():
+            if self.policy == 'drop_oldest':
+                try:
+                    channel.put_nowait(ctx)
+                    return
+                except queue.Full:
+                    try:
+                        channel.get_nowait()
+                        self.dropped[index] += 1
+                    except queue.Empty:
+                        pass
+            else:
+                try:
+                    channel.put(ctx, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+    def get(self, index:int) -> dict:
+        """从第 index 个队列取出一帧的上下文，流水线停止时返回 None"""
+        while not self.stop_event.is_set():
+            try:
+                return self.queues[index].get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def run_stage(self, index:int, ctx:dict) -> None:
+        """在当前线程执行一个阶段的全部节点"""
+        for task in self.stages[index]:
+            task.run(ctx)
+        self.counts[index] += 1
+
+    def worker(self, index:int) -> None:
+        """阶段线程：从上游队列取帧，执行后放入下游队列"""
+        try:
+            while not self.stop_event.is_set():
+                if index == 0:
+                    ctx = dict(self.base)
+                else:
+                    ctx = self.get(index - 1)
+                    if ctx is None:
+                        return
+                self.run_stage(index, ctx)
+                self.put(index, ctx)
+        except BaseException as e:
+            self.error = e
+            self.stop_event.set()
+
+    def step(self) -> None:
+        """在主线程执行最后一个阶段，处理一帧"""
+        if len(self.stages) == 1:
+            ctx = dict(self.base)
+        else:
+            ctx = self.get(len(self.stages) - 2)
+            if ctx is None:
+                raise self.error or Exception('流水线已停止')
+        self.run_stage(len(self.stages) - 1, ctx)
+        self.report()
+
+    def report(self) -> None:
+        """每隔 report_interval 秒输出各阶段的吞吐率与丢帧数"""
+        now = time.perf_counter()
+        elapsed = now - self.last_report
+        if elapsed < self.report_interval:
+            return
+
+        parts = list()
+        for index, count in enumerate(self.counts):
+            part = f'阶段{index} {(count - self.last_counts[index]) / elapsed:.1f} 帧/秒'
+            if index < len(self.dropped) and self.dropped[index]:
+                part += f' (丢弃 {self.dropped[index]})'
+            parts.append(part)
+        print('流水线吞吐: ' + ' | '.join(parts))
+
+        self.last_counts = list(self.counts)
+        self.last_report = now
+
+    def close(self) -> None:
+        """停止全部阶段线程"""
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
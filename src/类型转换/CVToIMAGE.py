@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
 import torch
+from ..OpenCV.cv_runtime import BufferPool
 
 class CVToIMAGE:
     '''
@@ -8,12 +9,21 @@ class CVToIMAGE:
     将OpenCV(ndarray)格式的图像转换为ComfyUI的IMAGE格式
     '''
     
+    def __init__(self):
+        self.buffers = BufferPool()
+    
     @classmethod
     def INPUT_TYPES(s):
         return {
             "required": {
                 "图像输入": ("CVIMAGE", {
-                    "tooltip": "OpenCV格式的图像(ndarray)"
+                    "tooltip": "OpenCV格式的图像(ndarray)，也可以是 (B,H,W,C) 数组或尺寸相同的图像列表，转换为一个批次"
+                }),
+            },
+            "optional": {
+                "复用输出缓冲": (["是", "否"], {
+                    "default": "否",
+                    "tooltip": "输出张量与节点持有的缓冲区共享内存，下次执行时被覆盖。ComfyUI 会缓存节点输出，预览、保存节点可能长期引用该张量，因此默认关闭；编译为脚本且后续节点不保留结果时可以选是；流水线模式编译时自动关闭"
                 }),
             },
         }
@@ -22,42 +32,64 @@ class CVToIMAGE:
     RETURN_NAMES = ("图像输出",)
     OUTPUT_TOOLTIPS = ("ComfyUI IMAGE格式的图片",)
 
-    def process(self, 图像输入):
-        # 确保输入是numpy数组
-        if not isinstance(图像输入, np.ndarray):
-            raise Exception("输入必须是numpy数组格式")
-        
-        # 处理不同的图像格式
-        if len(图像输入.shape) == 2:  # 灰度图像 (H, W)
-            # 转换为RGB格式
-            rgb_image = cv2.cvtColor(图像输入, cv2.COLOR_GRAY2RGB)
-        elif len(图像输入.shape) == 3:
-            if 图像输入.shape[2] == 1:  # 单通道灰度 (H, W, 1)
-                rgb_image = cv2.cvtColor(图像输入, cv2.COLOR_GRAY2RGB)
-            elif 图像输入.shape[2] == 3:  # BGR图像 (H, W, 3)
-                rgb_image = cv2.cvtColor(图像输入, cv2.COLOR_BGR2RGB)
-            elif 图像输入.shape[2] == 4:  # BGRA图像 (H, W, 4)
-                rgb_image = cv2.cvtColor(图像输入, cv2.COLOR_BGRA2RGB)
-            else:
-                raise Exception(f"不支持的通道数: {图像输入.shape[2]}")
+    def process(self, 图像输入, 复用输出缓冲="否"):
+        # 整理为图像列表，(B,H,W,C) 数组和图像列表都作为一个批次
+        if isinstance(图像输入, (list, tuple)):
+            frames = list(图像输入)
+        elif isinstance(图像输入, np.ndarray):
+            frames = list(图像输入) if len(图像输入.shape) == 4 else [图像输入]
         else:
-            raise Exception(f"不支持的图像维度: {图像输入.shape}")
+            raise Exception("输入必须是numpy数组格式")
+        if not frames:
+            raise Exception("输入的图像列表为空")
         
-        # 确保数据类型为uint8
-        if rgb_image.dtype != np.uint8:
-            # 如果是浮点数，假设范围是0-1，转换为0-255
-            if rgb_image.dtype in [np.float32, np.float64]:
-                if rgb_image.max() <= 1.0:
-                    rgb_image = (rgb_image * 255).astype(np.uint8)
-                else:
-                    rgb_image = rgb_image.astype(np.uint8)
-            else:
-                rgb_image = rgb_image.astype(np.uint8)
+        height, width = frames[0].shape[:2]
+        for frame in frames:
+            if not isinstance(frame, np.ndarray):
+                raise Exception("输入必须是numpy数组格式")
+            if frame.shape[:2] != (height, width):
+                raise Exception(f"批次中的图像尺寸不一致: {frame.shape[:2]} 与 {(height, width)}")
         
-        # 转换为torch tensor并归一化到[0,1]
-        image_tensor = torch.from_numpy(rgb_image.astype(np.float32) / 255.0)
+        # 每帧直接写入 (B, H, W, 3) 的 float32 缓冲区，torch 张量与缓冲区共享内存，不再拷贝和拼接
+        shape = (len(frames), height, width, 3)
+        output = self.buffers.output(shape, np.float32, 复用输出缓冲 == "是")
+        if output is None:
+            output = np.empty(shape, np.float32)
+        for frame, dst in zip(frames, output):
+            self._convert(frame, dst)
         
-        # 添加batch维度 (1, H, W, C)
-        image_tensor = image_tensor.unsqueeze(0)
+        return (torch.from_numpy(output),)
+    
+    def _convert(self, frame, dst):
+        """把一帧 OpenCV 图像转换为 RGB 并归一化到 [0,1]，写入 (H, W, 3) 的 dst"""
+        # 处理不同的图像格式，uint8 图像的通道转换写入复用的中间缓冲区
+        if frame.dtype == np.uint8:
+            if len(frame.shape) == 2 or (len(frame.shape) == 3 and frame.shape[2] == 1):  # 灰度图像
+                code = cv2.COLOR_GRAY2RGB
+            elif len(frame.shape) == 3 and frame.shape[2] == 3:  # BGR图像
+                code = cv2.COLOR_BGR2RGB
+            elif len(frame.shape) == 3 and frame.shape[2] == 4:  # BGRA图像
+                code = cv2.COLOR_BGRA2RGB
+            else:
+                raise Exception(f"不支持的图像格式: {frame.shape}")
+            rgb = cv2.cvtColor(frame, code, dst=self.buffers.get("rgb", dst.shape))
+            # 类型转换与归一化在一次遍历中完成，直接写入输出
+            np.divide(rgb, np.float32(255.0), out=dst)
+            return
         
-        return (image_tensor,)
\ No newline at end of file
+        # 其他类型较少见，取通道倒序的视图得到 RGB，灰度图广播到三个通道
+        if len(frame.shape) == 2:
+            view = frame[..., None]
+        elif len(frame.shape) == 3 and frame.shape[2] == 1:
+            view = frame
+        elif len(frame.shape) == 3 and frame.shape[2] in (3, 4):
+            view = frame[..., 2::-1]
+        else:
+            raise Exception(f"不支持的图像格式: {frame.shape}")
+        if np.issubdtype(frame.dtype, np.floating) and frame.max() <= 1.0:
+            # 浮点数范围是0-1时直接复制
+            np.copyto(dst, view, casting='unsafe')
+        else:
+            # 其他类型按0-255的范围归一化，超出范围的截断
+            np.divide(view, np.float32(255.0), out=dst, casting='unsafe')
+            np.clip(dst, 0.0, 1.0, out=dst)
@@ -0,0 +1,107 @@
+import cv2
+import numpy as np
+from ..OpenCV.cv_runtime import BufferPool
+
+class IMAGEToCV:
+    '''
+    IMAGE转OpenCV图像
+    将ComfyUI的IMAGE格式转换为OpenCV(ndarray)格式的图像，支持批次
+    '''
+
+    def __init__(self):
+        self.buffers = BufferPool()
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "图像输入": ("IMAGE", {
+                    "tooltip": "ComfyUI IMAGE格式的图片，形状为 (B,H,W,C)，取值范围 [0,1]"
+                }),
+            },
+            "optional": {
+                "帧序号": ("INT", {
+                    "default": -1,
+                    "min": -1,
+                    "max": 4096,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "只转换批次中的第几帧；-1 表示转换整个批次，批次只有一帧时输出 (H,W,C) 图像，否则输出 (B,H,W,C) 数组"
+                }),
+                "输出类型": (["uint8", "float32"], {
+                    "default": "uint8",
+                    "tooltip": "uint8 为常用的 0-255 图像；float32 保持 [0,1] 范围，通道顺序为RGB时直接返回张量数据的视图，不拷贝"
+                }),
+                "通道顺序": (["BGR", "RGB"], {
+                    "default": "BGR",
+                    "tooltip": "OpenCV 默认使用 BGR；后续只做灰度或形状处理时可选 RGB 省去通道转换"
+                }),
+                "复用输出缓冲": (["是", "否"], {
+                    "default": "是",
+                    "tooltip": "输出写入节点持有的缓冲区，下次执行时被覆盖；后续节点需要长期保留结果时选否；流水线模式编译时自动关闭"
+                }),
+            },
+        }
+
+    RETURN_TYPES = ("CVIMAGE",)
+    RETURN_NAMES = ("图像输出",)
+    OUTPUT_TOOLTIPS = ("OpenCV格式的图像(ndarray)",)
+
+    def process(self, 图像输入, 帧序号=-1, 输出类型="uint8", 通道顺序="BGR", 复用输出缓冲="是"):
+        # 取得张量的 numpy 视图，只有在 GPU 上或需要梯度时才会拷贝
+        if hasattr(图像输入, "detach"):
+            images = 图像输入.detach().cpu().numpy()
+        else:
+            images = np.asarray(图像输入)
+        if len(images.shape) == 3:
+            images = images[None]
+        if len(images.shape) != 4 or images.shape[3] not in (1, 3, 4):
+            raise Exception(f"不支持的图像形状: {images.shape}")
+
+        # 选择帧，保持 (B,H,W,C) 的形状
+        if 帧序号 >= 0:
+            if 帧序号 >= images.shape[0]:
+                raise Exception(f"帧序号 {帧序号} 超出批次大小 {images.shape[0]}")
+            images = images[帧序号:帧序号 + 1]
+
+        channels = images.shape[3]
+        dtype = np.dtype(输出类型)
+        flip = 通道顺序 == "BGR" and channels > 1
+
+        # 类型和通道顺序都一致时直接返回视图
+        if images.dtype == dtype and not flip:
+            output = images
+        else:
+            shape = images.shape if channels > 1 else images.shape[:3]
+            output = self.buffers.output(shape, dtype, 复用输出缓冲 == "是")
+            if output is None:
+                output = np.empty(shape, dtype)
+            for image, dst in zip(images, output):
+                self._convert(image, dst, flip)
+
+        # 单通道去掉通道维度，单帧去掉批次维度
+        if channels == 1 and len(output.shape) == 4:
+            output = output[..., 0]
+        return (output[0] if output.shape[0] == 1 else output,)
+
+    def _convert(self, image, dst, flip):
+        """把一帧 (H,W,C) 图像按 dst 的类型写入 dst，flip 为真时 RGB(A) 转换为 BGR(A)"""
+        if len(dst.shape) == 2:
+            image = image[..., 0]
+        # 不需要转换通道时类型转换直接写入 dst
+        scaled = dst if not flip else self.buffers.get("scaled", dst.shape, dst.dtype)
+
+        if dst.dtype == image.dtype:
+            scaled = image
+        elif dst.dtype == np.uint8:
+            # 乘 255、四舍五入并截断到 0-255 在一次遍历中完成
+            cv2.multiply(image, (255.0, 255.0, 255.0, 255.0), dst=scaled, dtype=cv2.CV_8U)
+        elif image.dtype == np.uint8:
+            np.divide(image, np.float32(255.0), out=scaled, casting='unsafe')
+        else:
+            np.copyto(scaled, image, casting='unsafe')
+
+        if flip:
+            cv2.cvtColor(scaled, cv2.COLOR_RGB2BGR if dst.shape[2] == 3 else cv2.COLOR_RGBA2BGRA, dst=dst)
+        elif scaled is not dst:
+            np.copyto(dst, scaled)
@@ -0,0 +1,83 @@
+import time
+import numpy as np
+from .serial_runtime import SerialReader, StreamParser
+
+class SerialInput:
+    '''
+    串口输入
+    后台线程持续接收并解析串口数据，节点执行时直接返回最近的若干个样本，不等待串口
+    '''
+
+    def __init__(self):
+        self.reader = None
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "串口端口": ("STRING", {
+                    "default": "COM3",
+                    "tooltip": "串口端口名称"
+                }),
+                "波特率": (["9600", "19200", "38400", "57600", "115200", "230400", "460800", "921600"], {
+                    "default": "115200",
+                    "tooltip": "串口通信波特率"
+                }),
+                "数据格式": (list(StreamParser.FORMATS), {
+                    "default": "原始文本",
+                    "tooltip": "每行或每帧为一个样本：原始文本为空格或逗号分隔的数值，JSON格式为数值、数组或带data字段的对象，十六进制为空格分隔的十六进制数，二进制帧与串口输出的格式一致"
+                }),
+                "样本数": ("INT", {
+                    "default": 100,
+                    "min": 1,
+                    "max": 100000,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "每次输出最近的样本个数，不足时输出已收到的全部样本"
+                }),
+            },
+            "optional": {
+                "缓冲样本数": ("INT", {
+                    "default": 10000,
+                    "min": 1,
+                    "max": 1000000,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "环形缓冲区保存的样本个数，满后覆盖最旧的样本"
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("NPARRAY", "FLOAT", "FLOAT", "INT")
+    RETURN_NAMES = ("数据输出", "时间戳", "接收速率", "解析错误")
+    OUTPUT_TOOLTIPS = ("最近的样本，形状为 (样本数, 每个样本的数值个数)", "最新样本的接收时间戳", "最近一秒接收的样本数", "累计解析失败的消息数")
+    NOT_IDEMPOTENT = True
+
+    def process(self, 串口端口, 波特率, 数据格式, 样本数, 缓冲样本数=10000):
+        try:
+            # 参数改变时重新打开串口
+            config = (串口端口, int(波特率), 数据格式, max(缓冲样本数, 样本数))
+            if self.reader is None or self.reader.config != config:
+                if self.reader is not None:
+                    self.reader.close()
+                    self.reader = None
+                self.reader = SerialReader(*config)
+
+            if not self.reader.connected and self.reader.error:
+                print(f"串口未连接，正在重连（第 {self.reader.retries} 次）: {self.reader.error}")
+
+            return (self.reader.ring.latest(样本数), self.reader.timestamp, self.reader.rate, self.reader.errors)
+
+        except Exception as e:
+            print(f"串口接收错误: {e}")
+            return (np.zeros((0, 0)), time.time(), 0.0, 0)
+
+    @classmethod
+    def IS_CHANGED(s, **kwargs):
+        # 每次执行都读取最新的数据
+        return float("NaN")
+
+    def __del__(self):
+        """析构函数，停止接收线程"""
+        if getattr(self, 'reader', None) is not None:
+            self.reader.close()
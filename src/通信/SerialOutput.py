@@ -1,17 +1,15 @@
-import serial
 import json
 import numpy as np
+from .serial_runtime import SerialWriter, encode_frame
 
 class SerialOutput:
     '''
     串口输出
-    通过串口发送任意类型数据
+    通过串口发送任意类型数据，同一串口的多个节点共享连接和发送线程
     '''
     
     def __init__(self):
-        self.serial_port = None
-        self.last_port = None
-        self.last_baudrate = None
+        self.writer = None
     
     @classmethod
     def INPUT_TYPES(s):
@@ -28,9 +26,9 @@ class SerialOutput:
                     "default": "115200",
                     "tooltip": "串口通信波特率"
                 }),
-                "数据格式": (["原始文本", "JSON格式", "十六进制"], {
+                "数据格式": (["原始文本", "空格分隔数值", "JSON格式", "十六进制", "二进制帧"], {
                     "default": "原始文本",
-                    "tooltip": "数据发送格式"
+                    "tooltip": "数据发送格式，原始文本为 str(数据)；空格分隔数值把数组展平后发送，可由串口输入的原始文本格式解析；二进制帧直接发送数组内存，包含类型、形状、时间戳和CRC32校验"
                 }),
                 "换行符": (["\\r\\n", "\\n", "\\r", "无"], {
                     "default": "\\r\\n",
@@ -40,70 +38,76 @@ class SerialOutput:
                     "default": "0.0",
                     "tooltip": "当前的时间戳"
                 }),
+            },
+            "optional": {
+                "后台发送": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "由后台线程合并发送，节点不等待串口写完；关闭时等待本次数据写入串口"
+                }),
+                "队列长度": ("INT", {
+                    "default": 64,
+                    "min": 1,
+                    "max": 4096,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "后台发送队列的最大条数，队列满时丢弃最旧的数据"
+                }),
             }
         }
 
-    RETURN_TYPES = ("STRING", )
-    RETURN_NAMES = ("发送状态", )
-    OUTPUT_TOOLTIPS = ("发送状态信息", )
+    RETURN_TYPES = ("STRING", "INT", "FLOAT")
+    RETURN_NAMES = ("发送状态", "队列深度", "发送速率")
+    OUTPUT_TOOLTIPS = ("发送状态信息", "后台发送队列中等待发送的数据条数", "最近一秒的发送速率（字节/秒）")
+    OUTPUT_NODE = True
 
-    def process(self, 数据输入, 串口端口, 波特率, 数据格式, 换行符, 时间戳):
+    def process(self, 数据输入, 串口端口, 波特率, 数据格式, 换行符, 时间戳, 后台发送=True, 队列长度=64):
         try:
-            # 检查串口连接
-            if not self._check_serial_connection(串口端口, int(波特率)):
-                return ("串口连接失败", )
-            
-            # 转换数据为字符串
-            data_str = self._convert_data_to_string(数据输入, 数据格式, 时间戳)
+            if 数据格式 == "二进制帧":
+                payload = encode_frame(数据输入, float(时间戳))
+            else:
+                # 转换数据为字符串
+                data_str = self._convert_data_to_string(数据输入, 数据格式, 时间戳)
+                
+                # 添加换行符
+                if 换行符 != "无":
+                    line_ending = 换行符.replace("\\r", "\r").replace("\\n", "\n")
+                    data_str += line_ending
+                payload = data_str.encode('utf-8')
             
-            # 添加换行符
-            if 换行符 != "无":
-                line_ending = 换行符.replace("\\r", "\r").replace("\\n", "\n")
-                data_str += line_ending
+            # 获取串口共享的发送线程
+            self._check_writer(串口端口, int(波特率), 队列长度)
+            ticket = self.writer.send(payload, wait=not 后台发送)
             
-            # 发送数据
-            self.serial_port.write(data_str.encode('utf-8'))
-            self.serial_port.flush()
+            if not 后台发送:
+                # 同步发送：等待这条数据写入串口，超时按当前波特率的传输时间估计
+                error = self.writer.wait_written(ticket, timeout=1 + len(payload) * 10 / int(波特率))
+                if error:
+                    return (error, self.writer.depth, self.writer.rate)
+                return (f"已发送: {len(payload)} 字节到 {串口端口}", self.writer.depth, self.writer.rate)
             
-            status_msg = f"已发送: {len(data_str)} 字节到 {串口端口}"
-            return (status_msg, )
+            if not self.writer.connected and self.writer.error:
+                status_msg = f"串口未连接，正在重连（第 {self.writer.retries} 次）: {self.writer.error}"
+            else:
+                status_msg = f"已加入发送队列: {len(payload)} 字节到 {串口端口}"
+            if self.writer.dropped:
+                status_msg += f"，已丢弃 {self.writer.dropped} 条"
+            return (status_msg, self.writer.depth, self.writer.rate)
             
         except Exception as e:
             error_msg = f"串口发送错误: {str(e)}"
             print(error_msg)
-            return (error_msg, )
+            return (error_msg, 0, 0.0)
     
-    def _check_serial_connection(self, port, baudrate):
-        """检查并建立串口连接"""
-        try:
-            # 如果端口或波特率改变，重新连接
-            if (self.serial_port is None or 
-                not self.serial_port.is_open or 
-                self.last_port != port or 
-                self.last_baudrate != baudrate):
-                
-                # 关闭现有连接
-                if self.serial_port and self.serial_port.is_open:
-                    self.serial_port.close()
-                
-                # 建立新连接
-                self.serial_port = serial.Serial(
-                    port=port,
-                    baudrate=baudrate,
-                    bytesize=serial.EIGHTBITS,
-                    parity=serial.PARITY_NONE,
-                    stopbits=serial.STOPBITS_ONE,
-                    timeout=1
-                )
-                
-                self.last_port = port
-                self.last_baudrate = baudrate
-            
-            return self.serial_port.is_open
-            
-        except Exception as e:
-            print(f"串口连接错误: {e}")
-            return False
+    def _check_writer(self, port, baudrate, queue_size):
+        """获取串口共享的发送线程，端口或波特率改变时切换到新的串口"""
+        if self.writer is not None and (self.writer.port != port or self.writer.baudrate != baudrate):
+            self.writer.release()
+            self.writer = None
+        
+        if self.writer is None:
+            self.writer = SerialWriter.acquire(port, baudrate, queue_size)
+        else:
+            self.writer.resize(queue_size)
     
     def _convert_data_to_string(self, data, format_type, timestamp):
         """将数据转换为字符串"""
@@ -111,6 +115,8 @@ class SerialOutput:
             return self._to_json_string(data, timestamp)
         elif format_type == "十六进制":
             return self._to_hex_string(data)
+        elif format_type == "空格分隔数值":
+            return self._to_values_string(data)
         else:  # 原始文本
             return self._to_raw_string(data)
     
@@ -156,7 +162,16 @@ class SerialOutput:
         except Exception:
             return "STR_ERROR"
     
+    def _to_values_string(self, data):
+        """数组展平为空格分隔的数值，与串口输入的原始文本格式一致"""
+        try:
+            if isinstance(data, np.ndarray):
+                return ' '.join(map(str, data.ravel()))
+            return str(data)
+        except Exception:
+            return "STR_ERROR"
+    
     def __del__(self):
-        """析构函数，关闭串口连接"""
-        if hasattr(self, 'serial_port') and self.serial_port and self.serial_port.is_open:
-            self.serial_port.close()
\ No newline at end of file
+        """析构函数，释放串口连接"""
+        if getattr(self, 'writer', None) is not None:
+            self.writer.release()
\ No newline at end of file
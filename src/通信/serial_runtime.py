@@ -0,0 +1,511 @@
+import json
+import math
+import time
+import itertools
+import zlib
+import queue
+import struct
+import serial
+import threading
+import numpy as np
+
+# 二进制帧格式（小端）：
+#   帧头   2 字节 0xAA 0x55
+#   类型   1 字节 FRAME_DTYPES 中的序号
+#   维数   1 字节
+#   时间戳 8 字节 float64
+#   长度   4 字节 数据部分的字节数
+#   形状   维数 × 4 字节 uint32
+#   数据   按 C 顺序排列的数组内容
+#   校验   4 字节 帧头到数据末尾的 CRC32
+FRAME_MAGIC = b'\xaa\x55'
+FRAME_HEADER = struct.Struct('<2sBBdI')
+FRAME_CRC = struct.Struct('<I')
+FRAME_DTYPES = ('uint8', 'int8', 'uint16', 'int16', 'uint32', 'int32', 'uint64', 'int64',
+                'float16', 'float32', 'float64', 'bool', 'utf8')
+FRAME_MAX_PAYLOAD = 16 * 1024 * 1024    # 超过该长度的帧视为数据错误
+
+
+def encode_frame(data:any, timestamp:float=0.0) -> bytes:
+    """将数据编码为二进制帧，数组内容通过缓冲区协议直接拷贝，字符串按 utf8 类型发送"""
+    if isinstance(data, str):
+        array = np.frombuffer(data.encode('utf-8'), dtype=np.uint8)
+        code = FRAME_DTYPES.index('utf8')
+    else:
+        array = np.asarray(data)
+        if array.dtype.name not in FRAME_DTYPES:
+            raise Exception(f"二进制帧不支持的数据类型: {array.dtype}")
+        code = FRAME_DTYPES.index(array.dtype.name)
+        # 统一为小端、C 连续，已满足时不拷贝
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+    if array.ndim > 255:
+        raise Exception(f"二进制帧不支持 {array.ndim} 维数组")
+
+    payload = memoryview(array).cast('B')
+    body = b''.join((FRAME_HEADER.pack(FRAME_MAGIC, code, array.ndim, timestamp, payload.nbytes),
+                     struct.pack(f'<{array.ndim}I', *array.shape),
+                     payload))
+    return body + FRAME_CRC.pack(zlib.crc32(body))
+
+
+def decode_frame(buffer:bytes, offset:int=0) -> tuple[any,float,int]:
+    """
+    从 buffer 的 offset 处解码一个二进制帧，返回数据、时间戳和帧结束位置
+    数据不完整时返回 None，帧头、长度或校验错误时抛出异常
+    """
+    if len(buffer) - offset < FRAME_HEADER.size:
+        return None
+    magic, code, ndim, timestamp, length = FRAME_HEADER.unpack_from(buffer, offset)
+    if magic != FRAME_MAGIC or code >= len(FRAME_DTYPES) or length > FRAME_MAX_PAYLOAD:
+        raise Exception("二进制帧头错误")
+
+    start = offset + FRAME_HEADER.size + 4 * ndim
+    if len(buffer) < start:
+        return None
+    # 长度必须与形状和类型一致，否则是噪声中偶然出现的帧头，不再等待数据部分
+    shape = struct.unpack_from(f'<{ndim}I', buffer, offset + FRAME_HEADER.size)
+    itemsize = 1 if FRAME_DTYPES[code] == 'utf8' else np.dtype(FRAME_DTYPES[code]).itemsize
+    if length != math.prod(shape) * itemsize:
+        raise Exception("二进制帧长度错误")
+
+    end = start + length
+    if len(buffer) < end + FRAME_CRC.size:
+        return None
+    if FRAME_CRC.unpack_from(buffer, end)[0] != zlib.crc32(memoryview(buffer)[offset:end]):
+        raise Exception("二进制帧校验错误")
+
+    if FRAME_DTYPES[code] == 'utf8':
+        data = bytes(buffer[start:end]).decode('utf-8')
+    else:
+        data = np.frombuffer(bytes(buffer[start:end]), dtype=np.dtype(FRAME_DTYPES[code]).newbyteorder('<')).reshape(shape)
+    return data, timestamp, end + FRAME_CRC.size
+
+
+def open_serial(port:str, baudrate:int) -> serial.Serial:
+    """以 8N1 格式打开串口"""
+    return serial.Serial(
+        port=port,
+        baudrate=baudrate,
+        bytesize=serial.EIGHTBITS,
+        parity=serial.PARITY_NONE,
+        stopbits=serial.STOPBITS_ONE,
+        timeout=0.1,
+        write_timeout=1
+    )
+
+
+class SerialConnection:
+    """
+    串口连接，按 (端口, 波特率) 在进程内共享，引用计数归零时关闭
+    同一串口的发送线程和接收线程使用同一个连接（Windows 下串口只能打开一次），断开后按退避间隔重连
+    """
+    connections:dict[tuple,'SerialConnection'] = dict()
+    lock = threading.Lock()
+
+    # 重连间隔（秒），每次失败翻倍，不超过上限
+    RETRY_MIN = 0.5
+    RETRY_MAX = 8.0
+
+    def __init__(self, port:str, baudrate:int):
+        self.port:str = port
+        self.baudrate:int = baudrate
+        self.refs:int = 0
+        self.serial_port = None
+        self.error:str = None
+        self.retries:int = 0    # 连续重连失败的次数
+        self.next_retry:float = 0.0    # 下一次允许重连的时间
+        self.port_lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self.serial_port is not None and self.serial_port.is_open
+
+    def connect(self) -> serial.Serial:
+        """返回已打开的串口，未连接时尝试打开；打开失败或还在退避间隔内时返回 None"""
+        with self.port_lock:
+            if self.serial_port is not None:
+                return self.serial_port
+            now = time.monotonic()
+            if now < self.next_retry:
+                return None
+            try:
+                self.serial_port = open_serial(self.port, self.baudrate)
+                self.retries = 0
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+                self.retries += 1
+                self.next_retry = now + min(self.RETRY_MIN * 2 ** (self.retries - 1), self.RETRY_MAX)
+            return self.serial_port
+
+    def disconnect(self, serial_port:serial.Serial=None, error:str=None) -> None:
+        """
+        读写出错时关闭串口，之后由 connect 重连
+        serial_port 为出错的串口对象，已经被另一个线程关闭并重新打开时不再关闭新的连接
+        """
+        with self.port_lock:
+            if self.serial_port is None or (serial_port is not None and serial_port is not self.serial_port):
+                return
+            if error is not None:
+                self.error = error
+            try:
+                self.serial_port.close()
+            except Exception:
+                pass
+            self.serial_port = None
+
+    @classmethod
+    def acquire(cls, port:str, baudrate:int) -> 'SerialConnection':
+        """获取串口的共享连接，连接在第一次读写时打开"""
+        with cls.lock:
+            connection = cls.connections.get((port, baudrate))
+            if connection is None:
+                connection = cls.connections[(port, baudrate)] = SerialConnection(port, baudrate)
+            connection.refs += 1
+            return connection
+
+    def release(self) -> None:
+        """释放一个引用，没有线程使用时关闭串口"""
+        with SerialConnection.lock:
+            self.refs -= 1
+            if self.refs > 0:
+                return
+            if SerialConnection.connections.get((self.port, self.baudrate)) is self:
+                del SerialConnection.connections[(self.port, self.baudrate)]
+        self.disconnect()
+
+
+class SerialWriter:
+    """
+    串口发送线程，按 (端口, 波特率) 在进程内共享，引用计数归零时关闭
+    所有节点的数据进入同一个有界队列，由唯一的发送线程合并后写出，串口连接与同一串口的接收线程共享
+    """
+    writers:dict[tuple,'SerialWriter'] = dict()
+    lock = threading.Lock()
+
+    def __init__(self, port:str, baudrate:int, queue_size:int=64, batch_size:int=65536):
+        self.port:str = port
+        self.baudrate:int = baudrate
+        self.batch_size:int = batch_size    # 单次合并写出的最大字节数
+        self.refs:int = 0
+        self.connection = SerialConnection.acquire(port, baudrate)
+
+        self.queue:queue.Queue = queue.Queue(maxsize=queue_size)
+        self.tickets = itertools.count(1)    # 每条数据的序号，用于同步发送时等待写出
+        # 同步发送的数据按序号记录结果：None 表示还在队列中，空字符串表示已写出，否则为失败原因
+        self.results:dict[int,str] = dict()
+        self.written_condition = threading.Condition()
+
+        self.dropped:int = 0
+        self.rate:float = 0.0    # 最近一秒的发送速率（字节/秒）
+        self.sent_bytes:int = 0
+        self.last_bytes:int = 0
+        self.last_report:float = time.perf_counter()
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    @property
+    def connected(self) -> bool:
+        return self.connection.connected
+
+    @property
+    def error(self) -> str:
+        return self.connection.error
+
+    @property
+    def retries(self) -> int:
+        return self.connection.retries
+
+    @property
+    def depth(self) -> int:
+        """队列中等待发送的数据条数"""
+        return self.queue.qsize()
+
+    def send(self, data:bytes, wait:bool=False) -> int:
+        """
+        放入发送队列，不阻塞；队列满时丢弃最旧的数据。返回数据的序号
+        wait 为 True 时记录这条数据的结果，之后用 wait_written 等待
+        """
+        ticket = next(self.tickets)
+        if wait:
+            with self.written_condition:
+                self.results[ticket] = None
+        while True:
+            try:
+                self.queue.put_nowait((ticket, data))
+                return ticket
+            except queue.Full:
+                try:
+                    dropped, _ = self.queue.get_nowait()
+                    self.dropped += 1
+                    self.finish([dropped], "发送队列已满，数据被丢弃")
+                except queue.Empty:
+                    pass
+
+    def finish(self, tickets:list[int], result:str) -> None:
+        """记录同步发送的数据的结果并唤醒等待的节点，result 为空字符串表示已写出"""
+        with self.written_condition:
+            for ticket in tickets:
+                if ticket in self.results:
+                    self.results[ticket] = result
+            self.written_condition.notify_all()
+
+    def resize(self, queue_size:int) -> None:
+        """扩大队列长度，不会缩小其他使用者需要的长度"""
+        with self.queue.mutex:
+            self.queue.maxsize = max(self.queue.maxsize, queue_size)
+
+    def wait_written(self, ticket:int, timeout:float=None) -> str:
+        """等待以 wait=True 发送的数据写入串口，写出时返回空字符串，否则返回失败原因"""
+        with self.written_condition:
+            finished = self.written_condition.wait_for(lambda: self.results[ticket] is not None, timeout)
+            result = self.results.pop(ticket)
+        return result if finished else f"串口连接失败: {self.error or '发送超时'}"
+
+    def loop(self) -> None:
+        """发送线程：取出队列中已有的全部数据，合并为一次 write；写入失败时重连"""
+        while not (self.stop_event.is_set() and (self.queue.empty() or not self.connected)):
+            serial_port = self.connection.connect()
+            if serial_port is None:
+                self.stop_event.wait(0.1)
+                self.update_rate()
+                continue
+            try:
+                batch = [self.queue.get(timeout=0.1)]
+            except queue.Empty:
+                self.update_rate()
+                continue
+            size = len(batch[0][1])
+            while size < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+                size += len(batch[-1][1])
+
+            tickets = [ticket for ticket, _ in batch]
+            try:
+                serial_port.write(b''.join(data for _, data in batch))
+            except Exception as e:
+                # 写入失败的这一批数据丢弃，重连后继续发送后续数据
+                self.dropped += len(batch)
+                self.connection.disconnect(serial_port, str(e))
+                self.finish(tickets, f"串口写入失败: {e}")
+            else:
+                self.sent_bytes += size
+                self.finish(tickets, "")
+            self.update_rate()
+
+    def update_rate(self) -> None:
+        """每秒更新一次发送速率"""
+        now = time.perf_counter()
+        if now - self.last_report >= 1.0:
+            self.rate = (self.sent_bytes - self.last_bytes) / (now - self.last_report)
+            self.last_bytes = self.sent_bytes
+            self.last_report = now
+
+    def close(self) -> None:
+        """发送完队列中剩余的数据后停止发送线程，释放串口连接"""
+        self.stop_event.set()
+        self.thread.join(timeout=2.0)
+        self.connection.release()
+
+    @classmethod
+    def acquire(cls, port:str, baudrate:int, queue_size:int=64) -> 'SerialWriter':
+        """获取串口的共享发送线程，队列长度取所有使用者要求的最大值"""
+        with cls.lock:
+            writer = cls.writers.get((port, baudrate))
+            if writer is None:
+                writer = cls.writers[(port, baudrate)] = SerialWriter(port, baudrate, queue_size)
+            writer.resize(queue_size)
+            writer.refs += 1
+            return writer
+
+    def release(self) -> None:
+        """释放一个引用，没有节点使用时停止发送线程"""
+        with SerialWriter.lock:
+            self.refs -= 1
+            if self.refs > 0:
+                return
+            if SerialWriter.writers.get((self.port, self.baudrate)) is self:
+                del SerialWriter.writers[(self.port, self.baudrate)]
+        self.close()
+
+
+class StreamParser:
+    """串口数据流解析器，把收到的字节切分为消息，每条消息解析为一个一维样本"""
+    FORMATS = ('原始文本', 'JSON格式', '十六进制', '二进制帧')
+    MAX_LINE = 1024 * 1024
+
+    def __init__(self, format_type:str):
+        if format_type not in StreamParser.FORMATS:
+            raise Exception(f"未知的数据格式: {format_type}")
+        self.format_type:str = format_type
+        self.buffer:bytearray = bytearray()
+        self.errors:int = 0
+
+    def feed(self, data:bytes) -> list[np.ndarray]:
+        """追加收到的字节，返回其中完整消息解析出的样本"""
+        self.buffer += data
+        if self.format_type == '二进制帧':
+            return self.parse_frames()
+
+        samples = list()
+        *lines, rest = self.buffer.split(b'\n')
+        if len(rest) > StreamParser.MAX_LINE:
+            # 长时间收不到换行符，多半是格式设置错误
+            rest = b''
+            self.errors += 1
+        self.buffer = bytearray(rest)
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                samples.append(self.parse_line(line))
+            except Exception:
+                self.errors += 1
+        return samples
+
+    def parse_line(self, line:bytes) -> np.ndarray:
+        """解析一行文本，数值之间以空格、逗号或制表符分隔"""
+        if self.format_type == 'JSON格式':
+            value = json.loads(line)
+            # SerialOutput 的 JSON 格式把数据放在 data 字段中
+            if isinstance(value, dict):
+                value = value['data']
+            return np.asarray(value, dtype=np.float64).reshape(-1)
+
+        tokens = line.replace(b',', b' ').split()
+        if self.format_type == '十六进制':
+            return np.array([int(token, 16) for token in tokens], dtype=np.float64)
+        return np.array([float(token) for token in tokens], dtype=np.float64)
+
+    def parse_frames(self) -> list[np.ndarray]:
+        """解析缓冲区中的二进制帧，遇到错误时跳到下一个帧头重新同步"""
+        samples = list()
+        offset = 0
+        while True:
+            offset = self.buffer.find(FRAME_MAGIC, offset)
+            if offset < 0:
+                # 保留最后一个字节，它可能是下一个帧头的前半部分
+                offset = max(len(self.buffer) - 1, 0)
+                break
+            try:
+                result = decode_frame(self.buffer, offset)
+            except Exception:
+                self.errors += 1
+                offset += 1
+                continue
+            if result is None:
+                break
+            data, _, offset = result
+            if isinstance(data, str):
+                self.errors += 1
+                continue
+            samples.append(np.asarray(data, dtype=np.float64).reshape(-1))
+        del self.buffer[:offset]
+        return samples
+
+
+class SampleRing:
+    """预分配的样本环形缓冲区，样本宽度改变时清空重新分配"""
+    def __init__(self, capacity:int):
+        self.capacity:int = capacity
+        self.data:np.ndarray = np.empty((capacity, 0))
+        self.count:int = 0    # 累计写入的样本数
+        self.lock = threading.Lock()
+
+    def push(self, sample:np.ndarray) -> None:
+        """写入一个样本，缓冲区满时覆盖最旧的样本"""
+        with self.lock:
+            if sample.shape[0] != self.data.shape[1]:
+                self.data = np.empty((self.capacity, sample.shape[0]))
+                self.count = 0
+            self.data[self.count % self.capacity] = sample
+            self.count += 1
+
+    def latest(self, n:int) -> np.ndarray:
+        """按时间顺序返回最近 n 个样本的副本，形状为 (n, 样本宽度)"""
+        with self.lock:
+            n = min(n, self.count, self.capacity)
+            end = self.count % self.capacity
+            if n <= end:
+                return self.data[end - n:end].copy()
+            return np.concatenate((self.data[self.capacity - (n - end):], self.data[:end]))
+
+
+class SerialReader:
+    """串口接收线程，持续读取并解析数据写入样本环形缓冲区，串口连接与同一串口的发送线程共享"""
+    def __init__(self, port:str, baudrate:int, format_type:str, capacity:int=10000):
+        self.config:tuple = (port, baudrate, format_type, capacity)
+        self.port:str = port
+        self.baudrate:int = baudrate
+        self.connection = SerialConnection.acquire(port, baudrate)
+        self.parser = StreamParser(format_type)
+        self.ring = SampleRing(capacity)
+
+        self.timestamp:float = 0.0    # 最新样本的接收时间
+        self.total:int = 0    # 累计接收的样本数
+        self.rate:float = 0.0    # 最近一秒的样本速率（样本/秒）
+        self.last_count:int = 0
+        self.last_report:float = time.perf_counter()
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    @property
+    def connected(self) -> bool:
+        return self.connection.connected
+
+    @property
+    def error(self) -> str:
+        return self.connection.error
+
+    @property
+    def retries(self) -> int:
+        return self.connection.retries
+
+    @property
+    def errors(self) -> int:
+        return self.parser.errors
+
+    def loop(self) -> None:
+        """接收线程：读取串口中已有的数据，没有数据时最多等待 0.1 秒"""
+        while not self.stop_event.is_set():
+            serial_port = self.connection.connect()
+            if serial_port is None:
+                self.stop_event.wait(0.1)
+                continue
+
+            try:
+                data = serial_port.read(max(serial_port.in_waiting, 1))
+            except Exception as e:
+                self.connection.disconnect(serial_port, str(e))
+                continue
+
+            if data:
+                samples = self.parser.feed(data)
+                for sample in samples:
+                    self.ring.push(sample)
+                if samples:
+                    self.total += len(samples)
+                    self.timestamp = time.time()
+            self.update_rate()
+
+    def update_rate(self) -> None:
+        """每秒更新一次样本速率"""
+        now = time.perf_counter()
+        if now - self.last_report >= 1.0:
+            self.rate = (self.total - self.last_count) / (now - self.last_report)
+            self.last_count = self.total
+            self.last_report = now
+
+    def close(self) -> None:
+        """停止接收线程，释放串口连接"""
+        self.stop_event.set()
+        self.thread.join(timeout=1.0)
+        self.connection.release()
@@ -0,0 +1,68 @@
+import importlib.util
+import pathlib
+
+import cv2
+import numpy as np
+import pytest
+
+# cv_runtime 位于中文目录下，且包的 __init__ 依赖 ComfyUI，按文件路径加载
+spec = importlib.util.spec_from_file_location(
+    "cv_runtime", pathlib.Path(__file__).resolve().parents[1] / "src" / "OpenCV" / "cv_runtime.py")
+cv_runtime = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cv_runtime)
+
+
+# 与滤波节点相同的调用方式：(名称, func(src, dst), halo)
+FILTERS = [
+    ("gaussian_5", lambda src, dst: cv2.GaussianBlur(src, (5, 5), 0, dst=dst, sigmaY=0), 2),
+    ("gaussian_5x21", lambda src, dst: cv2.GaussianBlur(src, (5, 21), 1.5, dst=dst, sigmaY=4.0), 10),
+    ("gaussian_31", lambda src, dst: cv2.GaussianBlur(src, (31, 31), 0, dst=dst, sigmaY=0), 15),
+    ("blur_3", lambda src, dst: cv2.blur(src, (3, 3), dst=dst), 1),
+    ("blur_4x6", lambda src, dst: cv2.blur(src, (4, 6), dst=dst), 3),
+    ("blur_25", lambda src, dst: cv2.blur(src, (25, 25), dst=dst), 12),
+    ("median_3", lambda src, dst: cv2.medianBlur(src, 3, dst=dst), 1),
+    ("median_7", lambda src, dst: cv2.medianBlur(src, 7, dst=dst), 3),
+    ("median_21", lambda src, dst: cv2.medianBlur(src, 21, dst=dst), 10),
+    ("bilateral_9", lambda src, dst: cv2.bilateralFilter(src, 9, 75, 75, dst=dst), 4),
+    ("bilateral_25", lambda src, dst: cv2.bilateralFilter(src, 25, 50, 10, dst=dst), 12),
+]
+
+
+def make_image(channels):
+    rng = np.random.default_rng(0)
+    shape = (97, 131) if channels == 1 else (97, 131, channels)
+    image = rng.integers(0, 256, shape, dtype=np.uint8)
+    # 叠加平滑的亮度变化，避免只用纯噪声测试
+    image[20:60, 30:90] //= 2
+    return image
+
+
+@pytest.mark.parametrize("channels", [1, 3])
+@pytest.mark.parametrize("tile_size", [8, 32, 50, 64])
+@pytest.mark.parametrize("name,func,halo", FILTERS, ids=[f[0] for f in FILTERS])
+def test_filter_tiled_matches_untiled(name, func, halo, tile_size, channels):
+    image = make_image(channels)
+    expected = func(image, None)
+
+    result = cv_runtime.filter_tiled(func, image, None, halo, tile_size, workers=4)
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("channels", [1, 3])
+def test_filter_tiled_writes_into_dst(channels):
+    image = make_image(channels)
+    name, func, halo = FILTERS[0]
+    dst = np.zeros_like(image)
+
+    result = cv_runtime.filter_tiled(func, image, dst, halo, 40, workers=2)
+    assert result is dst
+    np.testing.assert_array_equal(dst, func(image, None))
+
+
+def test_filter_tiled_disabled_or_single_tile():
+    image = make_image(3)
+    name, func, halo = FILTERS[3]
+    expected = func(image, None)
+
+    np.testing.assert_array_equal(cv_runtime.filter_tiled(func, image, None, halo, 0), expected)
+    np.testing.assert_array_equal(cv_runtime.filter_tiled(func, image, None, halo, 256), expected)
@@ -1,3 +1,5 @@
+import { createPreviewHandler } from "../preview.js";
+
 export default function(node) {
     // 设置节点大小
     node.size = [400, 300];
@@ -15,9 +17,5 @@ export default function(node) {
     node.addDOMWidget("matplotlib_widget", "Matplotlib Plot", img);
     
     // 节点执行完成后的回调
-    node.onExecuted = function(message) {
-        if (message?.data) {
-            img.src = `data:image/png;base64,${message.data[0]}`;
-        }
-    };
+    node.onExecuted = createPreviewHandler(img);
 }
\ No newline at end of file
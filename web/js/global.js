@@ -13,43 +13,69 @@ app.registerExtension({
     },
 });
 
-// 注册编译按钮 // 这段代码来自https://github.com/pydn/ComfyUI-to-Python-Extension
+// 编译工作流为python脚本 // 这段代码来自https://github.com/pydn/ComfyUI-to-Python-Extension
+// optimize 为 true 时删除无用节点并预先计算常量节点，只对声明了副作用的节点安全，因此单独提供菜单项
+function compileWorkflow(mode, optimize = false) {
+	var filename = prompt("脚本名: ");
+	if(filename === undefined || filename === null || filename === "") {
+		return
+	}
+
+	app.graphToPrompt().then(async (p) => {
+		const json = JSON.stringify({name: filename + ".json", mode: mode, options: {optimize: optimize}, workflow: JSON.stringify(p.output, null, 2)}, null, 2); 
+		var response = await api.fetchApi(`/comfyui_for_academic_compile`, { method: "POST", body: json });
+		if(response.status == 200) {
+			const blob = new Blob([await response.text()], {type: "text/python;charset=utf-8"});
+			const url = URL.createObjectURL(blob);
+			if(!filename.endsWith(".py")) {
+				filename += ".py";
+			}
+
+			const a = $el("a", {
+				href: url,
+				download: filename,
+				style: {display: "none"},
+				parent: document.body,
+			});
+			a.click();
+			setTimeout(function () {
+				a.remove();
+				window.URL.revokeObjectURL(url);
+			}, 0);
+		} else {
+			alert(`编译失败: ${await response.text()}`);
+		}
+	});
+}
+
+// 注册编译按钮
 app.registerExtension({
 	name: "ComfyUI.academic.menu",
 	commands: [
     	{ 
     	  	id: "academic.compile", 
     	  	label: "编译为python脚本", 
-    	  	function: () => {
-				var filename = prompt("脚本名: ");
-				if(filename === undefined || filename === null || filename === "") {
-					return
-				}
-					
-				app.graphToPrompt().then(async (p) => {
-					const json = JSON.stringify({name: filename + ".json", workflow: JSON.stringify(p.output, null, 2)}, null, 2); 
-					var response = await api.fetchApi(`/comfyui_for_academic_compile`, { method: "POST", body: json });
-					if(response.status == 200) {
-						const blob = new Blob([await response.text()], {type: "text/python;charset=utf-8"});
-						const url = URL.createObjectURL(blob);
-						if(!filename.endsWith(".py")) {
-							filename += ".py";
-						}
-
-						const a = $el("a", {
-							href: url,
-							download: filename,
-							style: {display: "none"},
-							parent: document.body,
-						});
-						a.click();
-						setTimeout(function () {
-							a.remove();
-							window.URL.revokeObjectURL(url);
-						}, 0);
-					}
-				});
-			}
+    	  	function: () => compileWorkflow("sequential")
+    	},
+    	{ 
+    	  	id: "academic.compile.optimize", 
+    	  	label: "编译为python脚本（优化：删除无用节点、预计算常量）", 
+    	  	function: () => compileWorkflow("sequential", true)
+    	},
+    	{ 
+    	  	id: "academic.compile.parallel", 
+    	  	label: "编译为python脚本（层级并行）", 
+    	  	function: () => compileWorkflow("parallel")
+    	},
+    	{ 
+    	  	id: "academic.compile.dataflow", 
+    	  	label: "编译为python脚本（数据流）", 
+    	  	function: () => compileWorkflow("dataflow")
+    	},
+    	{ 
+    	  	id: "academic.compile.pipeline", 
+    	  	label: "编译为python脚本（流水线）", 
+    	  	function: () => compileWorkflow("pipeline")
     	}
   	],
 	init() {
@@ -60,7 +86,7 @@ app.registerExtension({
 	menuCommands: [
     { 
       path: ["Academic"], 
-      commands: ["academic.compile"] 
+      commands: ["academic.compile", "academic.compile.optimize", "academic.compile.parallel", "academic.compile.dataflow", "academic.compile.pipeline"] 
     }
   ]
 });
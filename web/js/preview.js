@@ -0,0 +1,43 @@
+import { api } from "/scripts/api.js";
+
+// 节点的预览图片以二进制从预览路由获取，用对象URL显示，避免 base64 数据URL的编码和解码
+// 上一张还在获取时只记下最新的地址，获取完成后再取，多路实时预览不会积压请求
+export function createPreviewHandler(img, onMessage) {
+    let objectURL = null;
+    let pending = null;
+    let loading = false;
+
+    async function load(url) {
+        loading = true;
+        try {
+            const response = await api.fetchApi(url, { cache: "no-store" });
+            if (response.ok) {
+                const previous = objectURL;
+                objectURL = URL.createObjectURL(await response.blob());
+                img.src = objectURL;
+                if (previous) {
+                    URL.revokeObjectURL(previous);
+                }
+            }
+        } catch (error) {
+            console.warn("Failed to load preview", error);
+        }
+        loading = false;
+        if (pending) {
+            const next = pending;
+            pending = null;
+            load(next);
+        }
+    }
+
+    return function(message) {
+        if (message?.url) {
+            if (loading) {
+                pending = message.url[0];
+            } else {
+                load(message.url[0]);
+            }
+            onMessage?.(message);
+        }
+    };
+}
@@ -1,3 +1,5 @@
+import { createPreviewHandler } from "../preview.js";
+
 export default function(node) {
     // 设置节点大小
     node.size = [300, 250];
@@ -9,10 +11,10 @@ export default function(node) {
     // 添加图片容器到节点
     node.addDOMWidget("image_widget", "Image Display", img);
     
-    // 节点执行完成后的回调
-    node.onExecuted = function(message) {
-        if (message?.data) {
-            img.src = `data:image/png;base64,${message.data[0]}`;
+    // 节点执行完成后的回调，被限制帧率跳过的帧没有 url，保留上一帧
+    node.onExecuted = createPreviewHandler(img, function(message) {
+        if (message.encode_ms) {
+            img.title = `编码耗时 ${message.encode_ms[0].toFixed(1)} ms`;
         }
-    };
-}
\ No newline at end of file
+    });
+}